@@ -1,30 +1,118 @@
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QObject, QThread, Signal
+import multiprocessing
 import sys
+import threading
+import numpy as np
 
 from SOURCES.GUI import MainWindow
-from SOURCES.Transpiler import run_transpiler
-from SOURCES.GMAT_exec import run_gmat
-from SOURCES.plot_results import load_report, make_plots
-from SOURCES.utils import ensure_dirs, OUTPUT_DIR
+from SOURCES.Transpiler import parse_gui_txt, resolve_config, DATA_FILE, REPORT_COLUMNS
+from SOURCES.backends import get_backend, REPORT_PATH
+from SOURCES.bulk_input import BULK_FILE, load_scenarios
+from SOURCES.plot_results import make_plots
+from SOURCES.streaming import watch
+from SOURCES.astro import RADIUS
+from SOURCES.cache import ResultCache, config_key
+from SOURCES.elements import elements_path, report_elements
+from SOURCES.ephemeris import EPHEMERIS_PATH, save_ephemeris_chunks
+from SOURCES.events import EVENTS_PATH, SUMMARY_PATH, find_events_chunks, write_events
+from SOURCES.gravity import field_info, field_note
+from SOURCES.report_reader import iter_report_chunks, sidecar_path
+from SOURCES.report_stats import STATS_PATH, ReportStats
+from SOURCES.stm import STM_PATH
+from SOURCES.propagator import make_dynamics
+from SOURCES.sharding import run_scenarios
+from SOURCES.telemetry import RunControl, RunRecord, run_params
+from SOURCES.utils import ensure_dirs
 
 
 class PipelineWorker(QObject):
     finished = Signal()
     error = Signal(str)
+    progreso = Signal(float)   # fracción de la duración ya propagada (0..1)
+    parcial = Signal(object)   # cada lote de filas (n, 7), para ir pintando
+
+    def __init__(self, cancel: threading.Event | None = None):
+        super().__init__()
+        # Se activa desde la GUI (botón Cancelar); el timeout sale de SIM_TIMEOUT
+        self.cancel = cancel or threading.Event()
 
     def run(self):
         try:
-            print("▶ Ejecutando Transpiler...")
-            script_path = run_transpiler()
-
-            print("▶ Ejecutando GMAT...")
-            run_gmat(script_path)
+            cfg = parse_gui_txt(DATA_FILE)
+            p = resolve_config(cfg)
+            backend = get_backend()
+            # El mismo escenario con otro backend es otro resultado
+            clave = config_key({**p, "backend": backend.name})
+            cache = ResultCache()
+
+            # Entradas antiguas no traen efeméride ni eventos: mejor ninguno que los de otra ejecución
+            for extra in (EPHEMERIS_PATH, EVENTS_PATH, SUMMARY_PATH, STM_PATH, STATS_PATH,
+                          sidecar_path(REPORT_PATH), elements_path(REPORT_PATH)):
+                extra.unlink(missing_ok=True)
+            if cache.restore(clave):
+                print("✅ Pipeline completo (caché)")
+                self.finished.emit()
+                return
+
+            print(f"▶ Propagando (backend {backend.name})...")
+            ctl = RunControl.from_env(self.cancel)
+            # Con grado y orden efectivos: sin el .cof, "EGM-96 20x20" se queda en 4x4
+            params = {**run_params(p), **field_info(p), "backend": backend.name, "key": clave}
+
+            with RunRecord("pipeline", params, ctl) as rec:
+                # Los lotes llegan mientras se propaga: si diverge o choca con el
+                # cuerpo central se corta ahí (PropagationAborted) sin esperar al final
+                radio = RADIUS.get(p["central_en"], RADIUS["Earth"])
+                lotes = watch(
+                    backend.stream(cfg, ctl), p["dur_days"], radio,
+                    on_progress=self.progreso.emit,
+                )
+                # Los lotes no se guardan: lo que necesita todas las filas
+                # vuelve a leer el report por trozos (memoria acotada)
+                stats = ReportStats(body_radius=radio)
+                for lote in lotes:
+                    stats.update(lote)
+                    self.parcial.emit(lote)
+
+                rec.reports = [REPORT_PATH]
+                rec.rows = stats.rows
+
+            if not stats.rows:
+                raise RuntimeError("La propagación no ha devuelto ninguna fila")
+
+            def trozos():
+                for trozo in iter_report_chunks(REPORT_PATH, REPORT_COLUMNS):
+                    yield trozo.to_numpy()
+
+            dinamica = make_dynamics(p)
+            # Trayectoria continua para consultar fuera de la malla del report
+            extras = []
+            if stats.rows >= 2:
+                save_ephemeris_chunks(EPHEMERIS_PATH, trozos(), dinamica, p["sat_name"])
+                extras.append(EPHEMERIS_PATH)
+
+            eventos = find_events_chunks(trozos(), p, p["event_altitudes"], dinamica)
+            nota = field_note(p)
+            write_events(eventos, stats.t_first, stats.t_last, notes=[nota] if nota else [])
+            stats.write()
+            extras += [EVENTS_PATH, SUMMARY_PATH, STATS_PATH]
+            # Solo con backend numpy y STM Limit
+            if STM_PATH.exists():
+                extras.append(STM_PATH)
+            # Columnas del report en binario: load_report ya no tiene que parsearlo
+            if sidecar_path(REPORT_PATH).exists():
+                extras.append(sidecar_path(REPORT_PATH))
+            # Elementos keplerianos de cada fila, calculados una vez
+            elementos = report_elements(REPORT_PATH, p["central_en"])
+            if elements_path(REPORT_PATH).exists():
+                extras.append(elements_path(REPORT_PATH))
 
             print("▶ Generando plots...")
-            report = OUTPUT_DIR / "DefaultReportFile.txt"
-            df = load_report(report)
-            make_plots(df)
+            # Serie diezmada (con las filas de los burns): mismos plots, menos puntos
+            pngs = make_plots(stats.frame(p["sat_name"]), eventos, elements=elementos)
+
+            cache.store(clave, REPORT_PATH, pngs, extras)
 
             print("✅ Pipeline completo")
             self.finished.emit()
@@ -33,9 +121,42 @@ class PipelineWorker(QObject):
             self.error.emit(str(e))
 
 
-def ejecutar_pipeline_async(window):
+class ScenariosWorker(QObject):
+    """
+    Todos los escenarios de BULK_FILE sobre la config guardada, repartidos
+    entre procesos (SOURCES.sharding). progreso es la fracción de escenarios
+    terminados.
+    """
+    finished = Signal()
+    error = Signal(str)
+    progreso = Signal(float)
+
+    def __init__(self, cancel: threading.Event | None = None):
+        super().__init__()
+        self.cancel = cancel or threading.Event()
+
+    def run(self):
+        try:
+            cfg = parse_gui_txt(DATA_FILE)
+            tabla = load_scenarios(BULK_FILE)
+            ctl = RunControl.from_env(self.cancel)
+
+            with RunRecord("scenarios", {"file": BULK_FILE.name, "n_scenarios": len(tabla)}, ctl) as rec:
+                res = run_scenarios(cfg, tabla.variants(), ctl=ctl, on_progress=self.progreso.emit)
+                rec.rows = int(np.isfinite(res.states[:, :, 0]).sum())
+
+            for i, msg in sorted(res.errors.items()):
+                print(f"⚠ Escenario {i}: {msg}")
+            self.finished.emit()
+
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+def _lanzar_async(window, worker_cls):
+    window.pipeline_cancel = threading.Event()
     window.pipeline_thread = QThread()
-    window.pipeline_worker = PipelineWorker()
+    window.pipeline_worker = worker_cls(window.pipeline_cancel)
 
     window.pipeline_worker.moveToThread(window.pipeline_thread)
 
@@ -48,10 +169,25 @@ def ejecutar_pipeline_async(window):
     window.pipeline_worker.error.connect(
         lambda e: print("❌ Error en pipeline:", e)
     )
+    window.pipeline_worker.error.connect(window.pipeline_thread.quit)
+
+    window.pipeline_worker.progreso.connect(window.mostrar_progreso)
+    window.pipeline_worker.finished.connect(window.pipeline_terminado)
+    window.pipeline_worker.error.connect(window.pipeline_terminado)
+
+    window.pipeline_en_marcha()
 
     window.pipeline_thread.start()
 
 
+def ejecutar_pipeline_async(window):
+    _lanzar_async(window, PipelineWorker)
+
+
+def ejecutar_escenarios_async(window):
+    _lanzar_async(window, ScenariosWorker)
+
+
 
 
 def main():
@@ -61,6 +197,9 @@ def main():
     window = MainWindow()
 
     window.datos_guardados.connect(lambda: ejecutar_pipeline_async(window))
+    window.escenarios_pedidos.connect(lambda: ejecutar_escenarios_async(window))
+    # Directo, sin pasar por el hilo del pipeline (que está ocupado propagando)
+    window.btn_cancelar.clicked.connect(lambda: window.pipeline_cancel.set())
 
     window.show()
     sys.exit(app.exec())
@@ -68,4 +207,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Los procesos de SOURCES.sharding arrancan con spawn (también en el .exe)
+    multiprocessing.freeze_support()
     main()
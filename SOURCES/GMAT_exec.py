@@ -1,11 +1,33 @@
+import os
+import queue
+import re
 import subprocess
+import tempfile
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from shutil import copy2
 
+from SOURCES.report_reader import write_sidecar
+from SOURCES.telemetry import ProcessWatcher, RunControl, RunRecord, script_params, wait_process
 from SOURCES.utils import OUTPUT_DIR
 
+JOBS_DIR = OUTPUT_DIR / "jobs"
+
+# Línea "<ReportFile>.Filename = '<fichero>';" de un script GMAT
+_FILENAME_RE = re.compile(r"^(\s*\w+\.Filename\s*=\s*)'([^']*)'\s*;", re.MULTILINE)
+
 
 def find_gmat():
+    # GMAT_CONSOLE permite usar otra instalación (o un ejecutable de pruebas)
+    env = os.environ.get("GMAT_CONSOLE")
+    if env:
+        p = Path(env)
+        if p.exists():
+            return p
+        raise FileNotFoundError(f"GMAT_CONSOLE apunta a un fichero que no existe: {p}")
+
     posibles = [
         Path(r"C:\Program Files (x86)\GMAT-R2019aBeta-Windows-x64-public\bin\GmatConsole.exe"),
         Path(r"C:\Program Files\GMAT-R2019aBeta-Windows-x64-public\bin\GmatConsole.exe"),
@@ -18,8 +40,12 @@ def find_gmat():
     raise FileNotFoundError("GMAT R2019aBeta Console no encontrado")
 
 
-def run_gmat(script_path: Path):
-
+def _run_console(script_path: Path, cwd: Path | None = None,
+                 ctl: RunControl | None = None) -> Path:
+    """
+    Ejecuta GmatConsole sobre el script y devuelve la carpeta output de GMAT.
+    Con ctl, se corta si pasa su timeout o se cancela (RunTimeout/RunCancelled).
+    """
     gmat_exe = find_gmat()
     gmat_bin = gmat_exe.parent
 
@@ -28,21 +54,349 @@ def run_gmat(script_path: Path):
         raise FileNotFoundError(f"No existe el script de GMAT: {script_path}")
 
     #Ejecutar GMAT
-    subprocess.run(
+    proc = subprocess.Popen(
         [str(gmat_exe), str(script_path)],
-        check=True
+        cwd=cwd,
     )
+    if wait_process(proc, ctl) != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+    return gmat_bin.parent / "output"
+
+
+def write_report_precision(src: Path, dst: Path, col_precision: dict):
+    """
+    Copia un report reescribiendo cada columna con su nº de cifras
+    significativas (col_precision: {'X': 6, ...}, por sufijo del parámetro).
+    GMAT solo tiene una Precision por ReportFile; así el report final ocupa
+    (y cuesta parsear) solo lo que se ha pedido.
+    """
+    formats = None
+    with src.open("r", encoding="utf-8") as fin, dst.open("w", encoding="utf-8") as fout:
+        for line in fin:
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                values = [float(v) for v in fields]
+            except ValueError:
+                # Cabecera: de aquí salen el formato y el ancho de cada columna
+                formats = []
+                for name in fields:
+                    digits = col_precision.get(name.split(".")[-1], 16)
+                    formats.append((f"{{:.{digits}g}}", max(len(name), digits + 8) + 2))
+                fout.write("".join(name.ljust(w) for name, (_, w) in zip(fields, formats)) + "\n")
+                continue
+
+            if formats is None or len(formats) != len(values):
+                fout.write(line)
+                continue
+            fout.write("".join(fmt.format(v).ljust(w) for v, (fmt, w) in zip(values, formats)) + "\n")
+
+
+def run_gmat(script_path: Path, col_precision: dict | None = None,
+             ctl: RunControl | None = None):
+
+    gmat_output = _run_console(script_path, ctl=ctl)
 
     #Copiar el ReportFile desde GMAT/bin al proyecto
-    src = gmat_bin.parent / "output" / "DefaultReportFile.txt"
+    src = gmat_output / "DefaultReportFile.txt"
     if not src.exists():
         raise FileNotFoundError(
             f"GMAT terminó pero no se generó el report file: {src}"
         )
 
-    dst = OUTPUT_DIR / "DefaultReportFile.txt"
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    copy_report(src, OUTPUT_DIR / "DefaultReportFile.txt", col_precision)
+
 
-    copy2(src, dst)
+def copy_report(src: Path, dst: Path, col_precision: dict | None = None):
+    """
+    Copia un report de GMAT al proyecto, con la precisión por columna si se
+    pide, y le deja al lado su sidecar binario (report_reader.write_sidecar).
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+
+    if col_precision:
+        write_report_precision(src, dst, col_precision)
+    else:
+        copy2(src, dst)
+    write_sidecar(dst)
 
     print("✅ ReportFile copiado a:", dst)
+
+
+def _copy_report_until(src: Path, dst: Path, dur_days: float):
+    """Copia un report quitando las filas posteriores a dur_days (las cabeceras se conservan)."""
+    limit = dur_days + 1e-9
+    with src.open("r", encoding="utf-8") as fin, dst.open("w", encoding="utf-8") as fout:
+        for line in fin:
+            fields = line.split(maxsplit=1)
+            if fields:
+                try:
+                    if float(fields[0]) > limit:
+                        continue
+                except ValueError:
+                    pass   # cabecera
+            fout.write(line)
+
+
+def run_gmat_multi(script_path: Path, scenarios: list[dict],
+                   out_dir: Path = OUTPUT_DIR / "multi",
+                   ctl: RunControl | None = None) -> list[Path]:
+    """
+    Ejecuta un script de varias naves (Transpiler.build_multi_gmat_script) con
+    un solo arranque de GMAT y separa los resultados por escenario en
+    out_dir/<i>/DefaultReportFile.txt. Devuelve esas rutas en orden.
+    """
+    gmat_output = _run_console(script_path, ctl=ctl)
+
+    reports = []
+    for i, sc in enumerate(scenarios):
+        src = gmat_output / sc["report_file"]
+        if not src.exists():
+            raise FileNotFoundError(
+                f"GMAT terminó pero no se generó el report file: {src}"
+            )
+
+        dst = out_dir / str(i) / "DefaultReportFile.txt"
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        _copy_report_until(src, dst, sc["dur_days"])
+        write_sidecar(dst)
+        reports.append(dst)
+
+    print(f"✅ {len(reports)} ReportFiles separados en:", out_dir)
+    return reports
+
+
+# ========== EJECUCIÓN EN PARALELO ==========
+
+def sandbox_script(script_path: Path, job_dir: Path) -> tuple[Path, list[Path]]:
+    """
+    Copia el script a job_dir con cada ReportFile.Filename apuntando a una
+    ruta absoluta dentro de job_dir, para que dos ejecuciones simultáneas no
+    escriban en el mismo <gmat>/output. Devuelve (script, reports). Los
+    reports que ya hubiera ahí se borran: si GMAT no llega a escribirlos, no
+    se tomaría el de una ejecución anterior por el de esta.
+    """
+    job_dir.mkdir(parents=True, exist_ok=True)
+    text = Path(script_path).read_text(encoding="utf-8")
+
+    reports = []
+
+    def redirect(m: re.Match) -> str:
+        report = (job_dir / Path(m.group(2)).name).resolve()
+        reports.append(report)
+        return f"{m.group(1)}'{report}';"
+
+    text = _FILENAME_RE.sub(redirect, text)
+
+    for report in reports:
+        report.unlink(missing_ok=True)
+
+    job_script = job_dir / Path(script_path).name
+    job_script.write_text(text, encoding="utf-8")
+    return job_script, reports
+
+
+def run_gmat_job(script_path: Path, job_dir: Path, ctl: RunControl | None = None) -> list[Path]:
+    """
+    Ejecuta un script aislado en job_dir. Devuelve los reports generados.
+    Cada trabajo queda apuntado en el registro de ejecuciones (telemetry).
+    """
+    ctl = ctl or RunControl()
+    job_script, reports = sandbox_script(script_path, job_dir)
+
+    with RunRecord("gmat_job", script_params(job_script), ctl) as rec:
+        _run_console(job_script, cwd=job_dir, ctl=ctl)
+
+        missing = [r for r in reports if not r.exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"GMAT terminó pero no se generó el report file: {missing[0]}"
+            )
+        rec.reports = reports
+    return reports
+
+
+def start_gmat_job(script_path: Path, job_dir: Path) -> tuple[subprocess.Popen, list[Path]]:
+    """
+    Lanza un script aislado en job_dir sin esperar a que termine (para ir
+    leyendo el report mientras GMAT lo escribe). Devuelve (proceso, reports).
+    """
+    job_script, reports = sandbox_script(script_path, job_dir)
+    proc = subprocess.Popen(
+        [str(find_gmat()), str(job_script.resolve())],
+        cwd=job_dir,
+    )
+    return proc, reports
+
+
+class GmatPool:
+    """
+    Pool de ejecuciones de GMAT en paralelo. Cada trabajo corre en su propio
+    directorio (JOBS_DIR/pool_<pid>_<aleatorio>/<n>_<script>, distinto en
+    cada pool aunque se repitan n y script) y submit() devuelve un Future cuyo
+    resultado es la lista de reports de ese trabajo. Como el trabajo real lo
+    hace el proceso GmatConsole, basta con hilos para lanzarlos y esperarlos.
+    timeout [s] se aplica a cada trabajo por separado; cancel() mata los que
+    estén corriendo y descarta los que no han empezado.
+    """
+
+    def __init__(self, workers: int | None = None, jobs_dir: Path = JOBS_DIR,
+                 timeout: float | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        Path(jobs_dir).mkdir(parents=True, exist_ok=True)
+        self.jobs_dir = Path(tempfile.mkdtemp(prefix=f"pool_{os.getpid()}_", dir=jobs_dir))
+        self.timeout = timeout
+        self._cancel = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def _run(self, script_path: Path, job_dir: Path) -> list[Path]:
+        # El timeout de cada trabajo cuenta desde que empieza, no desde submit()
+        return run_gmat_job(script_path, job_dir, RunControl(self.timeout, self._cancel))
+
+    def submit(self, script_path: Path) -> Future:
+        with self._lock:
+            n = self._count
+            self._count += 1
+        job_dir = self.jobs_dir / f"{n:05d}_{Path(script_path).stem}"
+        return self._executor.submit(self._run, Path(script_path), job_dir)
+
+    def cancel(self):
+        self._cancel.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, script_paths: list[Path]) -> list[Future]:
+        return [self.submit(p) for p in script_paths]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# ========== MODO BATCH: MUCHOS SCRIPTS POR ARRANQUE ==========
+
+# Opción de GmatConsole que ejecuta una lista de scripts (uno por línea).
+# El contrato de ficheros que se espera está en tests/stub_gmat_console.py
+BATCH_ARGS = ["--batch"]
+
+# Lo que escribe la consola al terminar cada script de la lista
+BATCH_DONE_RE = re.compile(r"Mission run completed", re.IGNORECASE)
+
+
+def iter_gmat_batch(script_paths: list[Path], batch_dir: Path | None = None,
+                    done_pattern: re.Pattern = BATCH_DONE_RE,
+                    ctl: RunControl | None = None) -> Iterator[tuple[int, list[Path]]]:
+    """
+    Ejecuta una cola de scripts con un único proceso GmatConsole, para pagar
+    una sola vez el arranque y la carga de ficheros de inicio/efemérides.
+
+    Cada script se aísla en batch_dir/<i>_<script> (como en GmatPool; sin
+    batch_dir, una carpeta nueva en JOBS_DIR) y, en cuanto la consola informa
+    del final de un script, se entrega (i, reports) sin esperar al resto. El
+    script que termina es el que nombra la línea de done_pattern o, si no
+    nombra ninguno, el último que nombró la consola; un aviso que no se puede
+    asignar se ignora. Los que falten se entregan al terminar el proceso.
+    Con ctl, se corta si pasa su timeout o se cancela; si se deja de leer el
+    generador (close(), break), el proceso se mata.
+    """
+    gmat_exe = find_gmat()
+
+    if batch_dir is None:
+        JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        batch_dir = tempfile.mkdtemp(prefix=f"batch_{os.getpid()}_", dir=JOBS_DIR)
+    batch_dir = Path(batch_dir).resolve()
+    batch_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for i, script_path in enumerate(script_paths):
+        job_dir = batch_dir / f"{i:05d}_{Path(script_path).stem}"
+        jobs.append(sandbox_script(Path(script_path), job_dir))
+
+    run_list = batch_dir / "batch.txt"
+    run_list.write_text("\n".join(str(script) for script, _ in jobs) + "\n", encoding="utf-8")
+
+    # La carpeta de cada trabajo identifica su script (con / o con \ en la ruta)
+    job_names = {script.parent.name: i for i, (script, _) in enumerate(jobs)}
+    job_re = re.compile(
+        r"[\\/](" + "|".join(re.escape(name) for name in sorted(job_names, key=len, reverse=True)) + r")[\\/]"
+    ) if jobs else None
+
+    def collect(i: int) -> tuple[int, list[Path]]:
+        reports = jobs[i][1]
+        missing = [r for r in reports if not r.exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"GMAT terminó {jobs[i][0].name} pero no se generó el report file: {missing[0]}"
+            )
+        return i, reports
+
+    proc = subprocess.Popen(
+        [str(gmat_exe), *BATCH_ARGS, str(run_list)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        cwd=batch_dir,
+    )
+    watcher = ProcessWatcher(proc, ctl)
+
+    # Un hilo lee la salida para poder comprobar ctl aunque la consola calle
+    lines = queue.Queue()
+
+    def pump():
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+
+    done = set()
+    current = None
+    try:
+        while True:
+            try:
+                line = lines.get(timeout=0.2)
+            except queue.Empty:
+                watcher.alive()   # RunCancelled/RunTimeout
+                continue
+            if line is None:
+                break
+            watcher.ctl.check()   # si salta, el finally mata el proceso
+
+            m = job_re.search(line) if job_re else None
+            if m:
+                current = job_names[m.group(1)]
+            if current is not None and current not in done and done_pattern.search(line):
+                done.add(current)
+                yield collect(current)
+                current = None
+    finally:
+        # Si sigue vivo (close(), timeout) se mata; si no, solo se espera y se apunta el uso
+        watcher.kill()
+        reader.join(timeout=5)
+        proc.stdout.close()
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+    for i in range(len(jobs)):
+        if i not in done:
+            yield collect(i)
+
+
+def run_gmat_batch(script_paths: list[Path], batch_dir: Path | None = None,
+                   ctl: RunControl | None = None) -> list[list[Path]]:
+    """Versión bloqueante de iter_gmat_batch: reports de cada script, en orden."""
+    results = [None] * len(script_paths)
+    for i, reports in iter_gmat_batch(script_paths, batch_dir, ctl=ctl):
+        results[i] = reports
+    return results
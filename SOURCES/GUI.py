@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QComboBox,
-    QTabWidget, QVBoxLayout, QFormLayout, QPushButton, QListWidget, QAbstractItemView
+    QTabWidget, QVBoxLayout, QFormLayout, QPushButton, QListWidget, QAbstractItemView,
+    QProgressBar
 )
 from PySide6.QtCore import Signal
 from pathlib import Path
@@ -11,6 +12,7 @@ from SOURCES.utils import INPUT_DIR
 
 class MainWindow(QWidget):
     datos_guardados = Signal()
+    escenarios_pedidos = Signal()   # botón "Ejecutar escenarios (CSV)"
 
     def __init__(self):
         super().__init__()
@@ -104,6 +106,8 @@ class MainWindow(QWidget):
         self.gdegree = QLineEdit()
         self.gorder = QLineEdit()
         self.gSTMLimit = QLineEdit()
+        # Vacío o 0: sin STM. Si no, el backend numpy la propaga (grado máx. del campo en sus parciales)
+        self.gSTMLimit.setPlaceholderText("sin STM")
 
         self.drag_atmosphere_model = QComboBox()
         self.drag_atmosphere_model.addItems(["None", "Jacchia Roberts", "MSISE90"])
@@ -114,6 +118,15 @@ class MainWindow(QWidget):
         self.drag_model.setEnabled(False)
         self.drag_model.hide()
 
+        # Coeficiente de arrastre y área (sección esférica)
+        self.drag_cd = QLineEdit()
+        self.drag_cd.setPlaceholderText("2.2")
+        self.drag_area = QLineEdit()
+        self.drag_area.setPlaceholderText("15")
+        for w in (self.drag_cd, self.drag_area):
+            w.setEnabled(False)
+            w.hide()
+
         # Activar / desactivar drag model según atmósfera
         self.drag_atmosphere_model.currentTextChanged.connect(self.on_atmosphere_changed)
         
@@ -134,6 +147,8 @@ class MainWindow(QWidget):
         form_propagate.addRow("STM Limit:", self.gSTMLimit)
         form_propagate.addRow("Atmósfera:", self.drag_atmosphere_model)
         form_propagate.addRow("Modelo de arrastre:", self.drag_model)
+        form_propagate.addRow("Cd:", self.drag_cd)
+        form_propagate.addRow("Área de arrastre [m²]:", self.drag_area)
 
         tab_propagate.setLayout(form_propagate)
 
@@ -200,6 +215,30 @@ class MainWindow(QWidget):
 
         tab_impulsive_burn2.setLayout(form_impulsive_burn2)
 
+        ### Tab ReportFile setup
+
+        tab_reportfile = QWidget()
+        form_reportfile = QFormLayout()
+
+        self.report_step = QLineEdit()
+        self.report_step.setPlaceholderText("Vacío: cada paso del integrador")
+        self.report_max_rows = QLineEdit()
+        self.report_max_rows.setPlaceholderText("Vacío: sin límite")
+        self.report_precision = QLineEdit()
+        self.report_precision.setPlaceholderText("16")
+        self.report_col_precision = QLineEdit()
+        self.report_col_precision.setPlaceholderText("Por ejemplo: X=6, VX=9")
+        self.event_altitudes = QLineEdit()
+        self.event_altitudes.setPlaceholderText("Por ejemplo: 200, 400")
+
+        form_reportfile.addRow("Paso de salida [s]:", self.report_step)
+        form_reportfile.addRow("Filas máximas:", self.report_max_rows)
+        form_reportfile.addRow("Precisión:", self.report_precision)
+        form_reportfile.addRow("Precisión por columna:", self.report_col_precision)
+        form_reportfile.addRow("Altitudes de evento [km]:", self.event_altitudes)
+
+        tab_reportfile.setLayout(form_reportfile)
+
         # Añadir pestañas 
 
         tabs.addTab(tab_general, "General")
@@ -208,6 +247,7 @@ class MainWindow(QWidget):
         tabs.addTab(tab_propagate, "Propagate")
         tabs.addTab(tab_impulsive_burn, "Impulsive Burn")
         tabs.addTab(tab_impulsive_burn2, "Impulsive Burn 2") #AGREGADOOOOOO
+        tabs.addTab(tab_reportfile, "ReportFile")
    
      
     
@@ -219,8 +259,24 @@ class MainWindow(QWidget):
         self.btn_guardar = QPushButton("Guardar datos en TXT")
         self.btn_guardar.clicked.connect(self.guardar_datos)
 
+        # Progreso de la propagación (lo va actualizando el pipeline)
+        self.progreso = QProgressBar()
+        self.progreso.setRange(0, 1000)
+        self.progreso.setFormat("%p%")
+        self.progreso.hide()
+
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.setEnabled(False)
+
+        # Todos los escenarios de DATA/input/escenarios.csv sobre los datos guardados
+        self.btn_escenarios = QPushButton("Ejecutar escenarios (CSV)")
+        self.btn_escenarios.clicked.connect(self.escenarios_pedidos.emit)
+
         layout.addWidget(tabs)
         layout.addWidget(self.btn_guardar)
+        layout.addWidget(self.btn_escenarios)
+        layout.addWidget(self.progreso)
+        layout.addWidget(self.btn_cancelar)
         self.setLayout(layout)
 
         
@@ -289,13 +345,27 @@ class MainWindow(QWidget):
             self.form_spacecraft.addRow("Masa de combustible [kg]:", self.fuel_mass_input)
             self.form_spacecraft.addRow("Formato de fecha:", self.epoch_input)
     
+    def mostrar_progreso(self, fraccion: float):
+        self.progreso.show()
+        self.progreso.setValue(int(fraccion * 1000))
+
+    def pipeline_en_marcha(self):
+        self.progreso.setValue(0)
+        self.btn_cancelar.setEnabled(True)
+        self.btn_escenarios.setEnabled(False)
+
+    def pipeline_terminado(self, *_):
+        self.btn_cancelar.setEnabled(False)
+        self.btn_escenarios.setEnabled(True)
+
     def on_atmosphere_changed(self, text):
-        if text != "None":
-            self.drag_model.setEnabled(True)
-            self.drag_model.show()
-        else:
-            self.drag_model.setEnabled(False)
-            self.drag_model.hide()
+        for w in (self.drag_model, self.drag_cd, self.drag_area):
+            if text != "None":
+                w.setEnabled(True)
+                w.show()
+            else:
+                w.setEnabled(False)
+                w.hide()
 
 
     # ==========================================================
@@ -357,6 +427,8 @@ class MainWindow(QWidget):
         datos.append(f"STM Limit: {self.gSTMLimit.text()}")
         datos.append(f"Atmosfera: {self.drag_atmosphere_model.currentText()}")
         datos.append(f"Modelo de arrastre: {self.drag_model.currentText()}")
+        datos.append(f"Cd: {self.drag_cd.text()}")
+        datos.append(f"Area arrastre [m2]: {self.drag_area.text()}")
 
         # --- IMPULSIVE BURN ---
         datos.append("\n=== IMPULSIVE BURN ===")
@@ -381,6 +453,11 @@ class MainWindow(QWidget):
         # --- REPORTFILE ---
         datos.append("\n=== REPORTFILE ===")
         datos.append("Nombre del archivo de reporte: ReportFile")
+        datos.append(f"Paso de salida [s]: {self.report_step.text()}")
+        datos.append(f"Filas maximas: {self.report_max_rows.text()}")
+        datos.append(f"Precision: {self.report_precision.text()}")
+        datos.append(f"Precision columnas: {self.report_col_precision.text()}")
+        datos.append(f"Altitudes evento [km]: {self.event_altitudes.text()}")
 
         
         # --- GUARDAR ---
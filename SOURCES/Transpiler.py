@@ -1,5 +1,7 @@
 from pathlib import Path
 from datetime import datetime
+from itertools import product
+import random
 import subprocess
 import sys
 from SOURCES.utils import INPUT_DIR, GMAT_DIR, OUTPUT_DIR
@@ -7,6 +9,8 @@ from SOURCES.utils import INPUT_DIR, GMAT_DIR, OUTPUT_DIR
 
 DATA_FILE   = INPUT_DIR / "datos_guardados.txt"
 SCRIPT_PATH = GMAT_DIR / "demo.script"
+SWEEP_DIR   = GMAT_DIR / "sweep"
+MULTI_SCRIPT_PATH = GMAT_DIR / "multi.script"
 
 
 
@@ -37,6 +41,21 @@ def map_coord_system(central_body_en: str, sistema_ref: str) -> str:
     return f"{central_body_en}{suffix}"
 
 
+# Modelo gravitatorio de la GUI -> fichero de coeficientes de GMAT (data/gravity/earth)
+GRAVITY_FILES = {
+    "JGM-2": "JGM2.cof",
+    "JGM-3": "JGM3.cof",
+    "EGM-96": "EGM96.cof",
+}
+
+# Atmósfera de la GUI -> AtmosphereModel de GMAT
+ATMOSPHERE_MODELS = {
+    "Jacchia Roberts": "JacchiaRoberts",
+    "JacchiaRoberts": "JacchiaRoberts",
+    "MSISE90": "MSISE90",
+}
+
+
 def map_time_format(fmt: str) -> str:
     mapping = {
         "UTC": "UTCGregorian",
@@ -47,6 +66,9 @@ def map_time_format(fmt: str) -> str:
 
 
 def to_float(value: str, default: float = 0.0) -> float:
+    # Los barridos pasan números directamente, no solo texto de la GUI
+    if isinstance(value, (int, float)):
+        return float(value)
     try:
         v = value.strip().replace(",", ".")
         return float(v)
@@ -82,6 +104,7 @@ def parse_gui_txt(path: Path) -> dict:
     Lee datos_guardados.txt generado por la GUI y devuelve
     un diccionario con secciones:
       general, spacecraft, time, propagate, impulsive_burn, reportfile
+    (y una impulsive_burn_N por cada "=== IMPULSIVE BURN N ===" que aparezca)
     """
     config = {
         "general": {},
@@ -114,10 +137,14 @@ def parse_gui_txt(path: Path) -> dict:
                     current_section = "time"
                 elif "PROPAGATE" in line:
                     current_section = "propagate"
-                elif "IMPULSIVE BURN 2" in line:          # AGREGADOOOO
-                    current_section = "impulsive_burn_2"
                 elif "IMPULSIVE BURN" in line:
-                    current_section = "impulsive_burn"
+                    # "IMPULSIVE BURN" -> impulsive_burn, "IMPULSIVE BURN N" -> impulsive_burn_N
+                    n = line.strip("= ").split()[-1]
+                    if n.isdigit() and n != "1":
+                        current_section = f"impulsive_burn_{n}"
+                    else:
+                        current_section = "impulsive_burn"
+                    config.setdefault(current_section, {})
                 elif "REPORTFILE" in line:
                     current_section = "reportfile"
                 else:
@@ -175,13 +202,205 @@ def map_report_variable(label: str, sat_name: str) -> str | None:
     # Si no lo tenemos mapeado todavía, devolvemos None
     return None
 
-def build_gmat_script(cfg: dict, script_path: Path):
+def normalize_epoch(epoch: str) -> str:
+    """
+    Convierte lo que viene de la GUI en un string tipo:
+    '08 Dec 2024 12:00:00.000'
+    Soporta:
+    - '08 Dec 2024'
+    - '08/12/2024'
+    - '08 Dec 2024 10:30:00'
+    - '08/12/2024 10:30:00'
+    Si falla, devuelve una fecha por defecto.
+    """
+    s = epoch.strip()
+    if not s:
+        return "01 Jan 2030 12:00:00.000"
+
+    # Caso con hora incluida
+    if ":" in s:
+        for fmt in ("%d %b %Y %H:%M:%S", "%d/%m/%Y %H:%M:%S"):
+            try:
+                dt = datetime.strptime(s, fmt)
+                return dt.strftime("%d %b %Y %H:%M:%S.000")
+            except ValueError:
+                pass
+        if not s.endswith(".000"):
+            return s + ".000"
+        return s
+
+    # Solo fecha
+    for fmt in ("%d %b %Y", "%d/%m/%Y"):
+        try:
+            dt = datetime.strptime(s, fmt)
+            return dt.strftime("%d %b %Y 12:00:00.000")
+        except ValueError:
+            pass
+
+    return "01 Jan 2030 12:00:00.000"
+
+
+def parse_date_only(s: str):
+    s = s.strip()
+    if not s:
+        return None
+    for fmt in ("%d %b %Y", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+# Columnas del report, en orden (sufijo del parámetro GMAT)
+REPORT_COLUMNS = ["ElapsedDays", "X", "Y", "Z", "VX", "VY", "VZ"]
+
+
+def parse_column_precision(text: str, default: int) -> dict:
+    """
+    'X=6, VX=9' -> {'ElapsedDays': default, 'X': 6, ..., 'VX': 9, ...}.
+    Devuelve {} si no se pide precisión por columna.
+    """
+    requested = {}
+    for item in str(text or "").replace(";", ",").split(","):
+        if "=" not in item:
+            continue
+        col, value = item.split("=", 1)
+        col = col.strip().split(".")[-1]   # vale 'Sat.X' o 'X'
+        digits = int(positive_or_default(value, default))
+        if col in REPORT_COLUMNS:
+            requested[col] = digits
+
+    if not requested:
+        return {}
+    return {col: requested.get(col, default) for col in REPORT_COLUMNS}
+
+
+def parse_event_altitudes(text: str) -> tuple:
+    """'200, 400' -> (200.0, 400.0): altitudes [km] cuyos cruces se buscan como eventos."""
+    levels = set()
+    for item in str(text or "").replace(";", ",").split(","):
+        h = to_float(item, -1.0)
+        if h > 0:
+            levels.add(h)
+    return tuple(sorted(levels))
+
+
+def _resolve_burn(ib: dict, central_es: str, coord_system: str, dur_days: float) -> dict:
+    """Valores tipados de una sección IMPULSIVE BURN (con los defaults ya aplicados)."""
+    coord_raw = ib.get("Sistema de coordenadas", "Local").strip()
+    origin_es = ib.get("Origen", central_es)
+    axes      = ib.get("Axes", "VNB").strip()
+
+    dv_1 = to_float(ib.get("Delta V Element 1", "0"), 0.0)
+    dv_2 = to_float(ib.get("Delta V Element 2", "0"), 0.0)
+    dv_3 = to_float(ib.get("Delta V Element 3", "0"), 0.0)
+
+    has_burn = (abs(dv_1) + abs(dv_2) + abs(dv_3)) > 0.0
+
+    burn_time_str = str(ib.get("Tiempo burn", "")).strip()
+    t_burn = None
+    if has_burn and burn_time_str != "":
+        t_burn = to_float(burn_time_str, 0.0)
+        # Acotamos entre 0 y dur_days
+        if t_burn < 0.0:
+            t_burn = 0.0
+        if t_burn > dur_days:
+            t_burn = dur_days
+
+    if coord_raw == "Local":
+        coord_gmat = coord_system
+    else:
+        coord_gmat = coord_raw
+
+    return {
+        "has_burn": has_burn,
+        "t": t_burn,
+        "coord": coord_gmat,
+        "origin": map_body(origin_es),
+        "axes": axes,
+        "dv_1": dv_1,
+        "dv_2": dv_2,
+        "dv_3": dv_3,
+    }
+
+
+def _burn_sections(cfg: dict) -> list:
+    """
+    Secciones de burn en orden: impulsive_burn, impulsive_burn_2, ..._N y,
+    después, la lista cfg["burns"] (mismas claves) si se construye por código.
+    """
+    numbered = sorted(
+        (int(name.rsplit("_", 1)[1]), name)
+        for name in cfg
+        if name.startswith("impulsive_burn_") and name.rsplit("_", 1)[1].isdigit()
+    )
+    sections = [cfg.get("impulsive_burn", {})]
+    sections += [cfg[name] for _, name in numbered]
+    sections += list(cfg.get("burns", []))
+    return sections
+
+
+# Ejes inerciales: dos burns en el mismo instante y marco se pueden sumar.
+# En VNB/LVLH el marco depende de la velocidad, que cambia con el primer burn.
+INERTIAL_AXES = {"MJ2000Eq", "MJ2000Ec", "ICRF"}
+
+# Dos eventos a menos de esto (días, ~0.1 ms) son el mismo instante
+EVENT_TOL_DAYS = 1e-9
+
+
+def schedule_maneuvers(burns: list, dur_days: float, tol: float = EVENT_TOL_DAYS) -> list:
+    """
+    Ordena los burns por tiempo, los acota a [0, dur_days] y fusiona los
+    coincidentes (mismo instante, mismo sistema/origen y ejes inerciales)
+    sumando sus delta-V. Devuelve las maniobras finales que irán al script.
+    """
+    if dur_days <= 0.0:
+        return []
+
+    maneuvers = []
+    for b in sorted(burns, key=lambda b: b["t"]):
+        t = max(0.0, min(dur_days, b["t"]))
+        m = {
+            "t": t,
+            "coord": b["coord"],
+            "origin": b["origin"],
+            "axes": b["axes"],
+            "dv_1": b["dv_1"],
+            "dv_2": b["dv_2"],
+            "dv_3": b["dv_3"],
+        }
+
+        prev = maneuvers[-1] if maneuvers else None
+        if (
+            prev is not None
+            and abs(t - prev["t"]) <= tol
+            and m["axes"] in INERTIAL_AXES
+            and (prev["coord"], prev["origin"], prev["axes"]) == (m["coord"], m["origin"], m["axes"])
+        ):
+            prev["dv_1"] += m["dv_1"]
+            prev["dv_2"] += m["dv_2"]
+            prev["dv_3"] += m["dv_3"]
+            continue
+
+        maneuvers.append(m)
+
+    return maneuvers
+
+
+def resolve_config(cfg: dict) -> dict:
+    """
+    Aplica a la config de parse_gui_txt los mismos defaults que usa el
+    transpiler (to_float, positive_or_default, normalize_epoch, ...) y
+    devuelve un diccionario plano con los valores ya tipados.
+
+    Es la entrada de render_script y la base de los barridos (sweeps):
+    cada variante solo cambia unos pocos de estos campos.
+    """
     gen = cfg["general"]
     sc  = cfg["spacecraft"]
     tm  = cfg["time"]
     pr  = cfg["propagate"]
-    ib1 = cfg["impulsive_burn"]
-    ib2 = cfg.get("impulsive_burn_2", {})
 
     # ========== GENERAL ==========
     sat_name_raw = gen.get("Nombre nave", "").strip()
@@ -198,63 +417,13 @@ def build_gmat_script(cfg: dict, script_path: Path):
     else:
         axes_type = "MJ2000Eq"   # ecuatorial por defecto
 
-
     time_fmt    = gen.get("Formato de tiempo", "UTC")
     date_format = map_time_format(time_fmt)
 
     # ========== TIEMPO ==========
-
     start_raw = tm.get("Fecha inicio", "").strip()
     end_raw   = tm.get("Fecha final", "").strip()
 
-    def normalize_epoch(epoch: str) -> str:
-        """
-        Convierte lo que viene de la GUI en un string tipo:
-        '08 Dec 2024 12:00:00.000'
-        Soporta:
-        - '08 Dec 2024'
-        - '08/12/2024'
-        - '08 Dec 2024 10:30:00'
-        - '08/12/2024 10:30:00'
-        Si falla, devuelve una fecha por defecto.
-        """
-        s = epoch.strip()
-        if not s:
-            return "01 Jan 2030 12:00:00.000"
-
-        # Caso con hora incluida
-        if ":" in s:
-            for fmt in ("%d %b %Y %H:%M:%S", "%d/%m/%Y %H:%M:%S"):
-                try:
-                    dt = datetime.strptime(s, fmt)
-                    return dt.strftime("%d %b %Y %H:%M:%S.000")
-                except ValueError:
-                    pass
-            if not s.endswith(".000"):
-                return s + ".000"
-            return s
-
-        # Solo fecha
-        for fmt in ("%d %b %Y", "%d/%m/%Y"):
-            try:
-                dt = datetime.strptime(s, fmt)
-                return dt.strftime("%d %b %Y 12:00:00.000")
-            except ValueError:
-                pass
-
-        return "01 Jan 2030 12:00:00.000"
-
-    def parse_date_only(s: str):
-        s = s.strip()
-        if not s:
-            return None
-        for fmt in ("%d %b %Y", "%d/%m/%Y"):
-            try:
-                return datetime.strptime(s, fmt)
-            except ValueError:
-                pass
-        return None
-
     epoch_str = normalize_epoch(start_raw)
 
     start_dt = parse_date_only(start_raw)
@@ -265,36 +434,13 @@ def build_gmat_script(cfg: dict, script_path: Path):
     else:
         dur_days = 1.0   # por defecto
 
-    
     # ========== SPACECRAFT ==========
-
     coord_type = sc.get("Sistema de coordenadas", "Cartesianas").strip()
 
-    # Cartesianas
-    x  = to_float(sc.get("x",  "7000"), default=7000.0)
-    y  = to_float(sc.get("y",  "0"),    default=0.0)
-    z  = to_float(sc.get("z",  "0"),    default=0.0)
-    vx = to_float(sc.get("vx", "0"),    default=0.0)
-    vy = to_float(sc.get("vy", "7.5"),  default=7.5)
-    vz = to_float(sc.get("vz", "0"),    default=0.0)
-
-    # Keplerianas
-    sma  = to_float(sc.get("SMA",  "7000"), default=7000.0)
-    ecc  = to_float(sc.get("ECC",  "0.0"),  default=0.0)
-    inc  = to_float(sc.get("INC",  "0.0"),  default=0.0)
-    raan = to_float(sc.get("RAAN", "0.0"),  default=0.0)
-    aop  = to_float(sc.get("AOP",  "0.0"),  default=0.0)
-    ta   = to_float(sc.get("TA",   "0.0"),  default=0.0)
-
     # ========== PROPAGATE ==========
     integ_type = pr.get("Tipo de integrador", "RungeKutta89").strip() or "RungeKutta89"
 
-    init_step = positive_or_default(pr.get("Tamano de paso inicial", "10"),   10.0)
-    accuracy  = positive_or_default(pr.get("Precision (accuracy)", "1e-4"),   1e-4)
-    min_step  = positive_or_default(pr.get("Paso minimo", "0.01"),            0.01)
-    max_step  = positive_or_default(pr.get("Paso maximo", "300"),             300.0)
-
-    max_step_attempts_str = pr.get("Intentos max. paso", "50")
+    max_step_attempts_str = str(pr.get("Intentos max. paso", "50"))
     try:
         max_step_attempts = int(float(max_step_attempts_str.replace(",", ".")))
         if max_step_attempts <= 0:
@@ -303,215 +449,441 @@ def build_gmat_script(cfg: dict, script_path: Path):
         max_step_attempts = 50
 
     fm_central_es = pr.get("Cuerpo central", gen.get("Cuerpo central", "Tierra"))
-    fm_central_en = map_body(fm_central_es)
-
-    # ========== IMPULSIVE BURN 1 ==========
-    ib1_coord_raw = ib1.get("Sistema de coordenadas", "Local").strip()
-    ib1_origin_es = ib1.get("Origen", central_es)
-    ib1_axes      = ib1.get("Axes", "VNB").strip()
-
-    dv1_1 = to_float(ib1.get("Delta V Element 1", "0"), 0.0)
-    dv1_2 = to_float(ib1.get("Delta V Element 2", "0"), 0.0)
-    dv1_3 = to_float(ib1.get("Delta V Element 3", "0"), 0.0)
 
-    has_burn1 = (abs(dv1_1) + abs(dv1_2) + abs(dv1_3)) > 0.0
+    # Campo gravitatorio: grado < 2 (o sin modelo) es masa puntual
+    gravity_file = GRAVITY_FILES.get(str(pr.get("Modelo gravitatorio", "None")).strip(), "")
+    gravity_degree = int(max(0.0, to_float(pr.get("Grado", "0"), 0.0)))
+    gravity_order = min(int(max(0.0, to_float(pr.get("Orden", "0"), 0.0))), gravity_degree)
+    if gravity_file and gravity_degree >= 2 and map_body(fm_central_es) != "Earth":
+        print(f"⚠ Los modelos gravitatorios son de la Tierra; con {map_body(fm_central_es)} se usa masa puntual")
+    if not gravity_file or gravity_degree < 2 or map_body(fm_central_es) != "Earth":
+        gravity_file, gravity_degree, gravity_order = "", 0, 0
+
+    # STM: vacío o 0 es sin STM; si no, grado máximo del campo en sus parciales
+    stm_limit = int(max(0.0, to_float(pr.get("STM Limit", "0"), 0.0)))
+
+    # Arrastre: solo con atmósfera y alrededor de la Tierra; siempre sección esférica
+    drag_atmosphere = ATMOSPHERE_MODELS.get(str(pr.get("Atmosfera", "None")).strip(), "")
+    if drag_atmosphere and map_body(fm_central_es) != "Earth":
+        print(f"⚠ Las atmósferas son de la Tierra; con {map_body(fm_central_es)} no hay arrastre")
+        drag_atmosphere = ""
+    if drag_atmosphere and str(pr.get("Modelo de arrastre", "Spherical")).strip() == "SPADFile":
+        print("⚠ Modelo de arrastre SPADFile no soportado; se usa Spherical")
+
+    # ========== REPORTFILE ==========
+    rf = cfg.get("reportfile", {})
+    report_precision = int(positive_or_default(rf.get("Precision", "16"), 16.0))
+    report_col_precision = parse_column_precision(rf.get("Precision columnas", ""), report_precision)
+    report_max_rows = int(max(0.0, to_float(rf.get("Filas maximas", "0"), 0.0)))
+
+    # ========== IMPULSIVE BURNS ==========
+    # Solo cuentan los burns con delta-V y tiempo; se ordenan y se fusionan
+    burns = [_resolve_burn(ib, central_es, coord_system, dur_days) for ib in _burn_sections(cfg)]
+    burns = [b for b in burns if b["has_burn"] and b["t"] is not None]
+
+    return {
+        "sat_name": sat_name,
+        "central_en": central_en,
+        "coord_system": coord_system,
+        "axes_type": axes_type,
+        "date_format": date_format,
+        "epoch_str": epoch_str,
+        "dur_days": dur_days,
+
+        "coord_type": coord_type,
+        # Cartesianas
+        "x":  to_float(sc.get("x",  "7000"), default=7000.0),
+        "y":  to_float(sc.get("y",  "0"),    default=0.0),
+        "z":  to_float(sc.get("z",  "0"),    default=0.0),
+        "vx": to_float(sc.get("vx", "0"),    default=0.0),
+        "vy": to_float(sc.get("vy", "7.5"),  default=7.5),
+        "vz": to_float(sc.get("vz", "0"),    default=0.0),
+        # Keplerianas
+        "sma":  to_float(sc.get("SMA",  "7000"), default=7000.0),
+        "ecc":  to_float(sc.get("ECC",  "0.0"),  default=0.0),
+        "inc":  to_float(sc.get("INC",  "0.0"),  default=0.0),
+        "raan": to_float(sc.get("RAAN", "0.0"),  default=0.0),
+        "aop":  to_float(sc.get("AOP",  "0.0"),  default=0.0),
+        "ta":   to_float(sc.get("TA",   "0.0"),  default=0.0),
+        # Solo se usan con arrastre (mismos defaults que GMAT)
+        "dry_mass":  positive_or_default(sc.get("Masa seca", "850"), 850.0),
+        "cd":        positive_or_default(pr.get("Cd", "2.2"), 2.2),
+        "drag_area": positive_or_default(pr.get("Area arrastre [m2]", "15"), 15.0),
+
+        "integ_type": integ_type,
+        "init_step": positive_or_default(pr.get("Tamano de paso inicial", "10"),   10.0),
+        "accuracy":  positive_or_default(pr.get("Precision (accuracy)", "1e-4"),   1e-4),
+        "min_step":  positive_or_default(pr.get("Paso minimo", "0.01"),            0.01),
+        "max_step":  positive_or_default(pr.get("Paso maximo", "300"),             300.0),
+        "max_step_attempts": max_step_attempts,
+        "fm_central_en": map_body(fm_central_es),
+        "gravity_file": gravity_file,
+        "gravity_degree": gravity_degree,
+        "gravity_order": gravity_order,
+        "drag_atmosphere": drag_atmosphere,
+        # Solo el backend numpy propaga la STM; en GMAT es StmLimit del campo
+        "stm_limit": stm_limit,
+
+        "maneuvers": schedule_maneuvers(burns, dur_days),
+
+        # ReportFile (un nombre distinto por variante evita pisar resultados)
+        "report_file": "DefaultReportFile.txt",
+        # Paso de salida fijo [s] y nº máximo de filas (0: cadencia del integrador)
+        "report_step": max(0.0, to_float(rf.get("Paso de salida [s]", "0"), 0.0)),
+        "report_max_rows": report_max_rows,
+        # GMAT solo admite una precisión por ReportFile: la mayor de las pedidas.
+        # La precisión por columna se aplica al copiar el report (GMAT_exec).
+        "report_precision": max([report_precision, *report_col_precision.values()]),
+        "report_col_precision": report_col_precision,
+        # Solo para la búsqueda de eventos (SOURCES.events), no para GMAT
+        "event_altitudes": parse_event_altitudes(rf.get("Altitudes evento [km]", "")),
+    }
 
-    ib1_burn_time_str = ib1.get("Tiempo burn", "").strip()
-    t_burn1 = None
-    if has_burn1 and ib1_burn_time_str != "":
-        t_burn1 = to_float(ib1_burn_time_str, 0.0)
-        # Acotamos entre 0 y dur_days
-        if t_burn1 < 0.0:
-            t_burn1 = 0.0
-        if t_burn1 > dur_days:
-            t_burn1 = dur_days
 
-    if ib1_coord_raw == "Local":
-        ib1_coord_gmat = coord_system
-    else:
-        ib1_coord_gmat = ib1_coord_raw
+def compile_mission_sequence(events: list, dur_days: float, tol: float = EVENT_TOL_DAYS) -> list:
+    """
+    Compila una lista de eventos [(t, maniobra), ...] en la secuencia de misión
+    más corta posible. Pasos:
+      ("propagate", t)        propagar hasta t [días]
+      ("maneuver", maniobra)  aplicar una maniobra
+      ("report", quien)       Report explícito (quien=None: todas las naves)
+
+    - Eventos a menos de tol se agrupan en una única parada.
+    - No se emiten Propagate de longitud cero.
+    - El ReportFile ya escribe el primer y el último estado de cada Propagate
+      (antes y después de cada burn), así que solo hace falta un Report
+      explícito al principio si se maniobra en t=0 (o no se propaga nada)
+      y al final si la última maniobra no va seguida de un Propagate.
+    """
+    plan = []
+    current_t = 0.0
+    pending = []   # maniobras desde el último Propagate
 
-    ib1_origin_en = map_body(ib1_origin_es)
+    if dur_days > 0.0:
+        for t, maneuver in sorted(events, key=lambda e: e[0]):
+            t = max(0.0, min(dur_days, t))
+            if t - current_t > tol:
+                plan.append(("propagate", t))
+                current_t = t
+                pending = []
+            plan.append(("maneuver", maneuver))
+            pending.append(maneuver)
 
-    # ========== IMPULSIVE BURN 2 ==========
-    ib2_coord_raw = ib2.get("Sistema de coordenadas", "Local").strip()
-    ib2_origin_es = ib2.get("Origen", central_es)
-    ib2_axes      = ib2.get("Axes", "VNB").strip()
+        # Propagación final
+        if dur_days - current_t > tol:
+            plan.append(("propagate", dur_days))
+            pending = []
 
-    dv2_1 = to_float(ib2.get("Delta V Element 1", "0"), 0.0)
-    dv2_2 = to_float(ib2.get("Delta V Element 2", "0"), 0.0)
-    dv2_3 = to_float(ib2.get("Delta V Element 3", "0"), 0.0)
+    # Estado inicial: solo falta si la secuencia no empieza propagando
+    if not plan or plan[0][0] != "propagate":
+        plan.insert(0, ("report", None))
+    if pending:
+        plan.append(("report", pending))
 
-    has_burn2 = (abs(dv2_1) + abs(dv2_2) + abs(dv2_3)) > 0.0
+    return plan
 
-    ib2_burn_time_str = ib2.get("Tiempo burn", "").strip()
-    t_burn2 = None
-    if has_burn2 and ib2_burn_time_str != "":
-        t_burn2 = to_float(ib2_burn_time_str, 0.0)
-        if t_burn2 < 0.0:
-            t_burn2 = 0.0
-        if t_burn2 > dur_days:
-            t_burn2 = dur_days
 
-    if ib2_coord_raw == "Local":
-        ib2_coord_gmat = coord_system
-    else:
-        ib2_coord_gmat = ib2_coord_raw
+def _mission_plan(p: dict) -> list:
+    """Secuencia de misión de una nave; las maniobras van por índice (0..N-1)."""
+    events = [(m["t"], k) for k, m in enumerate(p["maneuvers"])]
+    return compile_mission_sequence(events, p["dur_days"])
 
-    ib2_origin_en = map_body(ib2_origin_es)
 
+def report_step_days(p: dict, plan: list) -> float | None:
+    """
+    Paso de salida del report en días, o None para escribir cada paso del
+    integrador. Con un máximo de filas, el paso se ajusta para no pasarse
+    (cada tramo y cada maniobra añaden alguna fila además de las del paso).
+    """
+    step = p["report_step"] / 86400.0
+    if p["report_max_rows"] > 0 and p["dur_days"] > 0.0:
+        n_extra = 1 + sum(1 for kind, _ in plan if kind != "report")
+        step = max(step, p["dur_days"] / max(1, p["report_max_rows"] - n_extra))
+    return step if step > 0.0 else None
+
+
+def _template_key(p: dict, plan: list) -> tuple:
+    """Todo lo que cambia la *forma* del script (no sus valores)."""
+    return (
+        p["central_en"] != "Earth",
+        p["coord_type"] == "Cartesianas",
+        len(p["maneuvers"]),
+        tuple(kind if kind != "maneuver" else arg for kind, arg in plan),
+        report_step_days(p, plan) is not None,
+        p["gravity_degree"] > 0,
+        bool(p["drag_atmosphere"]),
+        p["gravity_degree"] > 0 and p["stm_limit"] > 0,
+    )
 
-        # ========== CONSTRUIR SCRIPT ==========
-    lines = []
 
-    # --- CoordinateSystem SOLO si NO es la Tierra ---
-    if central_en != "Earth":
-        lines.append(f"Create CoordinateSystem {coord_system};")
-        lines.append(f"{coord_system}.Origin = {central_en};")
-        lines.append(f"{coord_system}.Axes   = {axes_type};")
-        lines.append("")  # estética
+# Nombres de objetos GMAT del script de una sola nave
+_OBJECT_NAMES = {
+    "fm_name": "FM",
+    "prop_name": "Prop",
+    "report_name": "DefaultReportFile",
+}
+
+
+def _maneuver_values(p: dict, suffix: str = "") -> dict:
+    """Campos m<k>_* y burn<k>_name de la plantilla para las maniobras de p."""
+    values = {}
+    for k, m in enumerate(p["maneuvers"]):
+        values[f"burn{k}_name"] = f"ImpBurn{k + 1}{suffix}"
+        for field in ("coord", "origin", "axes", "dv_1", "dv_2", "dv_3"):
+            values[f"m{k}_{field}"] = m[field]
+    return values
+
+
+# ---------- Secciones de plantilla (campos {nombre}, llaves GMAT escapadas) ----------
+
+def _coord_system_lines() -> list:
+    return [
+        "Create CoordinateSystem {coord_system};",
+        "{coord_system}.Origin = {central_en};",
+        "{coord_system}.Axes   = {axes_type};",
+        "",  # estética
+    ]
+
+
+def _spacecraft_lines(p: dict) -> list:
+    lines = [
+        "{sat_name}.DateFormat = {date_format};",
+        "{sat_name}.Epoch = '{epoch_str}';",
+        "{sat_name}.CoordinateSystem = {coord_system};",
+    ]
+
+    if p["coord_type"] == "Cartesianas":
+        lines.append("{sat_name}.DisplayStateType = Cartesian;")
+        lines.append("{sat_name}.X  = {x};")
+        lines.append("{sat_name}.Y  = {y};")
+        lines.append("{sat_name}.Z  = {z};")
+        lines.append("{sat_name}.VX = {vx};")
+        lines.append("{sat_name}.VY = {vy};")
+        lines.append("{sat_name}.VZ = {vz};")
+    else:
+        lines.append("{sat_name}.DisplayStateType = Keplerian;")
+        lines.append("{sat_name}.SMA  = {sma};")
+        lines.append("{sat_name}.ECC  = {ecc};")
+        lines.append("{sat_name}.INC  = {inc};")
+        lines.append("{sat_name}.RAAN = {raan};")
+        lines.append("{sat_name}.AOP  = {aop};")
+        lines.append("{sat_name}.TA   = {ta};")
+
+    if p["drag_atmosphere"]:
+        lines.append("{sat_name}.DryMass  = {dry_mass};")
+        lines.append("{sat_name}.Cd       = {cd};")
+        lines.append("{sat_name}.DragArea = {drag_area};")
 
+    lines.append("")
+    return lines
+
+
+def _force_model_lines(p: dict) -> list:
+    lines = [
+        "{fm_name}.CentralBody   = {fm_central_en};",
+        "{fm_name}.PrimaryBodies = {{{fm_central_en}}};",
+    ]
+    if p["gravity_degree"] > 0:
+        lines.append("{fm_name}.GravityField.{fm_central_en}.Degree = {gravity_degree};")
+        lines.append("{fm_name}.GravityField.{fm_central_en}.Order  = {gravity_order};")
+        lines.append("{fm_name}.GravityField.{fm_central_en}.PotentialFile = '{gravity_file}';")
+        if p["stm_limit"] > 0:
+            lines.append("{fm_name}.GravityField.{fm_central_en}.StmLimit = {stm_limit};")
+    if p["drag_atmosphere"]:
+        lines.append("{fm_name}.Drag.AtmosphereModel = {drag_atmosphere};")
+        lines.append("{fm_name}.Drag.DragModel = 'Spherical';")
+    else:
+        lines.append("{fm_name}.Drag = None;")
+    lines += [
+        "{fm_name}.SRP  = Off;",
+        "",
+    ]
+    return lines
+
+
+def _propagator_lines() -> list:
+    return [
+        "{prop_name}.Type            = {integ_type};",
+        "{prop_name}.FM              = {fm_name};",
+        "{prop_name}.InitialStepSize = {init_step};",
+        "{prop_name}.Accuracy        = {accuracy};",
+        "{prop_name}.MinStep         = {min_step};",
+        "{prop_name}.MaxStep         = {max_step};",
+        "{prop_name}.MaxStepAttempts = {max_step_attempts};",
+        "",
+    ]
+
+
+def _burn_lines(k: int) -> list:
+    return [
+        f"{{burn{k}_name}}.CoordinateSystem = {{m{k}_coord}};",
+        f"{{burn{k}_name}}.Origin          = {{m{k}_origin}};",
+        f"{{burn{k}_name}}.Axes            = {{m{k}_axes}};",
+        f"{{burn{k}_name}}.Element1        = {{m{k}_dv_1}};",
+        f"{{burn{k}_name}}.Element2        = {{m{k}_dv_2}};",
+        f"{{burn{k}_name}}.Element3        = {{m{k}_dv_3}};",
+        f"{{burn{k}_name}}.DecrementMass   = false;",
+        "",
+    ]
+
+
+def _report_file_lines(auto_write: bool = True) -> list:
+    """
+    Con auto_write, el ReportFile escribe cada paso del integrador (.Add).
+    Sin él, solo escriben los Report de la secuencia (paso de salida fijo).
+    """
+    lines = [
+        "{report_name}.Filename = '{report_file}';",
+        "{report_name}.WriteHeaders = true;",
+        "{report_name}.Precision = {report_precision};",
+    ]
+    if auto_write:
+        lines.append(
+            "{report_name}.Add = "
+            "{{{sat_name}.ElapsedDays, {sat_name}.X, {sat_name}.Y, {sat_name}.Z, "
+            "{sat_name}.VX, {sat_name}.VY, {sat_name}.VZ}};"
+        )
+    lines.append("")
+    return lines
 
 
-    # Objetos
-    lines.append(f"Create Spacecraft {sat_name};")
-    lines.append("Create ForceModel FM;")
-    lines.append("Create Propagator Prop;")
-    if has_burn1:
-        lines.append("Create ImpulsiveBurn ImpBurn1;")
-    if has_burn2:
-        lines.append("Create ImpulsiveBurn ImpBurn2;")
-    lines.append("Create ReportFile DefaultReportFile;")
-    lines.append("")
-    
+_REPORT_LINE = (
+    "Report {report_name} "
+    "{sat_name}.ElapsedDays {sat_name}.X {sat_name}.Y {sat_name}.Z "
+    "{sat_name}.VX {sat_name}.VY {sat_name}.VZ;"
+)
 
-    # Spacecraft
-    lines.append(f"{sat_name}.DateFormat = {date_format};")
-    lines.append(f"{sat_name}.Epoch = '{epoch_str}';")
-    lines.append(f"{sat_name}.CoordinateSystem = {coord_system};")
-
-    if coord_type == "Cartesianas":
-        lines.append(f"{sat_name}.DisplayStateType = Cartesian;")
-        lines.append(f"{sat_name}.X  = {x};")
-        lines.append(f"{sat_name}.Y  = {y};")
-        lines.append(f"{sat_name}.Z  = {z};")
-        lines.append(f"{sat_name}.VX = {vx};")
-        lines.append(f"{sat_name}.VY = {vy};")
-        lines.append(f"{sat_name}.VZ = {vz};")
-    else:
-        lines.append(f"{sat_name}.DisplayStateType = Keplerian;")
-        lines.append(f"{sat_name}.SMA  = {sma};")
-        lines.append(f"{sat_name}.ECC  = {ecc};")
-        lines.append(f"{sat_name}.INC  = {inc};")
-        lines.append(f"{sat_name}.RAAN = {raan};")
-        lines.append(f"{sat_name}.AOP  = {aop};")
-        lines.append(f"{sat_name}.TA   = {ta};")
 
-    lines.append("")
+def _sequence_lines(plan: list, propagate, maneuver, report, step: str | None = None) -> list:
+    """
+    Traduce el plan de compile_mission_sequence a comandos GMAT.
+      propagate(objetivo) -> línea Propagate hasta 'objetivo' (texto)
+      maneuver(arg)       -> línea Maneuver
+      report(quien)       -> líneas Report (quien=None: todas las naves)
+    Con step (texto, días) cada tramo se recorre en un While con un Report por
+    paso de salida, y tras cada grupo de maniobras se reporta el estado nuevo.
+    """
+    lines = []
 
-    # ForceModel
-    lines.append(f"FM.CentralBody   = {fm_central_en};")
-    lines.append(f"FM.PrimaryBodies = {{{fm_central_en}}};")
-    lines.append("FM.Drag = None;")
-    lines.append("FM.SRP  = Off;")
-    lines.append("")
+    if step is None:
+        for kind, arg in plan:
+            if kind == "propagate":
+                lines.append(propagate(arg))
+            elif kind == "maneuver":
+                lines.append(maneuver(arg))
+            else:
+                lines += report(arg)
+        return lines
+
+    # Paso de salida fijo: el ReportFile no escribe solo, todo va por Report
+    steps = [(kind, arg) for kind, arg in plan if kind != "report"]
+
+    lines.append("t_rep = 0;")
+    lines += report(None)
+
+    pending = []
+    for i, (kind, arg) in enumerate(steps):
+        if kind == "propagate":
+            lines.append(f"While t_rep < {arg}")
+            lines.append(f"   t_rep = t_rep + {step};")
+            lines.append(f"   If t_rep > {arg}")
+            lines.append(f"      t_rep = {arg};")
+            lines.append("   EndIf;")
+            lines.append("   " + propagate("t_rep"))
+            lines += ["   " + line for line in report(None)]
+            lines.append("EndWhile;")
+        else:
+            lines.append(maneuver(arg))
+            pending.append(arg)
+            if i + 1 == len(steps) or steps[i + 1][0] != "maneuver":
+                lines += report(pending)
+                pending = []
+
+    return lines
+
+
+def _compile_template(p: dict, plan: list) -> str:
+    """
+    Genera el script con campos {nombre} en lugar de valores, listo para
+    str.format_map. Las llaves literales de GMAT van escapadas ({{ }}).
+    """
+    lines = []
 
-    # Propagator
-    lines.append(f"Prop.Type            = {integ_type};")
-    lines.append("Prop.FM              = FM;")
-    lines.append(f"Prop.InitialStepSize = {init_step};")
-    lines.append(f"Prop.Accuracy        = {accuracy};")
-    lines.append(f"Prop.MinStep         = {min_step};")
-    lines.append(f"Prop.MaxStep         = {max_step};");
-    lines.append(f"Prop.MaxStepAttempts = {max_step_attempts};")
-    lines.append("")
+    # --- CoordinateSystem SOLO si NO es la Tierra ---
+    if p["central_en"] != "Earth":
+        lines += _coord_system_lines()
 
-    # ImpulsiveBurn 1
-    if has_burn1:
-        lines.append(f"ImpBurn1.CoordinateSystem = {ib1_coord_gmat};")
-        lines.append(f"ImpBurn1.Origin          = {ib1_origin_en};")
-        lines.append(f"ImpBurn1.Axes            = {ib1_axes};")
-        lines.append(f"ImpBurn1.Element1        = {dv1_1};")
-        lines.append(f"ImpBurn1.Element2        = {dv1_2};")
-        lines.append(f"ImpBurn1.Element3        = {dv1_3};")
-        lines.append("ImpBurn1.DecrementMass   = false;")
-        lines.append("")
-
-    # ImpulsiveBurn 2
-    if has_burn2:
-        lines.append(f"ImpBurn2.CoordinateSystem = {ib2_coord_gmat};")
-        lines.append(f"ImpBurn2.Origin          = {ib2_origin_en};")
-        lines.append(f"ImpBurn2.Axes            = {ib2_axes};")
-        lines.append(f"ImpBurn2.Element1        = {dv2_1};")
-        lines.append(f"ImpBurn2.Element2        = {dv2_2};")
-        lines.append(f"ImpBurn2.Element3        = {dv2_3};")
-        lines.append("ImpBurn2.DecrementMass   = false;")
-        lines.append("")
-
-    # ReportFile
-    lines.append("DefaultReportFile.Filename = 'DefaultReportFile.txt';")
-    lines.append("DefaultReportFile.WriteHeaders = true;")
-    lines.append("DefaultReportFile.Precision = 16;")
-    lines.append(
-        f"DefaultReportFile.Add = "
-        f"{{{sat_name}.ElapsedDays, {sat_name}.X, {sat_name}.Y, {sat_name}.Z, "
-        f"{sat_name}.VX, {sat_name}.VY, {sat_name}.VZ}};"
-    )
+    # Objetos
+    lines.append("Create Spacecraft {sat_name};")
+    lines.append("Create ForceModel {fm_name};")
+    lines.append("Create Propagator {prop_name};")
+    for k in range(len(p["maneuvers"])):
+        lines.append(f"Create ImpulsiveBurn {{burn{k}_name}};")
+    lines.append("Create ReportFile {report_name};")
+    fixed_step = report_step_days(p, plan) is not None
+    if fixed_step:
+        lines.append("Create Variable t_rep;")
     lines.append("")
 
+    lines += _spacecraft_lines(p)
+    lines += _force_model_lines(p)
+    lines += _propagator_lines()
+    for k in range(len(p["maneuvers"])):
+        lines += _burn_lines(k)
+    lines += _report_file_lines(auto_write=not fixed_step)
 
     # ========== MISSION SEQUENCE ==========
     lines.append("BeginMissionSequence;")
 
-    report_fields = (
-        f"{sat_name}.ElapsedDays {sat_name}.X {sat_name}.Y {sat_name}.Z "
-        f"{sat_name}.VX {sat_name}.VY {sat_name}.VZ"
+    # Los tiempos de los Propagate son campos {t_i} de la plantilla
+    plan_fields = []
+    i_prop = 0
+    for kind, arg in plan:
+        if kind == "propagate":
+            arg = f"{{t_{i_prop}}}"
+            i_prop += 1
+        plan_fields.append((kind, arg))
+
+    lines += _sequence_lines(
+        plan_fields,
+        propagate=lambda target: (
+            "Propagate {prop_name}({sat_name}) {{{sat_name}.ElapsedDays = " + target + "}};"
+        ),
+        maneuver=lambda k: f"Maneuver {{burn{k}_name}}({{sat_name}});",
+        report=lambda who: [_REPORT_LINE],
+        step="{report_step_days}" if fixed_step else None,
     )
 
-    # Report inicial
-    lines.append(f"Report DefaultReportFile {report_fields};")
-
-    # Construimos lista de eventos (nombre del burn, tiempo)
-    events = []
-    if has_burn1 and t_burn1 is not None:
-        events.append(("ImpBurn1", t_burn1))
-    if has_burn2 and t_burn2 is not None:
-        events.append(("ImpBurn2", t_burn2))
+    lines.append("")
 
-    current_t = 0.0
+    return "\n".join(lines)
 
-    # Ordenar por tiempo
-    events.sort(key=lambda e: e[1])
 
-    for burn_name, t in events:
-        if dur_days <= 0.0:
-            break
+# Plantillas ya compiladas, por forma de script (ver _template_key)
+_TEMPLATES: dict = {}
 
-        t_clamped = max(0.0, min(dur_days, t))
 
-        if t_clamped > current_t:
-            lines.append(
-                f"Propagate Prop({sat_name}) "
-                f"{{{sat_name}.ElapsedDays = {t_clamped}}};"
-            )
-            lines.append(f"Report DefaultReportFile {report_fields};")
+def render_script(p: dict) -> str:
+    """Texto del script GMAT para una config ya resuelta (resolve_config)."""
+    plan = _mission_plan(p)
+    key = _template_key(p, plan)
 
-        lines.append(f"Maneuver {burn_name}({sat_name});")
-        lines.append(f"Report DefaultReportFile {report_fields};")
+    template = _TEMPLATES.get(key)
+    if template is None:
+        template = _compile_template(p, plan)
+        _TEMPLATES[key] = template
 
-        current_t = t_clamped
+    values = {**_OBJECT_NAMES, **p, **_maneuver_values(p)}
+    values["report_step_days"] = report_step_days(p, plan)
+    times = [arg for kind, arg in plan if kind == "propagate"]
+    for i, t in enumerate(times):
+        values[f"t_{i}"] = t
 
-    # Propagación final
-    if dur_days > current_t:
-        lines.append(
-            f"Propagate Prop({sat_name}) "
-            f"{{{sat_name}.ElapsedDays = {dur_days}}};"
-        )
-        lines.append(f"Report DefaultReportFile {report_fields};")
+    return template.format_map(values)
 
-    lines.append("")
 
-    script_text = "\n".join(lines)
+def build_gmat_script(cfg: dict, script_path: Path):
+    script_text = render_script(resolve_config(cfg))
     script_path.write_text(script_text, encoding="utf-8")
 
     print(f"Script GMAT generado en: {script_path}")
@@ -520,11 +892,234 @@ def build_gmat_script(cfg: dict, script_path: Path):
     print(script_text[:400] + "...\n")
 
 
-def run_transpiler():
-    cfg = parse_gui_txt(DATA_FILE)
+def run_transpiler(cfg: dict | None = None):
+    if cfg is None:
+        cfg = parse_gui_txt(DATA_FILE)
     build_gmat_script(cfg, SCRIPT_PATH)
     return SCRIPT_PATH
 
 
+# ========== BARRIDOS PARAMÉTRICOS / MONTE CARLO ==========
+
+def sweep_grid(spec: dict) -> list[dict]:
+    """
+    Barrido en rejilla (producto cartesiano).
+    spec: {(seccion, clave): [v1, v2, ...]}, con las mismas secciones y claves
+    que parse_gui_txt, p.ej. {("spacecraft", "vx"): [0.0, 0.1]}.
+    Devuelve una lista de overrides {(seccion, clave): valor}.
+    """
+    keys = list(spec.keys())
+    return [dict(zip(keys, combo)) for combo in product(*(spec[k] for k in keys))]
+
+
+def sweep_random(spec: dict, n: int, seed: int | None = None) -> list[dict]:
+    """
+    Muestreo aleatorio (Monte Carlo) de n variantes.
+    spec: {(seccion, clave): distribución}, donde la distribución es
+      ("uniform", a, b) | ("normal", media, sigma) | [v1, v2, ...] (elección)
+    """
+    rng = random.Random(seed)
+    samplers = {}
+    for key, dist in spec.items():
+        if isinstance(dist, tuple) and dist[0] == "uniform":
+            samplers[key] = lambda a=dist[1], b=dist[2]: rng.uniform(a, b)
+        elif isinstance(dist, tuple) and dist[0] == "normal":
+            samplers[key] = lambda m=dist[1], s=dist[2]: rng.gauss(m, s)
+        elif isinstance(dist, (list, tuple)):
+            samplers[key] = lambda opts=list(dist): rng.choice(opts)
+        else:
+            raise ValueError(f"Distribución no soportada para {key}: {dist!r}")
+
+    return [{key: sample() for key, sample in samplers.items()} for _ in range(n)]
+
+
+def apply_overrides(cfg: dict, overrides: dict) -> dict:
+    """Copia de cfg con los overrides aplicados (solo se copian las secciones tocadas)."""
+    new_cfg = dict(cfg)
+    for (section, key), value in overrides.items():
+        if new_cfg.get(section) is cfg.get(section):
+            new_cfg[section] = dict(cfg.get(section) or {})
+        new_cfg[section][key] = value
+    return new_cfg
+
+
+def build_sweep_scripts(cfg: dict, variants: list[dict], out_dir: Path = SWEEP_DIR,
+                        prefix: str = "variant") -> list[Path]:
+    """
+    Genera un script por variante a partir de una config base ya parseada.
+    Las plantillas se compilan una vez por forma de script y en cada variante
+    solo se rellenan los campos. Cada variante escribe su propio report
+    (<prefix>_<i>.txt) para que las ejecuciones no se pisen entre sí.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for i, overrides in enumerate(variants):
+        p = resolve_config(apply_overrides(cfg, overrides))
+        name = f"{prefix}_{i:05d}"
+        p["report_file"] = f"{name}.txt"
+
+        path = out_dir / f"{name}.script"
+        path.write_text(render_script(p), encoding="utf-8")
+        paths.append(path)
 
+    print(f"{len(paths)} scripts GMAT generados en: {out_dir}")
+    return paths
+
+
+def run_sweep_transpiler(variants: list[dict]) -> list[Path]:
+    cfg = parse_gui_txt(DATA_FILE)
+    return build_sweep_scripts(cfg, variants)
+
+
+# ========== VARIAS NAVES EN UN SOLO SCRIPT ==========
+
+def build_multi_gmat_script(cfgs: list[dict], script_path: Path = MULTI_SCRIPT_PATH) -> list[dict]:
+    """
+    Empaqueta N escenarios (configs de parse_gui_txt) en un único script GMAT,
+    para pagar una sola vez el arranque de GmatConsole y la carga de efemérides.
+
+    - Una nave por escenario (<nombre>_<i>) con su propio ReportFile.
+    - ForceModel y Propagator compartidos cuando los ajustes coinciden.
+    - Un único Propagate con todas las naves (Synchronized si hay varios
+      propagadores); la secuencia sale de compile_mission_sequence con las
+      maniobras de todas las naves juntas.
+
+    Todos los escenarios deben tener la misma epoch. Se propaga hasta la mayor
+    duración; las filas sobrantes de cada nave se recortan al separar los
+    resultados (GMAT_exec.run_gmat_multi).
+
+    Devuelve, por escenario, {"sat_name", "report_file", "dur_days"}.
+    """
+    ps = [resolve_config(cfg) for cfg in cfgs]
+    if not ps:
+        raise ValueError("No hay escenarios que empaquetar")
+
+    epochs = {p["epoch_str"] for p in ps}
+    if len(epochs) > 1:
+        raise ValueError(
+            f"Todos los escenarios deben compartir la epoch (hay {len(epochs)} distintas)"
+        )
+
+    fms = {}     # ajustes del ForceModel -> nombre
+    props = {}   # ajustes del Propagator -> nombre
+    sats = []    # valores para format_map, uno por nave
+    for i, p in enumerate(ps):
+        fm_key = (p["fm_central_en"], p["gravity_file"], p["gravity_degree"], p["gravity_order"],
+                  p["drag_atmosphere"], p["stm_limit"])
+        fm_name = fms.setdefault(fm_key, f"FM_{len(fms)}")
+        prop_key = (
+            fm_name, p["integ_type"], p["init_step"], p["accuracy"],
+            p["min_step"], p["max_step"], p["max_step_attempts"],
+        )
+        prop_name = props.setdefault(prop_key, f"Prop_{len(props)}")
+
+        sat_name = f"{p['sat_name']}_{i}"
+        sats.append({
+            **p,
+            "sat_name": sat_name,
+            "fm_name": fm_name,
+            "prop_name": prop_name,
+            "report_name": f"Report_{i}",
+            "report_file": f"{sat_name}.txt",
+            **_maneuver_values(p, suffix=f"_{i}"),
+        })
+
+    def fmt(section: list, values: dict) -> list:
+        return "\n".join(section).format_map(values).split("\n")
+
+    lines = []
+
+    # --- CoordinateSystems (solo los que no son de la Tierra, sin repetir) ---
+    seen = set()
+    for v in sats:
+        if v["central_en"] != "Earth" and v["coord_system"] not in seen:
+            seen.add(v["coord_system"])
+            lines += fmt(_coord_system_lines(), v)
+
+    # Objetos
+    for v in sats:
+        lines.append(f"Create Spacecraft {v['sat_name']};")
+    for fm_name in fms.values():
+        lines.append(f"Create ForceModel {fm_name};")
+    for prop_name in props.values():
+        lines.append(f"Create Propagator {prop_name};")
+    for v in sats:
+        for k in range(len(v["maneuvers"])):
+            lines.append(f"Create ImpulsiveBurn {v[f'burn{k}_name']};")
+    for v in sats:
+        lines.append(f"Create ReportFile {v['report_name']};")
+
+    # Paso de salida fijo si alguna nave lo pide (el más fino de todos)
+    steps = [report_step_days(v, _mission_plan(v)) for v in sats]
+    steps = [st for st in steps if st is not None]
+    step = min(steps) if steps else None
+    if step is not None:
+        lines.append("Create Variable t_rep;")
+    lines.append("")
+
+    for v in sats:
+        lines += fmt(_spacecraft_lines(v), v)
+
+    # Un bloque por ForceModel / Propagator, con los valores de la primera nave que lo usa
+    done = set()
+    for v in sats:
+        if v["fm_name"] not in done:
+            done.add(v["fm_name"])
+            lines += fmt(_force_model_lines(v), v)
+        if v["prop_name"] not in done:
+            done.add(v["prop_name"])
+            lines += fmt(_propagator_lines(), v)
+
+    for v in sats:
+        for k in range(len(v["maneuvers"])):
+            lines += fmt(_burn_lines(k), v)
+
+    for v in sats:
+        lines += fmt(_report_file_lines(auto_write=step is None), v)
+
+    # ========== MISSION SEQUENCE ==========
+    groups = {}   # propagador -> naves
+    for v in sats:
+        groups.setdefault(v["prop_name"], []).append(v["sat_name"])
+
+    mode = "Synchronized " if len(groups) > 1 else ""
+    prop_list = " ".join(f"{prop}({', '.join(names)})" for prop, names in groups.items())
+    ref_sat = sats[0]["sat_name"]
+
+    def propagate(t: float) -> str:
+        return f"Propagate {mode}{prop_list} {{{ref_sat}.ElapsedDays = {t}}};"
+
+    reports = [_REPORT_LINE.format_map(v) for v in sats]
+
+    events = [(m["t"], (i, k)) for i, v in enumerate(sats) for k, m in enumerate(v["maneuvers"])]
+    dur_max = max(v["dur_days"] for v in sats)
+
+    def maneuver(arg) -> str:
+        i, k = arg
+        return f"Maneuver {sats[i][f'burn{k}_name']}({sats[i]['sat_name']});"
+
+    def report(who) -> list:
+        if who is None:
+            return reports
+        return [reports[i] for i in sorted({i for i, _ in who})]
+
+    lines.append("BeginMissionSequence;")
+    lines += _sequence_lines(
+        compile_mission_sequence(events, dur_max),
+        propagate=lambda target: propagate(target),
+        maneuver=maneuver,
+        report=report,
+        step=None if step is None else str(step),
+    )
+
+    lines.append("")
+
+    script_text = "\n".join(lines)
+    script_path.write_text(script_text, encoding="utf-8")
+    print(f"Script GMAT con {len(sats)} naves generado en: {script_path}")
 
+    return [
+        {"sat_name": v["sat_name"], "report_file": v["report_file"], "dur_days": v["dur_days"]}
+        for v in sats
+    ]
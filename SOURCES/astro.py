@@ -0,0 +1,284 @@
+from datetime import datetime
+import numpy as np
+
+
+# Parámetro gravitatorio [km^3/s^2] y radio ecuatorial [km] (valores por defecto de GMAT)
+MU = {
+    "Earth":   398600.4415,
+    "Luna":    4902.8005821478,
+    "Mars":    42828.314258067,
+    "Venus":   324858.59882646,
+    "Jupiter": 126712767.8577960,
+    "Saturn":  37940626.061137,
+    "Uranus":  5794549.0070719,
+    "Neptune": 6836534.0638793,
+    "Mercury": 22032.080486418,
+    "Sun":     132712440017.99,
+}
+
+RADIUS = {
+    "Earth":   6378.1363,
+    "Luna":    1738.2,
+    "Mars":    3396.19,
+    "Venus":   6051.8,
+    "Jupiter": 71492.0,
+    "Saturn":  60268.0,
+    "Uranus":  25559.0,
+    "Neptune": 24764.0,
+    "Mercury": 2439.7,
+    "Sun":     695990.0,
+}
+
+# Oblicuidad de la eclíptica en J2000 [rad]
+OBLIQUITY_J2000 = np.radians(23.439291111)
+
+# Velocidad de rotación de la Tierra [rad/s]
+EARTH_ROTATION_RATE = 7.292115146706979e-5
+
+AU = 149597870.7   # km
+
+JD_J2000 = 2451545.0
+
+
+def epoch_to_jd(epoch_str: str) -> float:
+    """
+    Fecha juliana de una epoch '01 Jan 2030 12:00:00.000' (normalize_epoch).
+    La escala (UTC/TAI/TT) no se distingue: son ~1 min de diferencia.
+    """
+    try:
+        dt = datetime.strptime(epoch_str.strip(), "%d %b %Y %H:%M:%S.%f")
+    except ValueError:
+        print(f"⚠ Epoch no reconocida ({epoch_str!r}), se usa J2000")
+        return JD_J2000
+    return JD_J2000 + (dt - datetime(2000, 1, 1, 12)).total_seconds() / 86400.0
+
+
+def gmst(jd: float) -> float:
+    """Tiempo sidéreo medio de Greenwich [rad] (sin precesión ni nutación)."""
+    deg = 280.46061837 + 360.98564736629 * (jd - JD_J2000)
+    return np.radians(deg % 360.0)
+
+
+def sun_position(jd) -> np.ndarray:
+    """
+    Posición del Sol respecto a la Tierra [km] en ejes ecuatoriales, de
+    baja precisión (Vallado, algoritmo 29: ~0.01 grados). jd puede ser un array.
+    """
+    T = (np.asarray(jd, dtype=float) - JD_J2000) / 36525.0
+    lam_m = np.radians(280.460 + 36000.771 * T)
+    M = np.radians(357.5291092 + 35999.05034 * T)
+    lam = lam_m + np.radians(1.914666471 * np.sin(M) + 0.019994643 * np.sin(2 * M))
+    dist = (1.000140612 - 0.016708617 * np.cos(M) - 0.000139589 * np.cos(2 * M)) * AU
+    eps = np.radians(23.439291 - 0.0130042 * T)
+    return np.stack([dist * np.cos(lam),
+                     dist * np.cos(eps) * np.sin(lam),
+                     dist * np.sin(eps) * np.sin(lam)], axis=-1)
+
+
+def eq_to_ec(vec: np.ndarray) -> np.ndarray:
+    """Vector(es) de ejes MJ2000Eq a MJ2000Ec (rotación sobre X)."""
+    c, s = np.cos(OBLIQUITY_J2000), np.sin(OBLIQUITY_J2000)
+    vec = np.asarray(vec, dtype=float)
+    x, y, z = vec[..., 0], vec[..., 1], vec[..., 2]
+    return np.stack([x, c * y + s * z, -s * y + c * z], axis=-1)
+
+
+def ec_to_eq(vec: np.ndarray) -> np.ndarray:
+    """Vector(es) de ejes MJ2000Ec a MJ2000Eq."""
+    c, s = np.cos(OBLIQUITY_J2000), np.sin(OBLIQUITY_J2000)
+    vec = np.asarray(vec, dtype=float)
+    x, y, z = vec[..., 0], vec[..., 1], vec[..., 2]
+    return np.stack([x, c * y - s * z, s * y + c * z], axis=-1)
+
+
+def kep2cart(sma, ecc, inc, raan, aop, ta, mu):
+    """
+    Elementos keplerianos (km, grados, como en GMAT) -> estado cartesiano.
+    Acepta escalares o arrays; devuelve (..., 6).
+    """
+    inc, raan, aop, ta = (np.radians(a) for a in (inc, raan, aop, ta))
+    sma = np.asarray(sma, dtype=float)
+    ecc = np.asarray(ecc, dtype=float)
+
+    p = sma * (1.0 - ecc**2)
+    r = p / (1.0 + ecc * np.cos(ta))
+
+    # Posición y velocidad en el plano perifocal
+    r_pf = np.stack([r * np.cos(ta), r * np.sin(ta), np.zeros_like(r)], axis=-1)
+    k = np.sqrt(mu / p)
+    v_pf = np.stack([-k * np.sin(ta), k * (ecc + np.cos(ta)), np.zeros_like(r)], axis=-1)
+
+    cO, sO = np.cos(raan), np.sin(raan)
+    ci, si = np.cos(inc), np.sin(inc)
+    cw, sw = np.cos(aop), np.sin(aop)
+
+    # Columnas de la matriz perifocal -> inercial
+    P = np.stack([cO * cw - sO * sw * ci, sO * cw + cO * sw * ci, sw * si], axis=-1)
+    Q = np.stack([-cO * sw - sO * cw * ci, -sO * sw + cO * cw * ci, cw * si], axis=-1)
+
+    pos = r_pf[..., :1] * P + r_pf[..., 1:2] * Q
+    vel = v_pf[..., :1] * P + v_pf[..., 1:2] * Q
+    return np.concatenate([pos, vel], axis=-1)
+
+
+# Por debajo, la órbita se toma por circular / ecuatorial (como en GMAT)
+ECC_TOL = 1e-11
+INC_TOL = 1e-11   # rad
+
+
+def cart2kep(state, mu: float) -> np.ndarray:
+    """
+    Estado(s) cartesiano(s) (..., 6) -> (..., 6) con SMA, ECC, INC, RAAN,
+    AOP, TA (km, grados en [0, 360), como en GMAT), todo vectorizado.
+    Casos singulares con el convenio de GMAT:
+      circular: AOP = 0 y TA se mide desde el nodo ascendente (argumento de latitud)
+      ecuatorial: RAAN = 0 y AOP se mide desde X (longitud del periapsis)
+      circular y ecuatorial: RAAN = AOP = 0 y TA es la longitud verdadera
+    Hiperbólicas con SMA < 0; parabólicas con SMA infinito.
+    """
+    state = np.asarray(state, dtype=float)
+    r, v = state[..., :3], state[..., 3:6]
+
+    def dot(a, b):
+        return np.einsum("...i,...i->...", a, b)
+
+    def angle(ref, vec):
+        # Ángulo de ref a vec en el plano de la órbita, con signo según h
+        return np.arctan2(dot(h_hat, np.cross(ref, vec)), dot(ref, vec))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rn = np.sqrt(dot(r, r))
+        v2 = dot(v, v)
+        h = np.cross(r, v)
+        hn = np.sqrt(dot(h, h))
+        h_hat = h / hn[..., None]
+
+        e_vec = ((v2 - mu / rn)[..., None] * r - dot(r, v)[..., None] * v) / mu
+        ecc = np.sqrt(dot(e_vec, e_vec))
+        sma = -mu / (2.0 * (v2 / 2.0 - mu / rn))
+        inc = np.arccos(np.clip(h[..., 2] / hn, -1.0, 1.0))
+
+        # Línea de nodos (z x h); en ecuatoriales no existe y se usa X
+        node = np.stack([-h[..., 1], h[..., 0], np.zeros_like(hn)], axis=-1)
+        equatorial = np.hypot(node[..., 0], node[..., 1]) < INC_TOL * hn
+        circular = ecc < ECC_TOL
+        node = np.where(equatorial[..., None], np.array([1.0, 0.0, 0.0]), node)
+
+        raan = np.where(equatorial, 0.0, np.arctan2(node[..., 1], node[..., 0]))
+        aop = np.where(circular, 0.0, angle(node, e_vec))
+        ta = angle(np.where(circular[..., None], node, e_vec), r)
+
+    deg = [np.degrees(a) % 360.0 for a in (inc, raan, aop, ta)]
+    deg[0] = np.degrees(inc)   # INC en [0, 180]
+    return np.stack([sma, ecc, *deg], axis=-1)
+
+
+def local_frame(r: np.ndarray, v: np.ndarray, axes: str) -> np.ndarray:
+    """
+    Matriz 3x3 cuyas columnas son los ejes locales expresados en inercial.
+      VNB:  V = v/|v|, N = (r x v)/|r x v|, B = V x N
+      LVLH: X = r/|r| (radial), Z = (r x v)/|r x v|, Y = Z x X
+    Para ejes inerciales devuelve la identidad. Con r, v (..., 3) devuelve (..., 3, 3).
+    """
+    r = np.asarray(r, dtype=float)
+    v = np.asarray(v, dtype=float)
+    h = np.cross(r, v)
+    n = h / np.linalg.norm(h, axis=-1, keepdims=True)
+
+    if axes == "VNB":
+        e1 = v / np.linalg.norm(v, axis=-1, keepdims=True)
+        return np.stack([e1, n, np.cross(e1, n)], axis=-1)
+    if axes == "LVLH":
+        e1 = r / np.linalg.norm(r, axis=-1, keepdims=True)
+        return np.stack([e1, np.cross(n, e1), n], axis=-1)
+    return np.broadcast_to(np.eye(3), r.shape[:-1] + (3, 3))
+
+
+def stumpff(z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Funciones de Stumpff C(z), S(z) (elíptico z > 0, hiperbólico z < 0), con serie cerca de 0."""
+    z = np.asarray(z, dtype=float)
+    C = np.empty_like(z)
+    S = np.empty_like(z)
+
+    small = np.abs(z) < 1e-3
+    pos = ~small & (z > 0)
+    neg = ~small & (z < 0)
+
+    zs = z[small]
+    C[small] = 1 / 2 - zs / 24 + zs**2 / 720 - zs**3 / 40320
+    S[small] = 1 / 6 - zs / 120 + zs**2 / 5040 - zs**3 / 362880
+
+    sz = np.sqrt(z[pos])
+    C[pos] = (1 - np.cos(sz)) / z[pos]
+    S[pos] = (sz - np.sin(sz)) / sz**3
+
+    sz = np.sqrt(-z[neg])
+    C[neg] = (np.cosh(sz) - 1) / -z[neg]
+    S[neg] = (np.sinh(sz) - sz) / sz**3
+    return C, S
+
+
+def kepler_universal(r0, v0, dt, mu: float, tol: float = 1e-12, max_iter: int = 50) -> np.ndarray:
+    """
+    Problema de dos cuerpos con variable universal: estado (..., 6) tras dt [s]
+    desde (r0, v0) [km, km/s]. r0, v0 (..., 3) y dt (...) se combinan por
+    broadcasting, así que una malla de tiempos entera (o un lote de estados)
+    sale en una sola llamada. Vale para órbitas elípticas, parabólicas e
+    hiperbólicas.
+    """
+    r0 = np.asarray(r0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+
+    sqmu = np.sqrt(mu)
+    r0n = np.linalg.norm(r0, axis=-1)
+    vr0 = np.einsum("...i,...i->...", r0, v0) / r0n
+    alpha = 2.0 / r0n - np.einsum("...i,...i->...", v0, v0) / mu   # 1/a
+
+    shape = np.broadcast_shapes(r0n.shape, dt.shape)
+    r0n, vr0, alpha, dt = (np.broadcast_to(x, shape) for x in (r0n, vr0, alpha, dt))
+
+    # En elípticas solo importa dt módulo el periodo (menos vueltas para Newton)
+    ell = alpha > 1e-12
+    period = np.where(ell, 2 * np.pi / np.sqrt(mu * np.abs(alpha) ** 3 + 1e-300), np.inf)
+    dt_eff = np.where(ell, np.fmod(dt, period), dt)
+
+    # Valor inicial (Vallado): elíptica sqrt(mu)*alpha*dt; hiperbólica con el
+    # logaritmo de la anomalía; parabólica (o si el log falla), sqrt(mu)*dt/r0
+    chi = sqmu * dt_eff / r0n
+    hyp = alpha < -1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = 1.0 / alpha
+        sgn = np.sign(dt_eff)
+        chi_h = sgn * np.sqrt(-a) * np.log(
+            -2.0 * mu * alpha * dt_eff
+            / (r0n * vr0 + sgn * np.sqrt(-mu * a) * (1.0 - r0n * alpha))
+        )
+    chi = np.where(hyp & np.isfinite(chi_h), chi_h, chi)
+    chi = np.where(ell, sqmu * alpha * dt_eff, chi)
+    a1 = r0n * vr0 / sqmu
+    a2 = 1.0 - alpha * r0n
+
+    for _ in range(max_iter):
+        z = alpha * chi**2
+        C, S = stumpff(z)
+        F = a1 * chi**2 * C + a2 * chi**3 * S + r0n * chi - sqmu * dt_eff
+        dF = a1 * chi * (1.0 - z * S) + a2 * chi**2 * C + r0n
+        delta = F / dF
+        chi = chi - delta
+        # NaN (estado de entrada no finito) cuenta como terminado: sale NaN
+        if not np.any(np.abs(delta) > tol * np.maximum(1.0, np.abs(chi))):
+            break
+    else:
+        raise RuntimeError(f"Kepler (variable universal) no converge en {max_iter} iteraciones")
+
+    z = alpha * chi**2
+    C, S = stumpff(z)
+    f = 1.0 - chi**2 / r0n * C
+    g = dt_eff - chi**3 / sqmu * S
+    r = f[..., None] * r0 + g[..., None] * v0
+    rn = np.linalg.norm(r, axis=-1)
+    fdot = sqmu / (rn * r0n) * (alpha * chi**3 * S - chi)
+    gdot = 1.0 - chi**2 / rn * C
+    v = fdot[..., None] * r0 + gdot[..., None] * v0
+    return np.concatenate([r, v], axis=-1)
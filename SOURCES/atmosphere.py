@@ -0,0 +1,114 @@
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+
+from SOURCES.utils import DATA_DIR
+
+# Tablas de densidad propias: <modelo>.csv con dos columnas,
+# altitud [km] y densidad [kg/m^3] (p.ej. sacadas de MSISE90 para unas
+# condiciones de actividad solar concretas)
+ATMOSPHERE_DIR = DATA_DIR / "atmosphere"
+
+# Atmósfera exponencial por tramos (Vallado, tabla 8-4): en cada tramo
+# rho = rho0 * exp(-(h - h0) / H). (h0 [km], rho0 [kg/m^3], H [km])
+EXPONENTIAL_BANDS = [
+    (0, 1.225, 7.249),
+    (25, 3.899e-2, 6.349),
+    (30, 1.774e-2, 6.682),
+    (40, 3.972e-3, 7.554),
+    (50, 1.057e-3, 8.382),
+    (60, 3.206e-4, 7.714),
+    (70, 8.770e-5, 6.549),
+    (80, 1.905e-5, 5.799),
+    (90, 3.396e-6, 5.382),
+    (100, 5.297e-7, 5.877),
+    (110, 9.661e-8, 7.263),
+    (120, 2.438e-8, 9.473),
+    (130, 8.484e-9, 12.636),
+    (140, 3.845e-9, 16.149),
+    (150, 2.070e-9, 22.523),
+    (180, 5.464e-10, 29.740),
+    (200, 2.789e-10, 37.105),
+    (250, 7.248e-11, 45.546),
+    (300, 2.418e-11, 53.628),
+    (350, 9.518e-12, 53.298),
+    (400, 3.725e-12, 58.515),
+    (450, 1.585e-12, 60.828),
+    (500, 6.967e-13, 63.822),
+    (600, 1.454e-13, 71.835),
+    (700, 3.614e-14, 88.667),
+    (800, 1.170e-14, 124.64),
+    (900, 5.245e-15, 181.05),
+    (1000, 3.019e-15, 268.00),
+]
+
+# Malla de la tabla precalculada [km]
+TABLE_STEP = 1.0
+TABLE_TOP = 1000.0
+
+
+def exponential_density(h: np.ndarray) -> np.ndarray:
+    """Densidad [kg/m^3] del modelo exponencial por tramos en h [km] (evaluación directa)."""
+    h0, rho0, H = (np.array(col, dtype=float) for col in zip(*EXPONENTIAL_BANDS))
+    i = np.clip(np.searchsorted(h0, h, side="right") - 1, 0, len(h0) - 1)
+    return rho0[i] * np.exp(-(np.asarray(h, dtype=float) - h0[i]) / H[i])
+
+
+class DensityTable:
+    """
+    log(rho) precalculado en una malla uniforme de altitudes: cada consulta
+    es un índice (sin búsqueda) y una interpolación lineal en log(rho), para
+    todas las altitudes a la vez. Por debajo de 0 km se usa la de 0 km; por
+    encima del techo, se sigue con la escala de altura del último tramo.
+    """
+
+    def __init__(self, altitudes: np.ndarray, log_rho: np.ndarray, top_scale_height: float):
+        self.step = float(altitudes[1] - altitudes[0])
+        self.top = float(altitudes[-1])
+        self.top_scale_height = top_scale_height
+        self._log_rho = np.asarray(log_rho, dtype=float)
+        self._dlog = np.diff(self._log_rho)
+
+    def density(self, h: np.ndarray) -> np.ndarray:
+        """Densidad [kg/m^3] en h [km]."""
+        h = np.asarray(h, dtype=float)
+        x = np.clip(h, 0.0, self.top) / self.step
+        i = np.minimum(x.astype(np.intp), len(self._dlog) - 1)
+        log_rho = self._log_rho[i] + self._dlog[i] * (x - i)
+        log_rho -= np.maximum(h - self.top, 0.0) / self.top_scale_height
+        return np.exp(log_rho)
+
+
+def read_density_csv(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """(altitud [km], densidad [kg/m^3]) de un CSV de dos columnas (se admite cabecera)."""
+    data = np.genfromtxt(path, delimiter=",", comments="#")
+    data = data[np.isfinite(data).all(axis=1)]
+    order = np.argsort(data[:, 0])
+    return data[order, 0], data[order, 1]
+
+
+@lru_cache(maxsize=None)
+def get_density_table(model: str) -> DensityTable:
+    """
+    Tabla de densidad del modelo (una por modelo, reutilizada entre
+    ejecuciones). Si hay DATA/atmosphere/<modelo>.csv se remuestrea esa; si
+    no, se usa la atmósfera exponencial: sin actividad solar ni geomagnética,
+    así que no reproduce Jacchia-Roberts ni MSISE90 de GMAT, solo su orden de
+    magnitud.
+    """
+    path = ATMOSPHERE_DIR / f"{model}.csv"
+
+    if path.exists():
+        h, rho = read_density_csv(path)
+        grid = np.arange(0.0, max(TABLE_TOP, h[-1]) + TABLE_STEP / 2, TABLE_STEP)
+        log_rho = np.interp(grid, h, np.log(rho))
+        # Escala de altura del final de la tabla, para extrapolar por arriba
+        H_top = (h[-1] - h[-2]) / np.log(rho[-2] / rho[-1]) if len(h) > 1 else EXPONENTIAL_BANDS[-1][2]
+        print(f"✅ Tabla de densidad {model} cargada desde: {path}")
+    else:
+        grid = np.arange(0.0, TABLE_TOP + TABLE_STEP / 2, TABLE_STEP)
+        log_rho = np.log(exponential_density(grid))
+        H_top = EXPONENTIAL_BANDS[-1][2]
+        print(f"⚠ No hay tabla para {model}; se usa la atmósfera exponencial (sin actividad solar)")
+
+    return DensityTable(grid, log_rho, H_top)
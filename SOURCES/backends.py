@@ -0,0 +1,160 @@
+import os
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+import numpy as np
+
+from SOURCES.Transpiler import REPORT_COLUMNS, run_transpiler, resolve_config
+from SOURCES.GMAT_exec import JOBS_DIR, copy_report, find_gmat, run_gmat, start_gmat_job
+from SOURCES.propagator import iter_propagation, report_format
+from SOURCES.report_reader import iter_report_chunks, write_sidecar
+from SOURCES.stm import STM_PATH, StmHistory, iter_stm
+from SOURCES.streaming import iter_states, tail_report
+from SOURCES.telemetry import ProcessWatcher, RunControl
+from SOURCES.utils import OUTPUT_DIR
+
+REPORT_PATH = OUTPUT_DIR / "DefaultReportFile.txt"
+LIVE_DIR = JOBS_DIR / "live"
+
+
+class Backend:
+    """
+    Interfaz común de los motores de propagación: run(cfg) recibe la config
+    de parse_gui_txt y deja el report de 7 columnas en OUTPUT_DIR, el mismo
+    que espera load_report. stream(cfg) hace lo mismo pero va devolviendo
+    lotes de filas (n, 7) mientras propaga (ver SOURCES.streaming); si se
+    corta antes de terminar, el report no queda escrito. Con ctl
+    (telemetry.RunControl) se respetan su timeout y su cancelación.
+    """
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def run(self, cfg: dict, ctl: RunControl | None = None) -> Path:
+        raise NotImplementedError
+
+    def stream(self, cfg: dict, ctl: RunControl | None = None) -> Iterator[np.ndarray]:
+        # Por defecto: al terminar, el report por trozos
+        report = self.run(cfg, ctl)
+        for chunk in iter_report_chunks(report, REPORT_COLUMNS):
+            yield chunk.to_numpy()
+
+
+class GmatBackend(Backend):
+    """Transpila a script GMAT y ejecuta GmatConsole."""
+    name = "gmat"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            find_gmat()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def run(self, cfg: dict, ctl: RunControl | None = None) -> Path:
+        script_path = run_transpiler(cfg)
+        run_gmat(script_path, resolve_config(cfg)["report_col_precision"], ctl)
+        return REPORT_PATH
+
+    def stream(self, cfg: dict, ctl: RunControl | None = None) -> Iterator[np.ndarray]:
+        # GMAT va escribiendo el report en LIVE_DIR; se lee según crece
+        script_path = run_transpiler(cfg)
+        proc, reports = start_gmat_job(script_path, LIVE_DIR)
+        watcher = ProcessWatcher(proc, ctl)
+        try:
+            yield from tail_report(reports[0], watcher.alive)
+        finally:
+            # Si el consumidor corta (aborto, cancelación), GMAT no sigue por su cuenta
+            watcher.kill()
+
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+        if not reports[0].exists():
+            raise FileNotFoundError(
+                f"GMAT terminó pero no se generó el report file: {reports[0]}"
+            )
+        copy_report(reports[0], REPORT_PATH, resolve_config(cfg)["report_col_precision"])
+
+
+class NumpyBackend(Backend):
+    """
+    Propagador propio en NumPy: sin script ni proceso externo. Con STM Limit
+    integra también la STM y la deja en STM_PATH (ver SOURCES.stm).
+    """
+    name = "numpy"
+
+    def run(self, cfg: dict, ctl: RunControl | None = None) -> Path:
+        # Por lotes, para poder cortar entre uno y otro
+        for _ in self.stream(cfg, ctl):
+            pass
+        return REPORT_PATH
+
+    def stream(self, cfg: dict, ctl: RunControl | None = None) -> Iterator[np.ndarray]:
+        p = resolve_config(cfg)
+        header, fmt = report_format(p["sat_name"], p["report_precision"], p["report_col_precision"])
+
+        # Se escribe a un temporal y se renombra al final: un run cortado
+        # no deja un report a medias donde lo busca load_report
+        tmp = REPORT_PATH.with_suffix(".part")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        STM_PATH.unlink(missing_ok=True)
+
+        # Con STM: los mismos lotes (t, estados), guardando la STM aparte
+        stms = []
+        if p["stm_limit"] > 0:
+            def source():
+                for t_days, states, stm in iter_stm(p):
+                    stms.append((t_days, states, stm))
+                    yield t_days, states
+            batches = source()
+        else:
+            batches = iter_propagation(p)
+
+        try:
+            with tmp.open("w", encoding="utf-8") as fh:
+                fh.write(header + "\n")
+                for rows in iter_states(batches):
+                    if ctl is not None:
+                        ctl.check()
+                    np.savetxt(fh, rows, fmt=fmt)
+                    yield rows
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        tmp.replace(REPORT_PATH)
+        write_sidecar(REPORT_PATH)
+        print("✅ ReportFile escrito en:", REPORT_PATH)
+        if stms:
+            StmHistory(*(np.concatenate(col) for col in zip(*stms))).save(STM_PATH)
+            print("✅ STM escrita en:", STM_PATH)
+
+
+BACKENDS = {
+    GmatBackend.name: GmatBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+
+def register_backend(cls):
+    """Añade un backend (subclase de Backend) al registro, por su nombre."""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """
+    Devuelve el backend pedido ('gmat', 'numpy', ...). Por defecto se lee de
+    la variable SIM_BACKEND; 'auto' usa GMAT si está instalado y, si no, numpy.
+    """
+    name = name or os.environ.get("SIM_BACKEND", "auto")
+
+    if name == "auto":
+        return GmatBackend() if GmatBackend.available() else NumpyBackend()
+
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name} (disponibles: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
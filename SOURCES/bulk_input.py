@@ -0,0 +1,224 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.utils import INPUT_DIR
+
+BULK_FILE = INPUT_DIR / "escenarios.csv"
+
+
+# Claves por sección (las mismas que escribe la GUI) y cómo se convierten:
+#   ("float", d)    -> to_float(valor, d)
+#   ("positive", d) -> positive_or_default(valor, d)
+#   ("count", d)    -> entero > 0, si no d (como "Intentos max. paso")
+#   ("time", None)  -> float o NaN si está vacío (burn sin tiempo)
+#   ("text", d)     -> texto tal cual, d si está vacío
+# Los defaults solo rellenan column(): en overrides() una celda vacía o no
+# válida no se incluye y manda la config base.
+_BURN_KEYS = {
+    "Sistema de coordenadas": ("text", "Local"),
+    "Origen": ("text", ""),
+    "Axes": ("text", "VNB"),
+    "Delta V Element 1": ("float", 0.0),
+    "Delta V Element 2": ("float", 0.0),
+    "Delta V Element 3": ("float", 0.0),
+    "Tiempo burn": ("time", None),
+}
+
+SECTION_KEYS = {
+    "general": {
+        "Nombre nave": ("text", ""),
+        "Cuerpo central": ("text", "Tierra"),
+        "Sistema de referencia": ("text", "Ecuatorial"),
+        "Formato de tiempo": ("text", "UTC"),
+    },
+    "spacecraft": {
+        "Sistema de coordenadas": ("text", "Cartesianas"),
+        "x": ("float", 7000.0),
+        "y": ("float", 0.0),
+        "z": ("float", 0.0),
+        "vx": ("float", 0.0),
+        "vy": ("float", 7.5),
+        "vz": ("float", 0.0),
+        "SMA": ("float", 7000.0),
+        "ECC": ("float", 0.0),
+        "INC": ("float", 0.0),
+        "RAAN": ("float", 0.0),
+        "AOP": ("float", 0.0),
+        "TA": ("float", 0.0),
+        "Masa seca": ("positive", 850.0),
+    },
+    "time": {
+        "Fecha inicio": ("text", ""),
+        "Fecha final": ("text", ""),
+    },
+    "propagate": {
+        "Tipo de integrador": ("text", "RungeKutta89"),
+        "Tamano de paso inicial": ("positive", 10.0),
+        "Precision (accuracy)": ("positive", 1e-4),
+        "Paso minimo": ("positive", 0.01),
+        "Paso maximo": ("positive", 300.0),
+        "Intentos max. paso": ("count", 50),
+        "Cuerpo central": ("text", ""),
+        "Modelo gravitatorio": ("text", ""),
+        "Grado": ("float", 0.0),
+        "Orden": ("float", 0.0),
+        "STM Limit": ("float", 0.0),
+        "Atmosfera": ("text", ""),
+        "Modelo de arrastre": ("text", ""),
+        "Cd": ("positive", 2.2),
+        "Area arrastre [m2]": ("positive", 15.0),
+    },
+    "impulsive_burn": _BURN_KEYS,
+    "reportfile": {
+        "Paso de salida [s]": ("float", 0.0),
+        "Filas maximas": ("count", 0),
+        "Precision": ("positive", 16),
+        "Precision columnas": ("text", ""),
+        "Altitudes evento [km]": ("text", ""),
+    },
+}
+
+
+def _section_spec(section: str) -> dict | None:
+    if section.startswith("impulsive_burn_") and section.rsplit("_", 1)[1].isdigit():
+        return _BURN_KEYS
+    return SECTION_KEYS.get(section)
+
+
+def resolve_column(name: str) -> tuple[str, str]:
+    """
+    Nombre de columna -> (seccion, clave).
+    Vale 'clave' (primera sección que la tiene, en el orden de SECTION_KEYS)
+    o 'seccion.clave' para desambiguar, p.ej. 'impulsive_burn_2.Tiempo burn'.
+    """
+    name = name.strip()
+    if "." in name:
+        section, key = name.split(".", 1)
+        spec = _section_spec(section)
+        if spec is not None and key in spec:
+            return section, key
+
+    for section, spec in SECTION_KEYS.items():
+        if name in spec:
+            return section, name
+
+    raise ValueError(f"Columna desconocida en el fichero de escenarios: {name!r}")
+
+
+def _to_numeric(col: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Columna -> (float64 con NaN donde no hay número, máscara de valores no vacíos)."""
+    if pd.api.types.is_numeric_dtype(col):
+        values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+        return values, ~np.isnan(values)
+
+    text = col.astype(str).str.strip()
+    present = (text != "").to_numpy()
+    values = pd.to_numeric(text.str.replace(",", ".", regex=False), errors="coerce")
+    return values.to_numpy(dtype=np.float64, na_value=np.nan), present
+
+
+class ScenarioTable:
+    """
+    Escenarios cargados en bloque: una fila por escenario y, por cada
+    (seccion, clave), un array tipado con los defaults ya aplicados.
+    given[(seccion, clave)] marca las celdas con un valor válido: solo esas
+    pasan a overrides(), el resto se queda con el valor de la config base.
+    invalid[(seccion, clave)] marca las celdas no vacías que no se pudieron
+    convertir (o fuera de rango, p.ej. una masa <= 0).
+    """
+
+    def __init__(self, columns: dict, invalid: dict, n: int, given: dict | None = None):
+        self.columns = columns
+        self.invalid = invalid
+        self.n = n
+        self.given = given if given is not None else {
+            key: np.ones(n, dtype=bool) for key in columns
+        }
+
+    def __len__(self):
+        return self.n
+
+    def column(self, section: str, key: str) -> np.ndarray:
+        return self.columns[(section, key)]
+
+    def overrides(self, i: int) -> dict:
+        """
+        Fila i como overrides {(seccion, clave): valor} (ver Transpiler.apply_overrides).
+        Celda vacía o no válida: no se incluye y se queda el valor de la config base.
+        """
+        out = {}
+        for key, values in self.columns.items():
+            if not self.given[key][i]:
+                continue
+            v = values[i]
+            if isinstance(v, np.generic):
+                v = v.item()
+            out[key] = v
+        return out
+
+    def variants(self) -> list[dict]:
+        """Todas las filas como overrides, listas para Transpiler.build_sweep_scripts."""
+        return [self.overrides(i) for i in range(self.n)]
+
+
+def load_scenarios(path: Path = BULK_FILE) -> ScenarioTable:
+    """
+    Carga un fichero tabular de escenarios (CSV, o Parquet/Feather si está
+    pyarrow) con columnas nombradas como las claves de la GUI ('x', 'vx',
+    'SMA', 'Delta V Element 1', 'Tiempo burn', ...). Todo el parseo y la
+    validación se hace por columnas, sin diccionarios por escenario.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No se encuentra {path}")
+
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        df = pd.read_parquet(path)
+    elif suffix == ".feather":
+        df = pd.read_feather(path)
+    else:
+        # Todo como texto: los decimales con coma se arreglan luego por columna
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+    columns = {}
+    invalid = {}
+    given = {}
+
+    for name in df.columns:
+        section, key = resolve_column(str(name))
+        kind, default = _section_spec(section)[key]
+        col = df[name]
+
+        if kind == "text":
+            text = col.astype(str).str.strip()
+            ok = (text != "").to_numpy()
+            values = text.where(text != "", default).to_numpy(dtype=object)
+            bad = np.zeros(len(df), dtype=bool)
+        else:
+            values, present = _to_numeric(col)
+            ok = present & ~np.isnan(values)
+            if kind == "positive":
+                ok &= np.nan_to_num(values) > 0
+            elif kind == "count":
+                ok &= np.nan_to_num(values) >= 1
+            bad = present & ~ok
+
+            # El default solo cuenta para column(); overrides() usa la config base
+            if kind in ("float", "positive"):
+                values = np.where(ok, values, default)
+            elif kind == "count":
+                values = np.where(ok, np.nan_to_num(values), default).astype(np.int64)
+            # "time": NaN se queda como "sin tiempo"
+
+        columns[(section, key)] = values
+        invalid[(section, key)] = bad
+        given[(section, key)] = ok
+
+        n_bad = int(bad.sum())
+        if n_bad:
+            print(f"⚠ {n_bad} valores no válidos en '{name}', se usa el de la config base")
+
+    print(f"{len(df)} escenarios cargados desde: {path}")
+    return ScenarioTable(columns, invalid, len(df), given)
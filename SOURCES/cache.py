@@ -0,0 +1,143 @@
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+from shutil import copy2, rmtree
+
+from SOURCES.utils import CACHE_DIR, OUTPUT_DIR, PLOTS_DIR
+
+
+REPORT_NAME = "DefaultReportFile.txt"
+INDEX_NAME  = "index.json"
+
+MAX_BYTES   = 500 * 1024 * 1024   # 500 MB
+MAX_ENTRIES = 100
+
+
+def config_key(p: dict) -> str:
+    """
+    Hash canónico de una config normalizada (la que devuelve resolve_config,
+    con los defaults ya aplicados). Dos entradas de la GUI que acaban en la
+    misma config dan la misma clave.
+    """
+    canon = json.dumps(p, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de resultados (report + plots) direccionada por contenido.
+    Cada entrada vive en <root>/<clave>/ y el índice en disco (index.json)
+    guarda el orden de uso para la expulsión LRU por tamaño y nº de entradas.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES,
+                 max_entries: int = MAX_ENTRIES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_path = self.root / INDEX_NAME
+        self.index = self._load_index()
+
+    # ---------- índice ----------
+    def _load_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        # Entradas cuyo directorio ya no existe no sirven
+        return {k: v for k, v in index.items() if (self.root / k).is_dir()}
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index, indent=1), encoding="utf-8")
+        tmp.replace(self.index_path)
+
+    def _touch(self, key: str):
+        # El orden del dict es el orden LRU: lo más reciente al final
+        self.index[key] = self.index.pop(key)
+
+    # ---------- API ----------
+    def get(self, key: str) -> Path | None:
+        """Directorio de la entrada si existe (y la marca como usada)."""
+        if key not in self.index:
+            return None
+        entry_dir = self.root / key
+        if not (entry_dir / REPORT_NAME).exists():
+            self.index.pop(key)
+            self._save_index()
+            return None
+        self._touch(key)
+        self._save_index()
+        return entry_dir
+
+    def restore(self, key: str, output_dir: Path = OUTPUT_DIR,
+                plots_dir: Path = PLOTS_DIR) -> bool:
+        """
+        Copia el report, los plots y los extras cacheados a su sitio. False si
+        no hay entrada. Los PNG que ya hubiera en plots_dir se borran antes:
+        solo quedan los de la entrada.
+        """
+        entry_dir = self.get(key)
+        if entry_dir is None:
+            return False
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        plots_dir.mkdir(parents=True, exist_ok=True)
+
+        copy2(entry_dir / REPORT_NAME, output_dir / REPORT_NAME)
+        for png in plots_dir.glob("*.png"):
+            png.unlink()
+        for png in (entry_dir / "plots").glob("*.png"):
+            copy2(png, plots_dir / png.name)
+        for extra in (entry_dir / "extra").glob("*"):
+            copy2(extra, output_dir / extra.name)
+
+        print("✅ Resultado recuperado de la caché:", key[:12])
+        return True
+
+    def store(self, key: str, report: Path, plots: list[Path] = (),
+              extras: list[Path] = ()):
+        """
+        Guarda report y plots de una ejecución y aplica la expulsión LRU.
+        plots: los PNG que ha escrito esta ejecución (lo que devuelve make_plots),
+        no todo lo que haya en PLOTS_DIR.
+        extras: otros ficheros de OUTPUT_DIR (efeméride...) que se devuelven ahí al restaurar.
+        """
+        # Se escribe en un directorio aparte y se cambia por la entrada al
+        # final: de una entrada anterior no queda nada (plots ni extras)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key[:12]}_", dir=self.root))
+        try:
+            (tmp_dir / "plots").mkdir()
+            copy2(report, tmp_dir / REPORT_NAME)
+            for png in plots:
+                copy2(png, tmp_dir / "plots" / Path(png).name)
+            if extras:
+                (tmp_dir / "extra").mkdir()
+                for extra in extras:
+                    copy2(extra, tmp_dir / "extra" / Path(extra).name)
+
+            entry_dir = self.root / key
+            rmtree(entry_dir, ignore_errors=True)
+            tmp_dir.rename(entry_dir)
+        except BaseException:
+            rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        size = sum(f.stat().st_size for f in entry_dir.rglob("*") if f.is_file())
+        self.index.pop(key, None)
+        self.index[key] = {"size": size}
+
+        self._evict()
+        self._save_index()
+
+    def _evict(self):
+        total = sum(e["size"] for e in self.index.values())
+        while self.index and (total > self.max_bytes or len(self.index) > self.max_entries):
+            oldest = next(iter(self.index))
+            total -= self.index.pop(oldest)["size"]
+            rmtree(self.root / oldest, ignore_errors=True)
@@ -0,0 +1,158 @@
+import numpy as np
+
+# Columnas de píxel por defecto (la anchura de un PNG de 6.4 in a 300 dpi)
+LOD_BUCKETS = 1920
+
+# Filas por bloque de m4_blocks (la memoria no depende de cuántas haya)
+M4_BLOCK = 200_000
+
+# Ejemplo (antes de ax.plot, con las filas (n, 7) del report):
+#     k = m4_indices(t, st[:, 4:7], buckets=ancho_en_pixeles)
+#     ax.plot(t[k], st[k, 4])
+#     ax.plot(*path_points(st[:, 1:4], cells=ancho_en_pixeles, t=t).T)
+
+
+def burn_rows(t: np.ndarray) -> np.ndarray:
+    """Filas de las maniobras: las dos (antes y después) de cada t repetido."""
+    k = np.flatnonzero(np.diff(np.asarray(t, dtype=float)) == 0)
+    return np.concatenate([k, k + 1])
+
+
+def m4_indices(t: np.ndarray, values: np.ndarray, buckets: int = LOD_BUCKETS,
+               keep: np.ndarray | None = None) -> np.ndarray:
+    """
+    Índices (ordenados) de las filas a pintar de una o varias series frente
+    a t (creciente), con el M4 de Jugel et al.: t se parte en `buckets`
+    intervalos iguales (uno por columna de píxeles) y en cada uno se guardan
+    la primera, la última y la del mínimo y el máximo de cada serie. Con eso
+    la línea rasterizada sale igual que con todas las filas, y como mucho
+    quedan buckets * (2 + 2 * nº series) puntos sea cual sea el report.
+    Se conservan siempre las filas de las maniobras (burn_rows) y las de keep.
+    """
+    t = np.asarray(t, dtype=float)
+    n = len(t)
+    if n <= 4 * buckets:
+        return np.arange(n)
+
+    span = t[-1] - t[0]
+    if span > 0:
+        edges = t[0] + span * np.arange(1, buckets) / buckets
+        starts = np.unique(np.r_[0, np.searchsorted(t, edges)])
+    else:
+        starts = np.linspace(0, n, buckets, endpoint=False).astype(int)
+    starts = starts[starts < n]
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    extra = burn_rows(t)
+    if keep is not None:
+        extra = np.r_[extra, np.asarray(keep, dtype=int)]
+    return m4_select(bucket, values, extra)
+
+
+def m4_select(bucket: np.ndarray, values: np.ndarray, keep: np.ndarray | None = None) -> np.ndarray:
+    """
+    El M4 de m4_indices con los buckets ya asignados: bucket es el id
+    (creciente) del bucket de cada fila. Índices ordenados de la primera,
+    la última y la del mínimo y el máximo de cada serie en cada bucket, más
+    las de keep.
+    """
+    bucket = np.asarray(bucket)
+    n = len(bucket)
+    values = np.asarray(values, dtype=float).reshape(n, -1)
+    if not n:
+        return np.arange(0)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(len(starts)), counts)
+
+    picks = [starts, starts + counts - 1]
+    for col in values.T:
+        for reduce in (np.minimum, np.maximum):
+            ext = reduce.reduceat(col, starts)
+            # Primera fila de cada bucket que alcanza su extremo
+            hit = np.flatnonzero(col == ext[group])
+            _, first = np.unique(group[hit], return_index=True)
+            picks.append(hit[first])
+    if keep is not None:
+        picks.append(np.asarray(keep, dtype=int))
+    return np.unique(np.concatenate(picks))
+
+
+def m4_blocks(t: np.ndarray, columns, buckets: int = LOD_BUCKETS,
+              block: int = M4_BLOCK) -> np.ndarray:
+    """
+    Como m4_indices, pero recorriendo t y las series (columns: lista de
+    columnas, p. ej. las de un sidecar mapeado en memoria) por bloques de
+    `block` filas, así que nunca se copian enteras. Un bucket partido entre
+    dos bloques deja los extremos de cada parte: alguna fila de más, ninguna
+    de menos.
+    """
+    n = len(t)
+    if n <= 4 * buckets:
+        return np.arange(n)
+
+    t0, span = float(t[0]), float(t[n - 1]) - float(t[0])
+    picks = []
+    for i in range(0, n, block):
+        # Con la última fila del bloque anterior: maniobras entre dos bloques
+        a, b = max(i - 1, 0), min(i + block, n)
+        tb = np.asarray(t[a:b], dtype=float)
+        if span > 0:
+            ids = np.minimum(np.floor((tb - t0) / span * buckets), buckets - 1).astype(np.int64)
+        else:
+            ids = np.arange(a, b) * buckets // n
+        values = np.column_stack([np.asarray(col[a:b], dtype=float) for col in columns])
+        picks.append(a + m4_select(ids, values, burn_rows(tb)))
+    return np.unique(np.concatenate([[n - 1], *picks]))
+
+
+def path_points(points: np.ndarray, cells: int = LOD_BUCKETS, t: np.ndarray | None = None) -> np.ndarray:
+    """
+    Puntos (m, 2) o (m, 3) a pintar de una trayectoria (XY, 3D) de n puntos,
+    con filas NaN donde se corta la línea (ax.plot no une a través de NaN).
+    Cada eje se parte en `cells` celdas (un píxel o menos):
+      1) de cada tramo seguido dentro de la misma celda queda el primer punto
+         (y las filas de las maniobras si se da t);
+      2) un segmento entre dos celdas que ya se había pintado (otra vuelta
+         por el mismo sitio, en cualquier sentido) no se repite.
+    El trazo se mueve como mucho una celda, y lo que queda depende de lo que
+    ocupa la curva en píxeles, no de cuántas filas o vueltas tenga el report.
+    """
+    points = np.asarray(points, dtype=float)
+    n, dim = points.shape
+    if n <= 2:
+        return points
+
+    # Cada eje con su rango (en 3D cada eje llena la caja); con "equal" sobra precisión
+    lo = points.min(axis=0)
+    size = np.maximum((points.max(axis=0) - lo) / cells, np.finfo(float).tiny)
+    cell = np.minimum(np.floor((points - lo) / size).astype(np.int64), cells)
+
+    moved = np.any(cell[1:] != cell[:-1], axis=1)
+    picks = [np.array([0, n - 1]), np.flatnonzero(moved) + 1]
+    if t is not None:
+        picks.append(burn_rows(t))
+    k = np.unique(np.concatenate(picks))
+
+    # Celda -> un entero; segmento -> par (menor, mayor), sin sentido
+    key = np.ravel_multi_index(cell[k].T, (cells + 1,) * dim)
+    seg = np.sort(np.column_stack([key[:-1], key[1:]]), axis=1)
+    # Primera aparición de cada par (lexsort estable: más rápido que unique(axis=0))
+    order = np.lexsort((seg[:, 1], seg[:, 0]))
+    ordered = seg[order]
+    new = np.zeros(len(seg), dtype=bool)
+    new[order[np.r_[True, np.any(ordered[1:] != ordered[:-1], axis=1)]]] = True
+    new &= seg[:, 0] != seg[:, 1]   # las filas de los burns repiten celda
+
+    # Punto j se pinta si abre o cierra un segmento nuevo; corte antes de
+    # cada segmento nuevo que no sigue a otro nuevo
+    draw = np.r_[new, False] | np.r_[False, new]
+    starts = np.flatnonzero(new & ~np.r_[False, new[:-1]])
+    out = points[k].copy()
+    out[~draw] = np.nan
+    gaps = starts[starts > 0]
+    out = np.insert(out, gaps, np.nan, axis=0)
+    # Sin NaN seguidos (los puntos que no se pintan ya cortan la línea)
+    nan = np.isnan(out[:, 0])
+    return out[~(nan & np.r_[True, nan[:-1]])]
@@ -0,0 +1,72 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.astro import MU, cart2kep
+from SOURCES.report_reader import iter_report_chunks, open_sidecar, read_report, write_sidecar
+from SOURCES.Transpiler import REPORT_COLUMNS
+from SOURCES.utils import OUTPUT_DIR
+
+# Columnas derivadas, con los mismos nombres que los campos de GMAT (map_report_variable)
+ELEMENT_COLUMNS = ["SMA", "ECC", "INC", "RAAN", "AOP", "TA"]
+
+# Se calculan por bloques: los temporales de cart2kep no crecen con el report
+ELEMENTS_BLOCK = 200_000
+
+REPORT_PATH = OUTPUT_DIR / "DefaultReportFile.txt"
+
+# Caché junto al report (<report>.elem), con el formato del sidecar
+ELEMENTS_SUFFIX = ".elem"
+
+# Ejemplo (una vez por report; las siguientes se leen del disco):
+#     el = report_elements(REPORT_PATH, "Earth")
+#     el["Sat.SMA"], el["Sat.ECC"]          # km, adimensional
+#     make_plots(df, eventos, elements=el)   # + elementos_vs_tiempo.png
+
+
+def elements_path(path: Path) -> Path:
+    return Path(str(path) + ELEMENTS_SUFFIX)
+
+
+def states_to_elements(t: np.ndarray, states: np.ndarray, mu: float, sat_name: str = "Sat") -> pd.DataFrame:
+    """Tiempo + elementos keplerianos (astro.cart2kep) de estados (n, 6), por bloques."""
+    states = np.asarray(states, dtype=float).reshape(-1, 6)
+    out = np.empty((len(states), 6))
+    for i in range(0, len(states), ELEMENTS_BLOCK):
+        out[i:i + ELEMENTS_BLOCK] = cart2kep(states[i:i + ELEMENTS_BLOCK], mu)
+
+    df = pd.DataFrame(out, columns=[f"{sat_name}.{col}" for col in ELEMENT_COLUMNS])
+    df.insert(0, f"{sat_name}.{REPORT_COLUMNS[0]}", np.asarray(t, dtype=float))
+    return df
+
+
+def report_elements(path: Path = REPORT_PATH, central: str = "Earth", use_cache: bool = True) -> pd.DataFrame:
+    """
+    ElapsedDays + SMA, ECC, INC, RAAN, AOP, TA de cada fila del report.
+    Se calculan una vez, recorriendo el report por trozos, y se guardan en
+    <report>.elem; lo que se devuelve es ese fichero mapeado, así que la
+    memoria no crece con el report. Mientras el report y el cuerpo central
+    no cambien, las siguientes llamadas lo mapean sin recalcular nada.
+    """
+    path = Path(path)
+    mu = MU.get(central, MU["Earth"])
+    key = {"mu": mu}
+    if use_cache:
+        df = open_sidecar(path, out=elements_path(path), extra=key)
+        if df is not None:
+            return df
+
+    blocks = (_chunk_elements(chunk, mu) for chunk in iter_report_chunks(path, REPORT_COLUMNS))
+    if write_sidecar(path, blocks, out=elements_path(path), extra=key) is not None:
+        df = open_sidecar(path, out=elements_path(path), extra=key)
+        if df is not None:
+            print("✅ Elementos keplerianos guardados en:", elements_path(path))
+            return df
+
+    # El report ha cambiado mientras tanto: en memoria, sin caché
+    return _chunk_elements(read_report(path, REPORT_COLUMNS), mu)
+
+
+def _chunk_elements(report: pd.DataFrame, mu: float) -> pd.DataFrame:
+    sat_name = report.columns[1].rsplit(".", 1)[0] if "." in report.columns[1] else "Sat"
+    return states_to_elements(report.iloc[:, 0].to_numpy(), report.iloc[:, 1:7].to_numpy(), mu, sat_name)
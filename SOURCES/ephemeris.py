@@ -0,0 +1,198 @@
+import tempfile
+from pathlib import Path
+import numpy as np
+
+from SOURCES.propagator import make_dynamics, propagate_config
+from SOURCES.utils import OUTPUT_DIR
+
+# La del último pipeline (Main.py), junto al report
+EPHEMERIS_PATH = OUTPUT_DIR / "ephemeris.npz"
+
+# Ejemplo:
+#     eph = Ephemeris.from_rows(filas, make_dynamics(p))
+#     estados = eph(np.linspace(0.0, 1.0, 5000))   # (5000, 6), t en días
+#     eph.save(EPHEMERIS_PATH)
+#     # Sin tener el report entero en memoria (mismo fichero que el save de arriba):
+#     save_ephemeris_chunks(EPHEMERIS_PATH, (c.to_numpy() for c in iter_report_chunks(REPORT_PATH)), make_dynamics(p))
+
+
+class Ephemeris:
+    """
+    Trayectoria continua a trozos: entre cada dos nodos (t, r, v, a) la
+    posición es el polinomio de Hermite de grado 5 que cumple r, v y a en los
+    dos extremos, y la velocidad es su derivada. Cada consulta es una
+    búsqueda binaria (searchsorted) más evaluar el polinomio, para todos los
+    instantes a la vez.
+
+    Una maniobra aparece como dos nodos con el mismo t (antes y después, como
+    en el report): en ese instante side="right" da el estado tras el burn y
+    side="left" el de antes.
+    """
+
+    def __init__(self, t_days: np.ndarray, states: np.ndarray, accel: np.ndarray,
+                 sat_name: str = ""):
+        t_days = np.asarray(t_days, dtype=float)
+        if len(t_days) < 2:
+            raise ValueError("Hacen falta al menos 2 nodos para una efeméride")
+        if np.any(np.diff(t_days) < 0):
+            raise ValueError("Los tiempos de la efeméride deben ser crecientes")
+        self.t = t_days
+        self.states = np.asarray(states, dtype=float).reshape(-1, 6)
+        self.accel = np.asarray(accel, dtype=float).reshape(-1, 3)
+        self.sat_name = sat_name
+
+    # ---------- construcción ----------
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, dynamics=None, sat_name: str = "") -> "Ephemeris":
+        """
+        Desde filas del report (n, 7): ElapsedDays, X, Y, Z, VX, VY, VZ. La
+        aceleración en los nodos sale de dynamics (f(t [s], y) de
+        propagator.make_dynamics) o, si no se da, derivando la velocidad.
+        """
+        rows = np.asarray(rows, dtype=float)
+        t_days, states = rows[:, 0], rows[:, 1:7]
+        if dynamics is not None:
+            accel = dynamics(t_days * 86400.0, states)[:, 3:]
+        else:
+            accel = _velocity_derivative(t_days, states[:, 3:])
+        return cls(t_days, states, accel, sat_name)
+
+    @classmethod
+    def from_config(cls, p: dict, dynamics=None) -> "Ephemeris":
+        """Propaga la config resuelta con el propagador propio y usa su salida como nodos."""
+        f = dynamics or make_dynamics(p)
+        t_days, states = propagate_config(p, dynamics)
+        return cls(t_days, states, f(t_days * 86400.0, states)[:, 3:], p["sat_name"])
+
+    # ---------- consultas ----------
+    @property
+    def span(self) -> tuple[float, float]:
+        return float(self.t[0]), float(self.t[-1])
+
+    def __call__(self, t_days, side: str = "right") -> np.ndarray:
+        """Estado(s) en t [días]: (6,) para un escalar, (n, 6) para un array."""
+        tq = np.asarray(t_days, dtype=float)
+        scalar = tq.ndim == 0
+        tq = np.atleast_1d(tq)
+
+        t0, t1 = self.span
+        if tq.size and (tq.min() < t0 or tq.max() > t1):
+            raise ValueError(f"Instante fuera de la efeméride [{t0:g}, {t1:g}] días")
+
+        i = np.clip(np.searchsorted(self.t, tq, side=side) - 1, 0, len(self.t) - 2)
+        h = (self.t[i + 1] - self.t[i]) * 86400.0
+        # Tramo de longitud cero (burn al final): se toma el nodo de la derecha
+        h_ok = np.where(h > 0, h, 1.0)
+        s = np.where(h > 0, (tq - self.t[i]) * 86400.0 / h_ok, 1.0)[:, None]
+        h_ok = h_ok[:, None]
+
+        r, v = hermite(self.states[i], self.accel[i], self.states[i + 1], self.accel[i + 1], h_ok, s)
+
+        out = np.concatenate([r, v], axis=1)
+        return out[0] if scalar else out
+
+    def sample(self, step_days: float) -> tuple[np.ndarray, np.ndarray]:
+        """Malla uniforme (t [días], estados (n, 6)) que cubre toda la efeméride."""
+        t0, t1 = self.span
+        n = max(2, int(np.ceil((t1 - t0) / step_days)) + 1)
+        t = np.linspace(t0, t1, n)
+        return t, self(t)
+
+    # ---------- fichero ----------
+    def save(self, path: Path):
+        """Guarda los nodos en un .npz comprimido (t, estados, aceleraciones)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, t=self.t, states=self.states, accel=self.accel,
+                            sat_name=np.array(self.sat_name))
+
+    @classmethod
+    def load(cls, path: Path) -> "Ephemeris":
+        with np.load(Path(path)) as data:
+            return cls(data["t"], data["states"], data["accel"], str(data["sat_name"]))
+
+
+def save_ephemeris_chunks(path: Path, chunks, dynamics, sat_name: str = "") -> int:
+    """
+    Como Ephemeris.from_rows(filas, dynamics, sat_name).save(path), con las
+    filas (n, 7) por trozos: los nodos se van escribiendo a disco y el .npz
+    se comprime desde ahí, sin juntar nunca el report en memoria. Devuelve
+    el nº de nodos; con menos de 2 no escribe nada (ValueError como el
+    constructor) y los tiempos tienen que ser crecientes.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=path.parent, prefix=path.name + ".") as tmpdir:
+        tmp = Path(tmpdir)
+        n = 0
+        t_last = -np.inf
+        with (tmp / "t").open("wb") as ft, (tmp / "states").open("wb") as fs, (tmp / "accel").open("wb") as fa:
+            for rows in chunks:
+                rows = np.asarray(rows, dtype=float)
+                if not len(rows):
+                    continue
+                t_days, states = rows[:, 0], rows[:, 1:7]
+                if t_days[0] < t_last or np.any(np.diff(t_days) < 0):
+                    raise ValueError("Los tiempos de la efeméride deben ser crecientes")
+                t_last = t_days[-1]
+                ft.write(np.ascontiguousarray(t_days).tobytes())
+                fs.write(np.ascontiguousarray(states).tobytes())
+                fa.write(np.ascontiguousarray(dynamics(t_days * 86400.0, states)[:, 3:]).tobytes())
+                n += len(rows)
+        if n < 2:
+            raise ValueError("Hacen falta al menos 2 nodos para una efeméride")
+
+        # savez comprime los memmap por bloques: tampoco aquí se cargan enteros
+        np.savez_compressed(
+            path,
+            t=np.memmap(tmp / "t", dtype=float, mode="r", shape=(n,)),
+            states=np.memmap(tmp / "states", dtype=float, mode="r", shape=(n, 6)),
+            accel=np.memmap(tmp / "accel", dtype=float, mode="r", shape=(n, 3)),
+            sat_name=np.array(sat_name),
+        )
+    return n
+
+
+def hermite(y0: np.ndarray, a0: np.ndarray, y1: np.ndarray, a1: np.ndarray,
+            h: np.ndarray, s: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hermite quíntico de un tramo: estados y0, y1 (k, 6) y aceleraciones a0,
+    a1 (k, 3) en los extremos, duración h [s] (k, 1) y fracción s (k, 1)
+    del tramo. Devuelve (r, v) (k, 3) en s.
+    """
+    r0, v0, r1, v1 = y0[..., :3], y0[..., 3:], y1[..., :3], y1[..., 3:]
+
+    s2 = s * s
+    s3 = s2 * s
+    s4 = s3 * s
+    s5 = s4 * s
+    # Bases de Hermite quíntico y sus derivadas respecto a s
+    H0 = 1 - 10 * s3 + 15 * s4 - 6 * s5
+    H1 = s - 6 * s3 + 8 * s4 - 3 * s5
+    H2 = 0.5 * s2 - 1.5 * s3 + 1.5 * s4 - 0.5 * s5
+    H4 = -4 * s3 + 7 * s4 - 3 * s5
+    H5 = 0.5 * s3 - s4 + 0.5 * s5
+    dH0 = -30 * s2 + 60 * s3 - 30 * s4
+    dH1 = 1 - 18 * s2 + 32 * s3 - 15 * s4
+    dH2 = s - 4.5 * s2 + 6 * s3 - 2.5 * s4
+    dH4 = -12 * s2 + 28 * s3 - 15 * s4
+    dH5 = 1.5 * s2 - 4 * s3 + 2.5 * s4
+
+    # H3 = 1 - H0 y dH3 = -dH0
+    r = r1 + H0 * (r0 - r1) + h * (H1 * v0 + H4 * v1) + h * h * (H2 * a0 + H5 * a1)
+    v = dH0 * (r0 - r1) / h + dH1 * v0 + dH4 * v1 + h * (dH2 * a0 + dH5 * a1)
+    return r, v
+
+
+def _velocity_derivative(t_days: np.ndarray, vel: np.ndarray) -> np.ndarray:
+    """dv/dt [km/s^2] por diferencias finitas, sin cruzar los saltos de los burns."""
+    accel = np.zeros_like(vel)
+    t_s = t_days * 86400.0
+    # Trozos sin tiempos repetidos: cada burn abre uno nuevo
+    cuts = np.flatnonzero(np.diff(t_s) == 0) + 1
+    for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(t_s)]):
+        if b - a >= 3:
+            accel[a:b] = np.gradient(vel[a:b], t_s[a:b], axis=0, edge_order=2)
+        elif b - a == 2:
+            accel[a:b] = (vel[a + 1] - vel[a]) / (t_s[a + 1] - t_s[a])
+    return accel
@@ -0,0 +1,293 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.astro import RADIUS, epoch_to_jd, eq_to_ec, sun_position
+from SOURCES.ephemeris import hermite
+from SOURCES.propagator import make_dynamics
+from SOURCES.utils import OUTPUT_DIR
+
+EVENTS_PATH = OUTPUT_DIR / "events.csv"
+SUMMARY_PATH = OUTPUT_DIR / "events_summary.txt"
+
+EVENT_COLUMNS = ["trayectoria", "t [dias]", "evento", "r [km]", "alt [km]", "dv [km/s]"]
+
+# Precisión del instante de cada evento [s]
+EVENT_TOL_S = 1e-3
+
+# Ápsides: r·v/(|r||v|) (seno del ángulo de trayectoria) por debajo de esto
+# en los dos extremos de un tramo es ruido de una órbita (casi) circular,
+# no un periapsis/apoapsis de verdad
+APSIS_TOL = 1e-8
+
+
+def flight_path_sine(states: np.ndarray) -> np.ndarray:
+    """r·v/(|r||v|) de estados (k, 6): pasa de - a + en el periapsis y de + a - en el apoapsis."""
+    rv = np.einsum("ij,ij->i", states[:, :3], states[:, 3:])
+    return rv / (np.linalg.norm(states[:, :3], axis=1) * np.linalg.norm(states[:, 3:], axis=1))
+
+
+# ========== FUNCIONES DE EVENTO ==========
+# Cada una es g(t [días] (k,), y (k, 6)) -> (k,); el evento es un cambio de
+# signo de g: "sube" de - a + y "baja" de + a -. Un cambio de signo con
+# |g| < tol en los dos extremos no cuenta.
+
+def _event_functions(p: dict, altitudes=()) -> list[tuple[str, str, callable, float]]:
+    """(nombre al subir, nombre al bajar, g, tol) de los eventos que se buscan."""
+    radius = RADIUS.get(p["central_en"], RADIUS["Earth"])
+
+    def apsis(t, y):
+        # Normalizado (mismo signo que r·v) para que APSIS_TOL no dependa de la órbita
+        return flight_path_sine(y)
+
+    functions = [("periapsis", "apoapsis", apsis, APSIS_TOL)]
+
+    for h in altitudes:
+        def altitude(t, y, level=radius + h):
+            return np.sqrt(np.einsum("ij,ij->i", y[:, :3], y[:, :3])) - level
+        functions.append((f"sube_{h:g}km", f"baja_{h:g}km", altitude, 0.0))
+
+    # Sombra cilíndrica de la Tierra (la posición del Sol es de la Tierra)
+    if p["central_en"] == "Earth":
+        jd0 = epoch_to_jd(p["epoch_str"])
+        ecliptic = p["axes_type"] == "MJ2000Ec"
+
+        def shadow(t, y):
+            sun = sun_position(jd0 + t)
+            if ecliptic:
+                sun = eq_to_ec(sun)
+            u = sun / np.linalg.norm(sun, axis=-1, keepdims=True)
+            r = y[:, :3]
+            along = np.einsum("ij,ij->i", r, u)
+            perp = np.linalg.norm(r - along[:, None] * u, axis=-1)
+            # < 0 dentro del cilindro de sombra (detrás de la Tierra); en
+            # along = 0 las dos ramas valen lo mismo, así que g es continua
+            return np.where(along < 0, perp, np.linalg.norm(r, axis=-1)) - radius
+
+        functions.append(("sale_eclipse", "entra_eclipse", shadow, 0.0))
+
+    return functions
+
+
+# ========== BÚSQUEDA ==========
+
+def _refine(g, t0: np.ndarray, h: np.ndarray, y0, a0, y1, a1, g0, g1,
+            tol_s: float, max_iter: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Raíz de g en cada tramo [t0, t0 + h] a la vez (regula falsi con la
+    corrección de Illinois), con los estados intermedios del Hermite
+    quíntico del tramo. Devuelve (s en [0, 1], estado (k, 6)) de cada raíz.
+    """
+    sa, sb = np.zeros_like(h), np.ones_like(h)
+    ga, gb = g0.astype(float), g1.astype(float)
+    last = np.zeros(len(h), dtype=np.int8)   # lado que se movió la última vez
+    hc = h[:, None]
+
+    s = np.where(ga == 0, 0.0, 1.0)
+    for _ in range(max_iter):
+        s = (sa * gb - sb * ga) / (gb - ga)
+        s = np.clip(np.nan_to_num(s, nan=0.5), sa, sb)
+        r, v = hermite(y0, a0, y1, a1, hc, s[:, None])
+        gs = g(t0 + s * h / 86400.0, np.concatenate([r, v], axis=1))
+
+        left = np.signbit(gs) == np.signbit(ga)
+        # Illinois: si un lado se queda quieto dos veces, se divide su g entre 2
+        gb = np.where(left & (last == 1), gb / 2, gb)
+        ga = np.where(~left & (last == -1), ga / 2, ga)
+        sa = np.where(left, s, sa)
+        ga = np.where(left, gs, ga)
+        sb = np.where(left, sb, s)
+        gb = np.where(left, gb, gs)
+        last = np.where(left, 1, -1).astype(np.int8)
+
+        if np.all(((sb - sa) * h < tol_s) | (gs == 0)):
+            break
+
+    r, v = hermite(y0, a0, y1, a1, hc, s[:, None])
+    return s, np.concatenate([r, v], axis=1)
+
+
+def find_events(t_days: np.ndarray, states: np.ndarray, p: dict, altitudes=(),
+                dynamics=None, tol_s: float = EVENT_TOL_S, max_iter: int = 40) -> pd.DataFrame:
+    """
+    Eventos de una o varias trayectorias muestreadas en los mismos instantes:
+    t_days (M,) y states (M, 6) o (N, M, 6) (NaN donde no hay trayectoria,
+    como en sharding). Se evalúan todas las funciones de evento en todas las
+    muestras de golpe, se buscan los cambios de signo entre muestras
+    consecutivas y se refinan todos a la vez.
+
+    Eventos: periapsis/apoapsis (r·v = 0, salvo en órbitas circulares:
+    ver APSIS_TOL), sube_/baja_<h>km (cruces de cada
+    altitud de altitudes), entra_/sale_eclipse (sombra cilíndrica, solo con
+    la Tierra) y maniobra (dos muestras con el mismo t, como las que deja
+    cada burn en el report).
+
+    La aceleración de los extremos de cada tramo (para el Hermite) sale de
+    dynamics o, por defecto, de make_dynamics(p).
+    """
+    t = np.asarray(t_days, dtype=float)
+    Y = np.asarray(states, dtype=float)
+    if Y.ndim == 2:
+        Y = Y[None]
+    n, m = Y.shape[:2]
+    f = dynamics or make_dynamics(p)
+    radius = RADIUS.get(p["central_en"], RADIUS["Earth"])
+
+    dt = np.diff(t)
+    finite = np.isfinite(Y).all(axis=2)
+    tables = []
+
+    if m >= 2:
+        pair_ok = finite[:, :-1] & finite[:, 1:] & (dt > 0)[None, :]
+        flat = Y.reshape(-1, 6)
+        t_flat = np.broadcast_to(t, (n, m)).reshape(-1)
+
+        for up, down, g, tol in _event_functions(p, altitudes):
+            G = np.full(n * m, np.nan)
+            ok = finite.reshape(-1)
+            G[ok] = g(t_flat[ok], flat[ok])
+            G = G.reshape(n, m)
+
+            cross = pair_ok & (np.signbit(G[:, :-1]) != np.signbit(G[:, 1:]))
+            if tol > 0:
+                cross &= np.maximum(np.abs(G[:, :-1]), np.abs(G[:, 1:])) >= tol
+            traj, k = np.nonzero(cross)
+            if not len(traj):
+                continue
+
+            y0, y1 = Y[traj, k], Y[traj, k + 1]
+            a0 = f(t[k] * 86400.0, y0)[:, 3:]
+            a1 = f(t[k + 1] * 86400.0, y1)[:, 3:]
+            h = dt[k] * 86400.0
+            g0, g1 = G[traj, k], G[traj, k + 1]
+
+            s, y = _refine(g, t[k], h, y0, a0, y1, a1, g0, g1, tol_s, max_iter)
+            rn = np.linalg.norm(y[:, :3], axis=1)
+            tables.append(pd.DataFrame({
+                "trayectoria": traj,
+                "t [dias]": t[k] + s * dt[k],
+                "evento": np.where(g1 > g0, up, down),
+                "r [km]": rn,
+                "alt [km]": rn - radius,
+                "dv [km/s]": np.nan,
+            }))
+
+        # Maniobras: muestras repetidas en el mismo instante
+        burn = finite[:, :-1] & finite[:, 1:] & (dt == 0)[None, :]
+        traj, k = np.nonzero(burn)
+        if len(traj):
+            rn = np.linalg.norm(Y[traj, k + 1, :3], axis=1)
+            tables.append(pd.DataFrame({
+                "trayectoria": traj,
+                "t [dias]": t[k],
+                "evento": "maniobra",
+                "r [km]": rn,
+                "alt [km]": rn - radius,
+                "dv [km/s]": np.linalg.norm(Y[traj, k + 1, 3:] - Y[traj, k, 3:], axis=1),
+            }))
+
+    if not tables:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = pd.concat(tables, ignore_index=True)
+    return events.sort_values(["trayectoria", "t [dias]"], kind="stable").reset_index(drop=True)
+
+
+def find_events_chunks(chunks, p: dict, altitudes=(), dynamics=None,
+                       tol_s: float = EVENT_TOL_S, max_iter: int = 40) -> pd.DataFrame:
+    """
+    find_events de una trayectoria que llega por trozos de filas (n, 7)
+    (t, X, Y, Z, VX, VY, VZ; p.ej. de report_reader.iter_report_chunks), con
+    memoria acotada por el trozo. Cada trozo se busca con la última fila
+    del anterior delante, así que los eventos (y los burns) entre dos
+    trozos salen una sola vez.
+    """
+    f = dynamics or make_dynamics(p)
+    tables = []
+    last = None
+    for rows in chunks:
+        rows = np.asarray(rows, dtype=float)
+        if last is not None:
+            rows = np.vstack([last, rows])
+        if len(rows) >= 2:
+            events = find_events(rows[:, 0], rows[:, 1:7], p, altitudes, f, tol_s, max_iter)
+            if len(events):
+                tables.append(events)
+        if len(rows):
+            last = rows[-1:]
+
+    if not tables:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = pd.concat(tables, ignore_index=True)
+    return events.sort_values(["trayectoria", "t [dias]"], kind="stable").reset_index(drop=True)
+
+
+# ========== RESUMEN ==========
+
+def eclipse_intervals(events: pd.DataFrame, t_start: float, t_end: float,
+                      trayectoria: int = 0) -> list[tuple[float, float]]:
+    """Intervalos [entrada, salida] de eclipse (abiertos en los extremos si empieza o acaba a la sombra)."""
+    ev = events[(events["trayectoria"] == trayectoria)
+                & events["evento"].isin(["entra_eclipse", "sale_eclipse"])]
+    intervals = []
+    start = None
+    for t, name in zip(ev["t [dias]"], ev["evento"]):
+        if name == "entra_eclipse":
+            start = t
+        elif start is not None:
+            intervals.append((start, t))
+            start = None
+        elif not intervals:
+            intervals.append((t_start, t))   # empezó a la sombra
+    if start is not None:
+        intervals.append((start, t_end))
+    return intervals
+
+
+def summarize_events(events: pd.DataFrame, t_start: float, t_end: float,
+                     notes: list[str] = ()) -> str:
+    """
+    Resumen en texto, por trayectoria: nº de eventos, ápsides extremos y
+    eclipses. notes son líneas que van debajo del título (p.ej. el campo
+    gravitatorio usado, gravity.field_note).
+    """
+    lines = [f"Eventos entre t = {t_start:g} y t = {t_end:g} días", *notes, ""]
+    span = t_end - t_start
+
+    for traj, ev in events.groupby("trayectoria"):
+        lines.append(f"--- Trayectoria {traj} ---")
+        counts = ev["evento"].value_counts()
+        for name, count in counts.sort_index().items():
+            lines.append(f"{name:>20}: {count}")
+
+        peri = ev[ev["evento"] == "periapsis"]
+        apo = ev[ev["evento"] == "apoapsis"]
+        if len(peri):
+            lines.append(f"Altitud mínima de periapsis: {peri['alt [km]'].min():.3f} km")
+        if len(apo):
+            lines.append(f"Altitud máxima de apoapsis:  {apo['alt [km]'].max():.3f} km")
+
+        burns = ev[ev["evento"] == "maniobra"]
+        if len(burns):
+            lines.append(f"Delta-V total de maniobras:  {burns['dv [km/s]'].sum():.6f} km/s")
+
+        intervals = eclipse_intervals(events, t_start, t_end, traj)
+        if intervals:
+            total = sum(b - a for a, b in intervals)
+            longest = max(b - a for a, b in intervals)
+            lines.append(f"Eclipses: {len(intervals)}, {total * 24:.3f} h en total "
+                         f"({100 * total / span:.2f} %), el más largo {longest * 1440:.2f} min")
+        lines.append("")
+
+    if events.empty:
+        lines.append("Sin eventos")
+    return "\n".join(lines)
+
+
+def write_events(events: pd.DataFrame, t_start: float, t_end: float,
+                 path: Path = EVENTS_PATH, summary_path: Path = SUMMARY_PATH,
+                 notes: list[str] = ()):
+    """Tabla de eventos (CSV) y su resumen (texto)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    events.to_csv(path, index=False, float_format="%.12g")
+    summary_path.write_text(summarize_events(events, t_start, t_end, notes), encoding="utf-8")
+    print(f"✅ {len(events)} eventos escritos en: {path}")
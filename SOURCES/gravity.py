@@ -0,0 +1,370 @@
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+
+from SOURCES.astro import MU, RADIUS
+from SOURCES.GMAT_exec import find_gmat
+from SOURCES.utils import DATA_DIR
+
+# Ficheros .cof propios (p.ej. copiados de <GMAT>/data/gravity/earth)
+GRAVITY_DIR = DATA_DIR / "gravity"
+
+# Coeficientes normalizados de EGM96 hasta grado y orden 4: se usan si no
+# se encuentra el fichero del modelo pedido. {(n, m): (C, S)}
+BUILTIN_COEFFICIENTS = {
+    (2, 0): (-4.84165371736e-04, 0.0),
+    (2, 1): (-1.86987635955e-10, 1.19528012031e-09),
+    (2, 2): (2.43914352398e-06, -1.40016683654e-06),
+    (3, 0): (9.57254173792e-07, 0.0),
+    (3, 1): (2.03046201047e-06, 2.48200415856e-07),
+    (3, 2): (9.04787894809e-07, -6.19005475177e-07),
+    (3, 3): (7.21321757121e-07, 1.41434926192e-06),
+    (4, 0): (5.39873863789e-07, 0.0),
+    (4, 1): (-5.36157389388e-07, -4.73567346518e-07),
+    (4, 2): (3.50694105785e-07, 6.62671572540e-07),
+    (4, 3): (9.90771803829e-07, -2.00928369177e-07),
+    (4, 4): (-1.88560802735e-07, 3.08853169333e-07),
+}
+
+# El integrador evalúa la gravedad de un estado en un estado: hasta
+# SMALL_BATCH puntos (y grado TRIG_MAX_DEGREE, por memoria) los Legendre
+# salen de un producto de matrices en vez de la recursión grado a grado
+SMALL_BATCH = 8
+TRIG_MAX_DEGREE = 40
+
+# Cerca del polo P[n, m] (m >= 1) tiende a 0 y la suma trigonométrica lo
+# da con error absoluto, no relativo: por debajo de este cos(phi) se usa la
+# recursión. En el eje (x = y = 0) el término en lambda es 0/0 (su límite
+# es finito): se evalúa a POLE_EPS * r del eje, que es el mismo límite
+TRIG_MIN_COS = 1e-3
+POLE_EPS = 1e-12
+
+# Números de una línea .cof (pueden venir pegados: "-.48E-03-.12E-05")
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[EeDd][-+]?\d+)?")
+
+
+def _search_paths(filename: str) -> list[Path]:
+    paths = [GRAVITY_DIR / filename]
+    try:
+        paths.append(find_gmat().parent.parent / "data" / "gravity" / "earth" / filename)
+    except FileNotFoundError:
+        pass
+    return paths
+
+
+def read_cof(path: Path) -> tuple[float, float, np.ndarray, np.ndarray]:
+    """
+    Lee un fichero de coeficientes .cof de GMAT (POTFIELD + líneas RECOEF).
+    Devuelve (mu [km^3/s^2], radio [km], C, S) con C, S normalizados de
+    forma (grado+1, grado+1).
+    """
+    mu, radius = MU["Earth"], RADIUS["Earth"]
+    coeffs = {}
+
+    with Path(path).open("r", encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            tag = line[:8].strip().upper()
+            if tag == "POTFIELD":
+                nums = [float(v.replace("D", "E").replace("d", "e")) for v in _NUMBER_RE.findall(line[8:])]
+                if len(nums) >= 5:
+                    mu, radius = nums[3], nums[4]
+            elif tag == "RECOEF":
+                nums = _NUMBER_RE.findall(line[8:])
+                if len(nums) >= 3:
+                    n, m = int(nums[0]), int(nums[1])
+                    c = float(nums[2].replace("D", "E").replace("d", "e"))
+                    s = float(nums[3].replace("D", "E").replace("d", "e")) if len(nums) > 3 else 0.0
+                    coeffs[(n, m)] = (c, s)
+            elif tag == "END":
+                break
+
+    # En los .cof vienen en m^3/s^2 y m
+    if radius > 1e5:
+        mu, radius = mu * 1e-9, radius * 1e-3
+
+    return (mu, radius, *_coefficient_arrays(coeffs))
+
+
+def _coefficient_arrays(coeffs: dict) -> tuple[np.ndarray, np.ndarray]:
+    degree = max(n for n, _ in coeffs)
+    C = np.zeros((degree + 1, degree + 1))
+    S = np.zeros((degree + 1, degree + 1))
+    for (n, m), (c, s) in coeffs.items():
+        if m <= n:
+            C[n, m], S[n, m] = c, s
+    C[0, 0] = 1.0   # término central (masa puntual)
+    return C, S
+
+
+# Origen de los coeficientes cuando no se encuentra el .cof
+BUILTIN_SOURCE = "interno EGM96 4x4"
+
+
+@lru_cache(maxsize=None)
+def load_coefficients(filename: str) -> tuple[float, float, np.ndarray, np.ndarray, str]:
+    """
+    Coeficientes del modelo (se leen una sola vez por fichero) y de dónde
+    salen. Si el .cof no está ni en DATA/gravity ni en la instalación de
+    GMAT, se usa BUILTIN_COEFFICIENTS (EGM96 4x4) y el origen es BUILTIN_SOURCE.
+    """
+    for path in _search_paths(filename):
+        if path.exists():
+            mu, radius, C, S = read_cof(path)
+            source = str(path)
+            print(f"✅ Campo gravitatorio {filename} cargado (grado {len(C) - 1}) desde: {path}")
+            break
+    else:
+        print(f"⚠ No se encuentra {filename}; se usa el campo interno EGM96 4x4")
+        mu, radius = MU["Earth"], RADIUS["Earth"]
+        C, S = _coefficient_arrays(BUILTIN_COEFFICIENTS)
+        source = BUILTIN_SOURCE
+
+    C.setflags(write=False)
+    S.setflags(write=False)
+    return mu, radius, C, S, source
+
+
+class GravityField:
+    """
+    Campo de armónicos esféricos (coeficientes normalizados) truncado a
+    degree x order. acceleration() evalúa la aceleración en ejes fijos al
+    cuerpo para uno o muchos puntos a la vez: los Legendre normalizados
+    salen de la recursión estándar, un grado por iteración y todos los
+    órdenes (y todos los puntos) en cada operación. Con pocos puntos (un
+    estado por llamada del integrador) ese bucle es casi todo sobrecarga de
+    Python, y se usa _legendre_trig: P[n, m](sin phi) es un polinomio
+    trigonométrico de grado n en phi, cuyos coeficientes se sacan una vez
+    aquí (FFT de la recursión), así que P y dP/dphi son un solo matmul.
+    Con un solo punto (_acceleration_one) los senos/cosenos salen de
+    potencias complejas y las sumas de dos matmul más. Con timeit, a 20x20
+    y por llamada del integrador (propagator._field_gravity), sale unas 6
+    veces la masa puntual (antes 17); la mitad es ya el matmul de _trig.
+    """
+
+    def __init__(self, mu: float, radius: float, C: np.ndarray, S: np.ndarray,
+                 degree: int, order: int, source: str = ""):
+        # Lo pedido; degree/order son lo que se evalúa (como mucho lo que trae C)
+        self.requested = (degree, order)
+        self.source = source
+        degree = min(degree, len(C) - 1)
+        order = min(order, degree)
+        self.mu = mu
+        self.radius = radius
+        self.degree = degree
+        self.order = order
+        self.C = np.ascontiguousarray(C[:degree + 1, :order + 1])
+        self.S = np.ascontiguousarray(S[:degree + 1, :order + 1])
+
+        # Hace falta P[n, m+1] para la derivada: columnas hasta order+1
+        n = np.arange(degree + 1, dtype=float)[:, None]
+        m = np.arange(order + 2, dtype=float)[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = np.sqrt((2 * n - 1) * (2 * n + 1) / ((n - m) * (n + m)))
+            b = np.sqrt((2 * n + 1) * (n + m - 1) * (n - m - 1) / ((n - m) * (n + m) * (2 * n - 3)))
+        valid = m < n
+        self._a_col = np.where(valid, a, 0.0)[:, :, None]
+        self._b_col = np.where(valid & (m < n - 1), b, 0.0)[:, :, None]
+        # P[m, m] = diag[m] * cos(phi) * P[m-1, m-1]
+        mm = np.arange(order + 2, dtype=float)
+        self._diag = np.sqrt((2 * mm + 1) / np.maximum(2 * mm, 1))
+        self._diag[1] = np.sqrt(3.0)
+
+        # dP[n, m]/dphi = dfac[n, m] * P[n, m+1] - m tan(phi) P[n, m]
+        m = m[:, :order + 1]
+        self._dfac = np.sqrt(np.maximum((n - m) * (n + m + 1), 0.0) / np.where(m == 0, 2.0, 1.0))
+        self._n1 = np.arange(degree + 1, dtype=float) + 1.0
+        self._m = np.arange(order + 1, dtype=float)
+        self._n_col = np.arange(degree + 1, dtype=float)[:, None]
+        self._m_col = self._m[:, None]
+        # Coeficientes de cada (n, m) frente a P*cos, P*sin (dU/dr y dU/dlambda)
+        # y dP*cos, dP*sin (dU/dphi), multiplicados una sola vez
+        n1, mm = self._n1[:, None], self._m[None, :]
+        self._KP = np.stack([n1 * self.C, n1 * self.S, mm * self.S, -mm * self.C])
+        self._KdP = np.stack([self.C, self.S])
+
+        self._trig = self._trig_coefficients() if degree <= TRIG_MAX_DEGREE else None
+        if self._trig is not None:
+            self._one_matrices()
+
+    def _trig_coefficients(self) -> np.ndarray:
+        """
+        Matriz (2 * (degree+1) * (order+1), 2 * (degree+1)) que lleva la base
+        [cos(j phi); sin(j phi)], j = 0..degree, a [P; dP/dphi] aplanados.
+        """
+        J = self.degree + 1
+        M = 2 * J   # > 2 * degree: la FFT recupera los coeficientes exactos
+        phi = 2.0 * np.pi * np.arange(M) / M
+        P = self._legendre(np.sin(phi), np.cos(phi))[:, :self.order + 1]
+        F = np.fft.rfft(P, axis=-1)[..., :J] / M
+        a = 2.0 * F.real
+        a[..., 0] *= 0.5
+        b = -2.0 * F.imag
+        j = np.arange(J, dtype=float)
+        # d/dphi: cos(j phi) -> -j sin(j phi), sin(j phi) -> j cos(j phi)
+        value = np.concatenate([a, b], axis=-1)
+        deriv = np.concatenate([j * b, -j * a], axis=-1)
+        return np.ascontiguousarray(np.stack([value, deriv]).reshape(-1, 2 * J))
+
+    def _one_matrices(self):
+        """Lo de _acceleration_one: _trig y _KP/_KdP reordenados para ir de matmul en matmul."""
+        J, M = self.degree + 1, self.order + 1
+        # Columnas intercaladas (cos, sin) de cada j, como e.view(float) de
+        # e = exp(i j phi); filas (P/dP, m, n)
+        T = self._trig.reshape(2, J, M, 2, J).transpose(0, 2, 1, 4, 3)
+        self._trig_one = np.ascontiguousarray(T.reshape(2 * M * J, 2 * J))
+        # K[d, c, m, n]: d = dU/dr, dU/dlambda, dU/dphi; c = cos/sin(m lambda)
+        K = np.concatenate([self._KP, self._KdP]).reshape(3, 2, J, M)
+        self._K_one = np.ascontiguousarray(K.transpose(0, 1, 3, 2))
+        self._j = np.arange(J, dtype=float)
+        self._q_one = np.array([0, 0, 1])   # dU/dr y dU/dlambda van con P, dU/dphi con dP
+
+    def _acceleration_one(self, x: float, y: float, z: float) -> np.ndarray:
+        """acceleration() de un punto fuera del eje, con floats y matmul (sin einsum ni recursión)."""
+        rho2 = x * x + y * y
+        rn2 = rho2 + z * z
+        rn, rho = math.sqrt(rn2), math.sqrt(rho2)
+        J, M = self.degree + 1, self.order + 1
+
+        # cos/sin(j phi) intercalados; cos(m lambda) y luego sin(m lambda)
+        e = complex(rho / rn, z / rn) ** self._j
+        w = complex(x / rho, y / rho) ** self._m
+        ratio = (self.radius / rn) ** self._j
+
+        PdP = (self._trig_one @ e.view(np.float64)).reshape(2, 1, M, J)
+        X = (self._K_one * PdP[self._q_one]).reshape(-1, J) @ ratio    # (d, c, m)
+        s_r, s_lam, s_phi = (X.reshape(3, 2 * M) @ np.concatenate([w.real, w.imag])).tolist()
+
+        mu_r = self.mu / rn
+        dU_dr = -mu_r / rn * s_r
+        dU_dlam = mu_r * s_lam
+        dU_dphi = mu_r * s_phi
+
+        radial = dU_dr / rn - z / (rn2 * rho) * dU_dphi
+        return np.array([radial * x - dU_dlam / rho2 * y,
+                         radial * y + dU_dlam / rho2 * x,
+                         dU_dr / rn * z + rho / rn2 * dU_dphi])
+
+    def _legendre_trig(self, sphi: np.ndarray, cphi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """P y dP/dphi (degree+1, order+1, k) con _trig (pocos puntos, sin bucle por grado)."""
+        e = np.exp(1j * np.arange(self.degree + 1)[:, None] * np.arctan2(sphi, cphi))
+        out = self._trig @ np.concatenate([e.real, e.imag])
+        out = out.reshape(2, self.degree + 1, self.order + 1, len(sphi))
+        return out[0], out[1]
+
+    def _legendre(self, sphi: np.ndarray, cphi: np.ndarray) -> np.ndarray:
+        """P normalizados (degree+1, order+2, k) para k puntos (puntos en el último eje)."""
+        cols = self.order + 2
+        # Una fila de ceros delante (P[n-2] para n = 1): el bucle no tiene casos especiales
+        P = np.zeros((self.degree + 2, cols, len(sphi)))
+        P[1, 0] = 1.0
+        for n in range(1, self.degree + 1):
+            P[n + 1] = self._a_col[n] * sphi * P[n] - self._b_col[n] * P[n - 1]
+            if n < cols:
+                P[n + 1, n] = self._diag[n] * cphi * P[n, n - 1]
+        return P[1:]
+
+    def _spherical(self, r: np.ndarray):
+        x, y, z = r[:, 0], r[:, 1], r[:, 2]
+        rho2 = x * x + y * y
+        rn2 = rho2 + z * z
+        rn = np.sqrt(rn2)
+        rho = np.sqrt(rho2)
+        lam = np.arctan2(y, x)
+        return x, y, z, rho2, rho, rn2, rn, z / rn, rho / rn, lam
+
+    def acceleration(self, r: np.ndarray) -> np.ndarray:
+        """Aceleración [km/s^2] en r (..., 3) [km], ejes fijos al cuerpo. Incluye el término central."""
+        r = np.asarray(r, dtype=float)
+        shape = r.shape
+        r = r.reshape(-1, 3)
+        if len(r) == 1 and self._trig is not None:
+            x, y, z = r[0].tolist()
+            rn2 = x * x + y * y + z * z
+            if x * x + y * y > TRIG_MIN_COS ** 2 * rn2:
+                return self._acceleration_one(x, y, z).reshape(shape)
+
+        # En el eje (o a menos de POLE_EPS * r): un poco hacia +x, ver POLE_EPS
+        axis = np.einsum("ij,ij->i", r[:, :2], r[:, :2]) <= POLE_EPS ** 2 * np.einsum("ij,ij->i", r, r)
+        if axis.any():
+            r = r.copy()
+            r[axis, 0] = np.hypot(POLE_EPS * np.linalg.norm(r[axis], axis=1), r[axis, 0])
+        x, y, z, rho2, rho, rn2, rn, sphi, cphi, lam = self._spherical(r)
+
+        if self._trig is not None and len(sphi) <= SMALL_BATCH and np.all(cphi > TRIG_MIN_COS):
+            Pnm, dP = self._legendre_trig(sphi, cphi)   # (n, m, k)
+        else:
+            P = self._legendre(sphi, cphi)           # (n, m+1, k)
+            Pnm = P[:, :self.order + 1]
+            tphi = sphi / cphi
+            dP = self._dfac[:, :, None] * P[:, 1:] - self._m_col * tphi * Pnm
+        ratio = ((self.radius / rn) ** self._n_col)[:, None]   # (n, 1, k)
+
+        # Suma en n con los coeficientes (_KP, _KdP) y luego en m con cos/sin(m lambda)
+        X = np.einsum("cnm,nmk->cmk", self._KP, Pnm * ratio)     # (4, m, k)
+        Y = np.einsum("cnm,nmk->cmk", self._KdP, dP * ratio)     # (2, m, k)
+        mlam = self._m_col * lam                     # (m, k)
+        cs = np.stack([np.cos(mlam), np.sin(mlam)])  # (2, m, k)
+        sums = np.einsum("dcmk,cmk->dk", np.concatenate([X, Y]).reshape(3, 2, *cs.shape[1:]), cs)
+
+        mu_r = self.mu / rn
+        dU_dr = -mu_r / rn * sums[0]
+        dU_dlam = mu_r * sums[1]
+        dU_dphi = mu_r * sums[2]
+
+        radial = dU_dr / rn - z / (rn2 * rho) * dU_dphi
+        ax = radial * x - dU_dlam / rho2 * y
+        ay = radial * y + dU_dlam / rho2 * x
+        az = dU_dr / rn * z + rho / rn2 * dU_dphi
+        return np.stack([ax, ay, az], axis=-1).reshape(shape)
+
+    def potential(self, r: np.ndarray) -> np.ndarray:
+        """Potencial U [km^2/s^2] en r (..., 3) [km], ejes fijos al cuerpo."""
+        r = np.asarray(r, dtype=float)
+        x, y, z, rho2, rho, rn2, rn, sphi, cphi, lam = self._spherical(r.reshape(-1, 3))
+        P = self._legendre(sphi, cphi)[:, :self.order + 1]
+        ratio = (self.radius / rn) ** np.arange(self.degree + 1)[:, None]
+        mlam = self._m[:, None] * lam
+        T = self.C[:, :, None] * np.cos(mlam) + self.S[:, :, None] * np.sin(mlam)
+        return (self.mu / rn * np.einsum("nk,nmk->k", ratio, P * T)).reshape(r.shape[:-1])
+
+
+@lru_cache(maxsize=None)
+def get_field(filename: str, degree: int, order: int) -> GravityField:
+    """Campo truncado a degree x order (uno por combinación, reutilizado entre ejecuciones)."""
+    mu, radius, C, S, source = load_coefficients(filename)
+    if degree > len(C) - 1:
+        print(f"⚠ {filename} solo llega a grado {len(C) - 1}; se trunca ahí")
+    return GravityField(mu, radius, C, S, degree, order, source)
+
+
+def field_info(p: dict) -> dict:
+    """
+    Campo que evalúa de verdad el modelo numpy con la config resuelta, para
+    el registro de la ejecución: grado y orden efectivos (menores que los
+    pedidos si el fichero no llega o falta) y origen de los coeficientes.
+    Vacío si la config no tiene campo.
+    """
+    if p.get("gravity_degree", 0) <= 0:
+        return {}
+    field = get_field(p["gravity_file"], p["gravity_degree"], p["gravity_order"])
+    return {
+        "gravity_file": p["gravity_file"],
+        "gravity_source": field.source,
+        "gravity_degree_used": field.degree,
+        "gravity_order_used": field.order,
+    }
+
+
+def field_note(p: dict) -> str:
+    """Lo mismo que field_info en una línea (para el resumen de eventos); "" sin campo."""
+    info = field_info(p)
+    if not info:
+        return ""
+    used = f"{info['gravity_degree_used']}x{info['gravity_order_used']}"
+    asked = f"{p['gravity_degree']}x{p['gravity_order']}"
+    note = f"Campo gravitatorio: {info['gravity_file']} {used} ({info['gravity_source']})"
+    if used != asked:
+        note += f"; pedido {asked}, truncado"
+    return note
@@ -1,26 +1,45 @@
+import multiprocessing as mp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D  
 import sys
+from SOURCES.decimate import m4_blocks, m4_indices, path_points
+from SOURCES.elements import ELEMENT_COLUMNS
+from SOURCES.events import eclipse_intervals
+from SOURCES.report_reader import read_report
+from SOURCES.report_stats import PLOT_BUCKETS, stream_stats
 from SOURCES.utils import INPUT_DIR, OUTPUT_DIR, PLOTS_DIR
 
 DATOS_PATH  = INPUT_DIR / "datos_guardados.txt"
 REPORT_PATH = OUTPUT_DIR / "DefaultReportFile.txt"
 
+PLOT_DPI = 300
 
-def load_report(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        raise FileNotFoundError(f"No se encuentra el report: {path}")
+# Lo que tarda cada figura en serie [s] (a PLOT_DPI, con la serie ya
+# diezmada: casi no depende del report). Con menos de POOL_MIN_SECONDS en
+# total se pinta en serie: arrancar procesos spawn (que reimportan Main y
+# la GUI) cuesta del orden de un segundo
+FIGURE_SECONDS = {
+    "trayectoria_3D": 0.6,
+    "orbita_XY": 0.7,
+    "velocidades_vs_tiempo": 0.9,
+    "velocidad_modulo_vs_tiempo": 0.9,
+    "radio_vs_tiempo": 0.9,
+    "elementos_vs_tiempo": 2.5,
+}
+POOL_MIN_SECONDS = 3.0
 
-    # Leemos separado por espacios (uno o más)
-    df = pd.read_csv(path, sep=r"\s+", engine="python")
 
-    # Forzar a numérico y eliminar filas no numéricas (cabeceras repetidas, etc.)
-    df = df.apply(pd.to_numeric, errors="coerce").dropna()
+def load_report(path: Path, columns=None) -> pd.DataFrame:
+    # Parser C, sin las cabeceras repetidas (ver SOURCES.report_reader)
+    df = read_report(path, columns)
 
-    if df.shape[1] < 7:
+    if columns is None and df.shape[1] < 7:
         raise ValueError(
             f"El report tiene {df.shape[1]} columnas, "
             "pero esperaba al menos 7 (t, X, Y, Z, VX, VY, VZ)."
@@ -58,110 +77,265 @@ def leer_tiempos_burn(path: Path):
     return tiempos
 
 
-def make_plots(df: pd.DataFrame):
-    PLOTS_DIR.mkdir(exist_ok=True)
+# ========== FIGURAS ==========
+# Cada figura es una función (t, st, burn_times, events) que la guarda en
+# PLOTS_DIR; st son las filas (n, 7) del report: t, X, Y, Z, VX, VY, VZ.
+
+def _mark_burns(ax, burn_times):
+    for tb in burn_times:
+        ax.axvline(tb, color="k", linestyle="--", alpha=0.7)
+
+
+def _pixels(fig, axis: int | None = 0) -> int:
+    """Píxeles del PNG a lo ancho (axis=0) o del lado mayor (None): buckets/celdas del LOD."""
+    size = fig.get_size_inches()
+    return int((size[axis] if axis is not None else size.max()) * PLOT_DPI)
+
+
+def _save(fig, name: str):
+    plt.tight_layout()
+    fig.savefig(PLOTS_DIR / f"{name}.png", dpi=PLOT_DPI, bbox_inches="tight")
+    plt.close(fig)
+
 
-    cols = df.columns.tolist()
-    t_col  = cols[0]
-    x_col  = cols[1]
-    y_col  = cols[2]
-    z_col  = cols[3]
-    vx_col = cols[4]
-    vy_col = cols[5]
-    vz_col = cols[6]
-
-    t  = df[t_col].values
-    x  = df[x_col].values
-    y  = df[y_col].values
-    z  = df[z_col].values
-    vx = df[vx_col].values
-    vy = df[vy_col].values
-    vz = df[vz_col].values
-
-    speed = np.sqrt(vx**2 + vy**2 + vz**2)
-    r     = np.sqrt(x**2 + y**2 + z**2)
-
-    # Intentamos leer los tiempos de burn (si existen)
-    burn_times = leer_tiempos_burn(DATOS_PATH)
-    print("Tiempos de burn leídos:", burn_times)
-
-    # === 1) Trayectoria 3D ===
+def _fig_trayectoria_3d(t, st, burn_times, events):
     fig = plt.figure()
     ax = fig.add_subplot(111, projection="3d")
-    ax.plot(x, y, z)
+    ax.plot(*path_points(st[:, 1:4], _pixels(fig, None), t).T)
     ax.set_xlabel("X [km]")
     ax.set_ylabel("Y [km]")
     ax.set_zlabel("Z [km]")
     ax.set_title("Trayectoria 3D")
     ax.set_box_aspect([1, 1, 1])  # ejes a la misma escala
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "trayectoria_3D.png", dpi=300, bbox_inches="tight")
-    plt.close(fig)
+    _save(fig, "trayectoria_3D")
 
-    # === 2) Órbita en plano XY ===
+
+def _fig_orbita_xy(t, st, burn_times, events):
     fig, ax = plt.subplots()
-    ax.plot(x, y)
+    ax.plot(*path_points(st[:, 1:3], _pixels(fig, None), t).T)
     ax.set_xlabel("X [km]")
     ax.set_ylabel("Y [km]")
     ax.set_title("Órbita en el plano XY")
     ax.axis("equal")
     ax.grid(True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "orbita_XY.png", dpi=300, bbox_inches="tight")
-    plt.close(fig)
-
-    # === 3) Componentes de velocidad vs tiempo ===
-    fig, ax = plt.subplots()
-    ax.plot(t, vx, label="Vx")
-    ax.plot(t, vy, label="Vy")
-    ax.plot(t, vz, label="Vz")
+    _save(fig, "orbita_XY")
 
-    # Marcar burns si existen
-    for tb in burn_times:
-        ax.axvline(tb, color="k", linestyle="--", alpha=0.7)
 
+def _fig_velocidades(t, st, burn_times, events):
+    fig, ax = plt.subplots()
+    k = m4_indices(t, st[:, 4:7], _pixels(fig))
+    ax.plot(t[k], st[k, 4], label="Vx")
+    ax.plot(t[k], st[k, 5], label="Vy")
+    ax.plot(t[k], st[k, 6], label="Vz")
+    _mark_burns(ax, burn_times)
     ax.set_xlabel("Tiempo [días]")
     ax.set_ylabel("Velocidad [km/s]")
     ax.set_title("Componentes de velocidad vs tiempo")
     ax.grid(True)
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "velocidades_vs_tiempo.png", dpi=300, bbox_inches="tight")
-    plt.close(fig)
-
-    # === 4) Módulo de la velocidad vs tiempo ===
-    fig, ax = plt.subplots()
-    ax.plot(t, speed, label="|V|")
+    _save(fig, "velocidades_vs_tiempo")
 
-    for tb in burn_times:
-        ax.axvline(tb, color="k", linestyle="--", alpha=0.7)
 
+def _fig_velocidad_modulo(t, st, burn_times, events):
+    fig, ax = plt.subplots()
+    speed = np.sqrt(np.einsum("ij,ij->i", st[:, 4:7], st[:, 4:7]))
+    k = m4_indices(t, speed, _pixels(fig))
+    ax.plot(t[k], speed[k], label="|V|")
+    _mark_burns(ax, burn_times)
     ax.set_xlabel("Tiempo [días]")
     ax.set_ylabel("|V| [km/s]")
     ax.set_title("Módulo de la velocidad vs tiempo")
     ax.grid(True)
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "velocidad_modulo_vs_tiempo.png", dpi=300, bbox_inches="tight")
-    plt.close(fig)
+    _save(fig, "velocidad_modulo_vs_tiempo")
+
 
-    # === 5) Distancia al cuerpo central r(t) ===
+def _fig_radio(t, st, burn_times, events):
     fig, ax = plt.subplots()
-    ax.plot(t, r, label="r")
+    r = np.sqrt(np.einsum("ij,ij->i", st[:, 1:4], st[:, 1:4]))
+    k = m4_indices(t, r, _pixels(fig))
+    ax.plot(t[k], r[k], label="r")
+    _mark_burns(ax, burn_times)
 
-    for tb in burn_times:
-        ax.axvline(tb, color="k", linestyle="--", alpha=0.7)
+    if events is not None:
+        for name, marker in (("periapsis", "v"), ("apoapsis", "^")):
+            ap = events[events["evento"] == name]
+            if len(ap):
+                ax.plot(ap["t [dias]"], ap["r [km]"], marker, linestyle="none", markersize=4, label=name)
+        for i, (a, b) in enumerate(eclipse_intervals(events, t[0], t[-1])):
+            ax.axvspan(a, b, color="gray", alpha=0.25, label="eclipse" if i == 0 else None)
 
     ax.set_xlabel("Tiempo [días]")
     ax.set_ylabel("r [km]")
     ax.set_title("Distancia al cuerpo central vs tiempo")
     ax.grid(True)
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "radio_vs_tiempo.png", dpi=300, bbox_inches="tight")
-    plt.close(fig)
+    _save(fig, "radio_vs_tiempo")
+
+
+_ELEMENT_UNITS = {"SMA": "km", "ECC": "-"}
+
+
+def _fig_elementos(t, el, burn_times, events):
+    # el: ElapsedDays + SMA, ECC, INC, RAAN, AOP, TA (SOURCES.elements)
+    fig, axes = plt.subplots(3, 2, sharex=True, figsize=(10, 8))
+    # Dos columnas de subplots: la mitad de ancho cada una
+    buckets = _pixels(fig) // 2
+    for ax, j, name in zip(axes.flat, range(1, 7), ELEMENT_COLUMNS):
+        k = m4_indices(t, el[:, j], buckets)
+        ax.plot(t[k], el[k, j])
+        _mark_burns(ax, burn_times)
+        ax.set_ylabel(f"{name} [{_ELEMENT_UNITS.get(name, 'deg')}]")
+        ax.grid(True)
+    for ax in axes[-1]:
+        ax.set_xlabel("Tiempo [días]")
+    fig.suptitle("Elementos keplerianos vs tiempo")
+    _save(fig, "elementos_vs_tiempo")
+
+
+# Nombre (el del PNG) -> función; "elementos_vs_tiempo" pinta las columnas de elements
+FIGURES = {
+    "trayectoria_3D": _fig_trayectoria_3d,
+    "orbita_XY": _fig_orbita_xy,
+    "velocidades_vs_tiempo": _fig_velocidades,
+    "velocidad_modulo_vs_tiempo": _fig_velocidad_modulo,
+    "radio_vs_tiempo": _fig_radio,
+    "elementos_vs_tiempo": _fig_elementos,
+}
+
+
+def _m4_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Filas (n, 7) de df diezmadas (decimate.m4_blocks en PLOT_BUCKETS
+    buckets, como la serie de ReportStats) antes de copiarlas: con el .elem
+    mapeado de report_elements la memoria no depende del report.
+    """
+    cols = [df.iloc[:, j].to_numpy() for j in range(7)]
+    k = m4_blocks(cols[0], cols[1:], PLOT_BUCKETS)
+    return np.column_stack([np.asarray(col[k], dtype=float) for col in cols])
+
+
+def plot_elements(elements: pd.DataFrame, burn_times: list[float] | None = None):
+    """SMA, ECC, INC, RAAN, AOP y TA frente al tiempo (columnas de report_elements)."""
+    PLOTS_DIR.mkdir(exist_ok=True)
+    el = _m4_rows(elements)
+    _init_plot_worker()
+    _fig_elementos(el[:, 0], el, burn_times or [], None)
+
+
+def _init_plot_worker(plots_dir: str | None = None):
+    # Sin ventanas: solo se escriben PNG (en serie o en los procesos del pool)
+    if plt.get_backend().lower() != "agg":
+        plt.switch_backend("Agg")
+    # Un proceso spawn reimporta el módulo: el PLOTS_DIR del padre se pasa aquí
+    if plots_dir is not None:
+        global PLOTS_DIR
+        PLOTS_DIR = Path(plots_dir)
+
+
+def plot_workers(figures) -> int:
+    """Procesos para pintar figures: uno por núcleo si en serie tardarían POOL_MIN_SECONDS o más."""
+    cost = sum(FIGURE_SECONDS.get(name, 1.0) for name in figures)
+    workers = (os.cpu_count() or 1) if cost >= POOL_MIN_SECONDS else 1
+    return max(1, min(workers, len(figures)))
+
+
+def _render(name: str, data_path: str, burn_times: list[float], events: pd.DataFrame | None):
+    """Una figura en un proceso del pool: lee las filas del .npy mapeado, sin copiarlas."""
+    data = np.load(data_path, mmap_mode="r")
+    FIGURES[name](data[:, 0], data, burn_times, events)
+    return name
+
+
+def make_plots(df: pd.DataFrame, events: pd.DataFrame | None = None,
+               burn_times: list[float] | None = None, elements: pd.DataFrame | None = None,
+               figures=None, workers: int | None = None) -> list[Path]:
+    """
+    Plots del report. Con la tabla de eventos (SOURCES.events.find_events)
+    las maniobras salen de ahí y en r(t) se marcan ápsides y eclipses; si
+    no, de burn_times (p. ej. ReportStats.burn_times) o de datos_guardados.txt.
+    Con elements (SOURCES.elements.report_elements) se pintan también los
+    elementos keplerianos frente al tiempo; se diezman por bloques antes de
+    copiarlos (_m4_rows), así que pueden ser las de todo el report.
+
+    figures: nombres de FIGURES a pintar (por defecto la variable PLOT_FIGURES,
+    separados por comas, o todas); los PNG de las demás se borran para que
+    no pasen por actuales. Con más de un worker (por defecto plot_workers:
+    uno por núcleo si en serie tardarían POOL_MIN_SECONDS o más) cada figura
+    se pinta en su proceso, las más caras primero; las filas se pasan en un
+    .npy mapeado en memoria, no copiadas a cada proceso. Siempre con Agg.
+    Devuelve los PNG escritos.
+    """
+    PLOTS_DIR.mkdir(exist_ok=True)
+
+    figures = figures or os.environ.get("PLOT_FIGURES") or list(FIGURES)
+    if isinstance(figures, str):
+        figures = [f.strip() for f in figures.split(",") if f.strip()]
+    unknown = [f for f in figures if f not in FIGURES]
+    if unknown:
+        raise ValueError(f"Figuras desconocidas: {', '.join(unknown)} (disponibles: {', '.join(FIGURES)})")
+    if elements is None:
+        figures = [f for f in figures if f != "elementos_vs_tiempo"]
+
+    if events is not None:
+        events = events[events["trayectoria"] == 0]
+        burn_times = events.loc[events["evento"] == "maniobra", "t [dias]"].tolist()
+    elif burn_times is None:
+        # Intentamos leer los tiempos de burn (si existen)
+        burn_times = leer_tiempos_burn(DATOS_PATH)
+    print("Tiempos de burn:", burn_times)
+
+    arrays = {"states": df.iloc[:, :7].to_numpy(dtype=float)}
+    if elements is not None:
+        arrays["elements"] = _m4_rows(elements)
+
+    def source(name):
+        return "elements" if name == "elementos_vs_tiempo" else "states"
+
+    # De otra ejecución: no se han pintado ahora
+    for name in FIGURES:
+        if name not in figures:
+            (PLOTS_DIR / f"{name}.png").unlink(missing_ok=True)
+
+    if workers is None:
+        workers = plot_workers(figures)
+    workers = max(1, min(workers, len(figures)))
+    if workers == 1:
+        _init_plot_worker()
+        for name in figures:
+            data = arrays[source(name)]
+            FIGURES[name](data[:, 0], data, burn_times, events)
+    else:
+        with tempfile.TemporaryDirectory(prefix="plots_") as tmp:
+            paths = {}
+            for key, data in arrays.items():
+                paths[key] = str(Path(tmp) / f"{key}.npy")
+                np.save(paths[key], data)
+
+            # spawn: el padre puede tener hilos (Qt), y fork con hilos no es seguro
+            # La más larga primero: no se queda sola al final
+            order = sorted(figures, key=lambda name: -FIGURE_SECONDS.get(name, 1.0))
+            with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"),
+                                     initializer=_init_plot_worker, initargs=(str(PLOTS_DIR),)) as pool:
+                jobs = [pool.submit(_render, name, paths[source(name)], burn_times, events)
+                        for name in order]
+                for job in jobs:
+                    job.result()
 
     print("✅ Gráficas guardadas en:", PLOTS_DIR)
+    return [PLOTS_DIR / f"{name}.png" for name in figures]
+
+
+def plot_report(path: Path = REPORT_PATH, events: pd.DataFrame | None = None,
+                body_radius: float | None = None):
+    """
+    Plots y resumen de un report de cualquier tamaño sin cargarlo entero: se
+    recorre por trozos (SOURCES.report_stats) y se pinta la serie diezmada.
+    """
+    stats = stream_stats(path, body_radius=body_radius)
+    make_plots(stats.frame(), events, burn_times=stats.burn_times)
+    stats.write()
+    return stats
 
 
 
@@ -0,0 +1,619 @@
+import math
+from pathlib import Path
+import numpy as np
+
+from SOURCES.astro import (
+    MU, RADIUS, EARTH_ROTATION_RATE, epoch_to_jd, gmst, kep2cart, kepler_universal,
+    local_frame, eq_to_ec, ec_to_eq,
+)
+from SOURCES.atmosphere import get_density_table
+from SOURCES.gravity import get_field
+from SOURCES.Transpiler import REPORT_COLUMNS, compile_mission_sequence, report_step_days
+
+
+# ========== TABLAS DE BUTCHER ==========
+
+class Tableau:
+    """Método Runge-Kutta embebido: nodos c, matriz a, pesos b y pesos del error."""
+
+    def __init__(self, name: str, order: int, c, a, b, b_low):
+        self.name = name
+        self.order = order
+        self.c = np.array(c, dtype=float)
+        self.a = [np.array(row, dtype=float) for row in a]
+        self.b = np.array(b, dtype=float)
+        self.e = self.b - np.array(b_low, dtype=float)   # estimación del error
+        self.stages = len(self.c)
+
+
+# Dormand-Prince 5(4) (PrinceDormand45 en GMAT)
+DOPRI5 = Tableau(
+    "PrinceDormand45", 5,
+    c=[0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0],
+    a=[
+        [],
+        [1 / 5],
+        [3 / 40, 9 / 40],
+        [44 / 45, -56 / 15, 32 / 9],
+        [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+        [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+        [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+    ],
+    b=[35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0],
+    b_low=[5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40],
+)
+
+# Fehlberg 7(8), 13 etapas. Se avanza con la solución de orden 8 y el error
+# es el clásico 41/840 (k0 + k10 - k11 - k12)
+RKF78 = Tableau(
+    "RKF78", 8,
+    c=[0.0, 2 / 27, 1 / 9, 1 / 6, 5 / 12, 1 / 2, 5 / 6, 1 / 6, 2 / 3, 1 / 3, 1.0, 0.0, 1.0],
+    a=[
+        [],
+        [2 / 27],
+        [1 / 36, 1 / 12],
+        [1 / 24, 0.0, 1 / 8],
+        [5 / 12, 0.0, -25 / 16, 25 / 16],
+        [1 / 20, 0.0, 0.0, 1 / 4, 1 / 5],
+        [-25 / 108, 0.0, 0.0, 125 / 108, -65 / 27, 125 / 54],
+        [31 / 300, 0.0, 0.0, 0.0, 61 / 225, -2 / 9, 13 / 900],
+        [2.0, 0.0, 0.0, -53 / 6, 704 / 45, -107 / 9, 67 / 90, 3.0],
+        [-91 / 108, 0.0, 0.0, 23 / 108, -976 / 135, 311 / 54, -19 / 60, 17 / 6, -1 / 12],
+        [2383 / 4100, 0.0, 0.0, -341 / 164, 4496 / 1025, -301 / 82, 2133 / 4100, 45 / 82, 45 / 164, 18 / 41],
+        [3 / 205, 0.0, 0.0, 0.0, 0.0, -6 / 41, -3 / 205, -3 / 41, 3 / 41, 6 / 41, 0.0],
+        [-1777 / 4100, 0.0, 0.0, -341 / 164, 4496 / 1025, -289 / 82, 2193 / 4100, 51 / 82, 33 / 164, 12 / 41, 0.0, 1.0],
+    ],
+    b=[0.0, 0.0, 0.0, 0.0, 0.0, 34 / 105, 9 / 35, 9 / 35, 9 / 280, 9 / 280, 0.0, 41 / 840, 41 / 840],
+    b_low=[41 / 840, 0.0, 0.0, 0.0, 0.0, 34 / 105, 9 / 35, 9 / 35, 9 / 280, 9 / 280, 41 / 840, 0.0, 0.0],
+)
+
+# Integradores de la GUI que tienen tabla propia; el resto usa DOPRI5.
+# RungeKutta89 (Verner) y PrinceDormand78 se aproximan con RKF78, del mismo orden
+TABLEAUS = {
+    "PrinceDormand45": DOPRI5,
+    "PrinceDormand78": RKF78,
+    "RungeKutta89": RKF78,
+}
+
+
+def get_tableau(integ_type: str) -> Tableau:
+    tableau = TABLEAUS.get(integ_type)
+    if tableau is None:
+        print(f"⚠ Integrador {integ_type} no disponible en el backend numpy, se usa {DOPRI5.name}")
+        return DOPRI5
+    return tableau
+
+
+# ========== DINÁMICA ==========
+
+def make_dynamics(p: dict):
+    """
+    f(t, y) para la config resuelta: gravedad de masa puntual o, si hay
+    modelo gravitatorio, armónicos esféricos (gravity.GravityField), más el
+    arrastre atmosférico si hay atmósfera.
+    Vale para un estado (6,) o para un lote (N, 6) (con t de forma (N,)).
+    """
+    gravity = _field_gravity(p) if p.get("gravity_degree", 0) > 0 else _point_mass_gravity(p)
+    drag = _drag_acceleration(p) if p.get("drag_atmosphere") else None
+
+    def f(t, y: np.ndarray) -> np.ndarray:
+        a = gravity(t, y)
+        if drag is not None:
+            a = a + drag(t, y)
+        return np.concatenate([y[..., 3:], a], axis=-1)
+
+    return f
+
+
+def _point_mass_gravity(p: dict):
+    mu = MU.get(p["fm_central_en"], MU["Earth"])
+
+    def a(t, y: np.ndarray) -> np.ndarray:
+        r = y[..., :3]
+        r2 = np.einsum("...i,...i->...", r, r)[..., None]
+        return (-mu / (r2 * np.sqrt(r2))) * r
+
+    return a
+
+
+def _field_gravity(p: dict):
+    """
+    Gravedad del campo de la Tierra: se pasa r a ejes fijos girando el
+    ángulo sidéreo (GMST en la epoch + rotación uniforme; sin precesión,
+    nutación ni movimiento del polo) y la aceleración se devuelve a los
+    ejes de propagación.
+    """
+    field = get_field(p["gravity_file"], p["gravity_degree"], p["gravity_order"])
+    theta0 = gmst(epoch_to_jd(p["epoch_str"]))
+    ecliptic = p["axes_type"] == "MJ2000Ec"
+
+    def a(t, y: np.ndarray) -> np.ndarray:
+        r = y[..., :3]
+        if ecliptic:
+            r = ec_to_eq(r)
+        if r.ndim == 1 and np.ndim(t) == 0:
+            # Un estado (lo normal en el integrador): el giro con floats
+            th = theta0 + EARTH_ROTATION_RATE * float(t)
+            c, s = math.cos(th), math.sin(th)
+            x, yy, z = r.tolist()
+            ax, ay, az = field.acceleration(np.array([c * x + s * yy, -s * x + c * yy, z])).tolist()
+            acc = np.array([c * ax - s * ay, s * ax + c * ay, az])
+            return eq_to_ec(acc) if ecliptic else acc
+
+        th = theta0 + EARTH_ROTATION_RATE * np.asarray(t, dtype=float)
+        c, s = np.cos(th), np.sin(th)
+
+        x, yy, z = r[..., 0], r[..., 1], r[..., 2]
+        a_bf = field.acceleration(np.stack([c * x + s * yy, -s * x + c * yy, z], axis=-1))
+        ax, ay = a_bf[..., 0], a_bf[..., 1]
+        acc = np.stack([c * ax - s * ay, s * ax + c * ay, a_bf[..., 2]], axis=-1)
+        return eq_to_ec(acc) if ecliptic else acc
+
+    return a
+
+
+def _drag_acceleration(p: dict):
+    """
+    Arrastre con sección esférica: a = -1/2 rho Cd A/m |v_rel| v_rel, con la
+    atmósfera girando con la Tierra y la densidad de la tabla precalculada
+    (atmosphere.DensityTable) a la altitud sobre la Tierra esférica.
+    """
+    table = get_density_table(p["drag_atmosphere"])
+    radius = RADIUS["Earth"]
+    # rho [kg/m^3] * A [m^2] / m [kg] * v^2 [km^2/s^2] -> x1e3 para km/s^2
+    k = -0.5e3 * p["cd"] * p["drag_area"] / p["dry_mass"]
+    w = EARTH_ROTATION_RATE
+    ecliptic = p["axes_type"] == "MJ2000Ec"
+
+    def a(t, y: np.ndarray) -> np.ndarray:
+        r, v = y[..., :3], y[..., 3:]
+        if ecliptic:
+            r, v = ec_to_eq(r), ec_to_eq(v)
+        rn = np.sqrt(np.einsum("...i,...i->...", r, r))
+        rho = table.density(rn - radius)
+
+        # v_rel = v - w x r, con w = (0, 0, w)
+        v_rel = np.stack([v[..., 0] + w * r[..., 1], v[..., 1] - w * r[..., 0], v[..., 2]], axis=-1)
+        vn = np.sqrt(np.einsum("...i,...i->...", v_rel, v_rel))
+        acc = (k * rho * vn)[..., None] * v_rel
+        return eq_to_ec(acc) if ecliptic else acc
+
+    return a
+
+
+# Claves de resolve_config que añaden fuerzas a la masa puntual; si ninguna
+# está activa, los arcos sin maniobra tienen solución analítica (Kepler)
+PERTURBATION_KEYS = ("gravity_degree", "drag_atmosphere")
+
+
+def is_two_body(p: dict) -> bool:
+    """True si el modelo de fuerzas de la config es solo gravedad de masa puntual."""
+    return not any(p.get(key) for key in PERTURBATION_KEYS)
+
+
+# ========== INTEGRADOR ADAPTATIVO ==========
+
+def _error_norm(e: np.ndarray, dy: np.ndarray, accuracy: float) -> float:
+    """
+    Error relativo al cambio del paso (como 'RSSStep' en GMAT), posición y
+    velocidad. Si el vector lleva más cosas detrás (la STM), no cuentan.
+    """
+    err_r = np.linalg.norm(e[:3]) / max(accuracy * np.linalg.norm(dy[:3]), 1e-300)
+    err_v = np.linalg.norm(e[3:6]) / max(accuracy * np.linalg.norm(dy[3:6]), 1e-300)
+    return max(err_r, err_v)
+
+
+# Filas por lote en la propagación por lotes (iter_integrate / iter_propagation)
+BATCH_ROWS = 500
+
+
+def iter_integrate(f, y0: np.ndarray, t0: float, t1: float, h: float, accuracy: float,
+                   min_step: float, max_step: float, max_attempts: int,
+                   tableau: Tableau = DOPRI5, out_times: np.ndarray | None = None,
+                   batch: int = BATCH_ROWS):
+    """
+    Igual que integrate, pero va devolviendo lotes (ts, ys, h) de como mucho
+    batch filas, con h el paso propuesto en ese momento. El último lote
+    siempre se emite (aunque venga vacío) y lleva el h final.
+    """
+    a, c, b, e_w = tableau.a, tableau.c, tableau.b, tableau.e
+    k = np.empty((tableau.stages, y0.size))
+    expo = -1.0 / tableau.order
+
+    targets = [t1] if out_times is None else list(out_times)
+    ts, ys = [], []
+
+    t, y = t0, y0.copy()
+    h = min(max(h, min_step), max_step)
+    attempts = 0
+
+    for target in targets:
+        while target - t > 1e-9:
+            step = min(h, target - t)
+
+            k[0] = f(t, y)
+            for s in range(1, tableau.stages):
+                k[s] = f(t + c[s] * step, y + step * (a[s] @ k[:s]))
+
+            dy = step * (b @ k)
+            err = _error_norm(step * (e_w @ k), dy, accuracy)
+
+            if err > 1.0 and step > min_step:
+                attempts += 1
+                if attempts > max_attempts:
+                    raise RuntimeError(
+                        f"El paso no converge tras {max_attempts} intentos (t = {t:.3f} s)"
+                    )
+                h = max(min_step, step * max(0.2, 0.9 * err ** expo))
+                continue
+
+            attempts = 0
+            t += step
+            y = y + dy
+            if out_times is None:
+                ts.append(t)
+                ys.append(y)
+
+            # Un paso recortado para caer en target no cambia el h propuesto
+            if step >= h:
+                growth = 5.0 if err == 0.0 else min(5.0, max(0.2, 0.9 * err ** expo))
+                h = min(max_step, max(min_step, step * growth))
+
+            if len(ts) >= batch:
+                yield ts, ys, h
+                ts, ys = [], []
+
+        if out_times is not None:
+            ts.append(target)
+            ys.append(y)
+            if len(ts) >= batch:
+                yield ts, ys, h
+                ts, ys = [], []
+
+    yield ts, ys, h
+
+
+def integrate(f, y0: np.ndarray, t0: float, t1: float, h: float, accuracy: float,
+              min_step: float, max_step: float, max_attempts: int,
+              tableau: Tableau = DOPRI5, out_times: np.ndarray | None = None):
+    """
+    Integra y' = f(t, y) de t0 a t1 [s] con control de paso.
+    Devuelve (ts, ys, h): los pasos aceptados (sin t0) y el último paso
+    propuesto. Con out_times solo se guardan esos instantes, y los pasos se
+    recortan para caer exactamente en ellos.
+    """
+    ts, ys = [], []
+    for bt, by, h in iter_integrate(f, y0, t0, t1, h, accuracy, min_step, max_step,
+                                    max_attempts, tableau, out_times):
+        ts += bt
+        ys += by
+    return ts, ys, h
+
+
+def _error_norm_rows(e: np.ndarray, dy: np.ndarray, accuracy: float) -> np.ndarray:
+    """_error_norm fila a fila para un lote (N, 6)."""
+    err_r = np.linalg.norm(e[:, :3], axis=1) / np.maximum(accuracy * np.linalg.norm(dy[:, :3], axis=1), 1e-300)
+    err_v = np.linalg.norm(e[:, 3:6], axis=1) / np.maximum(accuracy * np.linalg.norm(dy[:, 3:6], axis=1), 1e-300)
+    return np.maximum(err_r, err_v)
+
+
+def integrate_batch(f, Y0: np.ndarray, t0: float, out_times: np.ndarray, h, accuracy: float,
+                    min_step: float, max_step: float, max_attempts: int,
+                    tableau: Tableau = DOPRI5):
+    """
+    Integra N trayectorias a la vez, Y0 (N, 6), de t0 hasta out_times[-1] [s].
+    Cada una lleva su propio paso adaptativo (h escalar o (N,)); en cada
+    iteración se evalúa f una vez por etapa sobre todas las que siguen
+    activas, y las que ya han llegado al final quedan fuera (máscara).
+    Devuelve (Y (len(out_times), N, 6), h (N,), failed (N,)). Una trayectoria
+    cuyo paso no converge, o que da NaN/inf, queda en failed y con NaN desde
+    ahí; el resto sigue.
+    """
+    a, c, b, e_w = tableau.a, tableau.c, tableau.b, tableau.e
+    expo = -1.0 / tableau.order
+
+    out_times = np.asarray(out_times, dtype=float)
+    n_out = len(out_times)
+    Y = np.array(Y0, dtype=float)
+    N = len(Y)
+
+    t = np.full(N, float(t0))
+    H = np.clip(np.broadcast_to(np.asarray(h, dtype=float), (N,)), min_step, max_step)
+    attempts = np.zeros(N, dtype=int)
+    nxt = np.zeros(N, dtype=int)   # próximo instante de salida de cada trayectoria
+    out = np.full((n_out, N, Y.shape[1]), np.nan)
+
+    failed = ~np.isfinite(Y).all(axis=1)
+    nxt[failed] = n_out
+
+    def record(idx: np.ndarray):
+        # Guardar las que han llegado a su instante de salida (puede haber varios seguidos)
+        while idx.size:
+            idx = idx[nxt[idx] < n_out]
+            idx = idx[out_times[nxt[idx]] - t[idx] <= 1e-9]
+            out[nxt[idx], idx] = Y[idx]
+            nxt[idx] += 1
+
+    record(np.flatnonzero(~failed))
+    active = np.flatnonzero(nxt < n_out)
+
+    while active.size:
+        m = active.size
+        ta, ya, ha = t[active], Y[active], H[active]
+        step = np.minimum(ha, out_times[nxt[active]] - ta)
+        hcol = step[:, None]
+
+        # k contiguo (etapas, m*6): cada combinación de etapas es un solo producto matriz-vector
+        k = np.empty((tableau.stages, m * Y.shape[1]))
+        k[0] = f(ta, ya).ravel()
+        for s in range(1, tableau.stages):
+            k[s] = f(ta + c[s] * step, ya + hcol * (a[s] @ k[:s]).reshape(m, -1)).ravel()
+
+        dy = hcol * (b @ k).reshape(m, -1)
+        err = _error_norm_rows(hcol * (e_w @ k).reshape(m, -1), dy, accuracy)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = 0.9 * err ** expo
+        bad = ~np.isfinite(err)
+        ok = ~bad & ((err <= 1.0) | (step <= min_step))
+        rej = ~bad & ~ok
+
+        # Rechazados: paso más corto y otro intento
+        ir = active[rej]
+        attempts[ir] += 1
+        H[ir] = np.maximum(min_step, step[rej] * np.maximum(0.2, factor[rej]))
+        dead = np.concatenate([active[bad], ir[attempts[ir] > max_attempts]])
+
+        # Aceptados
+        ia = active[ok]
+        attempts[ia] = 0
+        t[ia] += step[ok]
+        Y[ia] += dy[ok]
+        # Un paso recortado para caer en la salida no cambia el h propuesto
+        grow = step[ok] >= ha[ok]
+        growth = np.where(err[ok] == 0.0, 5.0, np.clip(factor[ok], 0.2, 5.0))
+        H[ia[grow]] = np.clip(step[ok][grow] * growth[grow], min_step, max_step)
+        record(ia)
+
+        if dead.size:
+            failed[dead] = True
+            nxt[dead] = n_out
+            Y[dead] = np.nan
+
+        active = np.flatnonzero(nxt < n_out)
+
+    return out, H, failed
+
+
+# ========== MISIÓN COMPLETA ==========
+
+def initial_state(p: dict) -> np.ndarray:
+    """Estado inicial cartesiano [km, km/s] en los ejes del sistema de la nave."""
+    if p["coord_type"] == "Cartesianas":
+        return np.array([p["x"], p["y"], p["z"], p["vx"], p["vy"], p["vz"]], dtype=float)
+    mu = MU.get(p["central_en"], MU["Earth"])
+    return kep2cart(p["sma"], p["ecc"], p["inc"], p["raan"], p["aop"], p["ta"], mu)
+
+
+def burn_delta_v(y: np.ndarray, m: dict, axes_type: str) -> np.ndarray:
+    """
+    Delta-V de una maniobra en los ejes de propagación (axes_type).
+    VNB/LVLH se construyen con el estado actual; con ejes inerciales se
+    gira entre MJ2000Eq y MJ2000Ec si hace falta. SpacecraftBody y los
+    sistemas fijos al cuerpo se tratan como inerciales (no hay actitud).
+    """
+    dv = np.array([m["dv_1"], m["dv_2"], m["dv_3"]], dtype=float)
+
+    if m["axes"] in ("VNB", "LVLH"):
+        return local_frame(y[..., :3], y[..., 3:], m["axes"]) @ dv
+
+    burn_ec = m["axes"] == "MJ2000Ec" or (
+        m["axes"] not in ("MJ2000Eq", "ICRF") and m["coord"].endswith("Ec")
+    )
+    if burn_ec and axes_type == "MJ2000Eq":
+        return ec_to_eq(dv)
+    if not burn_ec and axes_type == "MJ2000Ec":
+        return eq_to_ec(dv)
+    return dv
+
+
+def apply_burn(y: np.ndarray, m: dict, axes_type: str) -> np.ndarray:
+    """Estado (6,) o lote (N, 6) tras la maniobra impulsiva m."""
+    y = np.array(y, dtype=float)
+    y[..., 3:] += burn_delta_v(y, m, axes_type)
+    return y
+
+
+def _output_grid(t0: float, t1: float, step: float) -> np.ndarray:
+    """Múltiplos de step en (t0, t1) y t1 al final (como el While del script)."""
+    first = np.floor(t0 / step + 1e-9) + 1
+    grid = np.arange(first, np.ceil(t1 / step), dtype=float) * step
+    grid = grid[(grid > t0 + 1e-9) & (grid < t1 - 1e-9)]
+    return np.append(grid, t1)
+
+
+# Sin paso de salida fijo, el camino analítico saca este nº de puntos por órbita
+KEPLER_POINTS_PER_ORBIT = 60
+
+
+def _kepler_grid(y: np.ndarray, t0: float, t1: float, mu: float, max_step: float) -> np.ndarray:
+    """Malla de salida de un arco analítico: como mucho max_step, y no menos de KEPLER_POINTS_PER_ORBIT por vuelta."""
+    alpha = 2.0 / np.linalg.norm(y[:3]) - np.dot(y[3:], y[3:]) / mu
+    step = max_step
+    if alpha > 0:
+        step = min(step, 2 * np.pi / np.sqrt(mu * alpha**3) / KEPLER_POINTS_PER_ORBIT)
+    return _output_grid(t0, t1, step)
+
+
+def iter_kepler(p: dict, batch: int = BATCH_ROWS):
+    """
+    Como iter_propagation, pero cada arco entre maniobras se evalúa con la
+    solución de Kepler (astro.kepler_universal) sobre toda la malla de salida
+    de una vez, y los burns son saltos instantáneos del estado. Solo vale si
+    is_two_body(p).
+    """
+    mu = MU.get(p["fm_central_en"], MU["Earth"])
+
+    events = [(m["t"], k) for k, m in enumerate(p["maneuvers"])]
+    plan = compile_mission_sequence(events, p["dur_days"])
+    step_days = report_step_days(p, plan)
+
+    y = initial_state(p)
+    t = 0.0
+    yield np.array([0.0]), y[None, :]
+
+    steps = [(kind, arg) for kind, arg in plan if kind != "report"]
+    for i, (kind, arg) in enumerate(steps):
+        if kind == "propagate":
+            t1 = arg * 86400.0
+            if step_days is None:
+                grid = _kepler_grid(y, t, t1, mu, p["max_step"])
+            else:
+                grid = _output_grid(t, t1, step_days * 86400.0)
+            if grid.size:
+                states = kepler_universal(y[:3], y[3:], grid - t, mu)
+                for j in range(0, len(grid), batch):
+                    yield grid[j:j + batch] / 86400.0, states[j:j + batch]
+                y = states[-1]
+            t = t1
+        else:
+            y = apply_burn(y, p["maneuvers"][arg], p["axes_type"])
+            if i + 1 == len(steps) or steps[i + 1][0] != "maneuver":
+                yield np.array([t / 86400.0]), y[None, :]
+
+
+def iter_propagation(p: dict, dynamics=None, batch: int = BATCH_ROWS):
+    """
+    Propaga una config resuelta (Transpiler.resolve_config) con la misma
+    secuencia de misión que el script GMAT, devolviendo lotes
+    (t [días], estados (n, 6)) a medida que avanza. Cada burn da dos filas
+    (antes y después), como el report de GMAT. Si el modelo es solo masa
+    puntual (y no se pasa otra dinámica) se usa la solución analítica.
+    """
+    if dynamics is None and is_two_body(p):
+        yield from iter_kepler(p, batch)
+        return
+
+    yield from iter_mission(
+        p, dynamics or make_dynamics(p), initial_state(p),
+        lambda y, m: apply_burn(y, m, p["axes_type"]), batch,
+    )
+
+
+def iter_mission(p: dict, f, y0: np.ndarray, burn, batch: int = BATCH_ROWS):
+    """
+    Secuencia de misión de p integrando y' = f(t, y) desde y0, con
+    burn(y, maniobra) -> y en cada maniobra. y puede llevar más componentes
+    que el estado (p.ej. la STM, ver SOURCES.stm): los lotes son
+    (t [días], y (n, len(y0))) y el control de paso solo mira las 6 primeras.
+    """
+    tableau = get_tableau(p["integ_type"])
+
+    events = [(m["t"], k) for k, m in enumerate(p["maneuvers"])]
+    plan = compile_mission_sequence(events, p["dur_days"])
+    step_days = report_step_days(p, plan)
+
+    y = np.array(y0, dtype=float)
+    t = 0.0
+    h = p["init_step"]
+    yield np.array([0.0]), y[None, :]
+
+    steps = [(kind, arg) for kind, arg in plan if kind != "report"]
+    for i, (kind, arg) in enumerate(steps):
+        if kind == "propagate":
+            t1 = arg * 86400.0
+            out = None if step_days is None else _output_grid(t, t1, step_days * 86400.0)
+            for seg_t, seg_y, h in iter_integrate(
+                f, y, t, t1, h, p["accuracy"], p["min_step"], p["max_step"],
+                p["max_step_attempts"], tableau, out, batch,
+            ):
+                if seg_t:
+                    y = seg_y[-1]
+                    yield np.array(seg_t) / 86400.0, np.array(seg_y)
+            t = t1
+        else:
+            y = burn(y, p["maneuvers"][arg])
+            # Una fila con el estado tras el grupo de maniobras
+            if i + 1 == len(steps) or steps[i + 1][0] != "maneuver":
+                yield np.array([t / 86400.0]), y[None, :]
+
+
+def propagate_config(p: dict, dynamics=None):
+    """
+    Propaga una config resuelta de una vez (ver iter_propagation).
+    Devuelve (t [días], estados (N, 6)).
+    """
+    ts, ys = zip(*iter_propagation(p, dynamics))
+    return np.concatenate(ts), np.concatenate(ys)
+
+
+def propagate_batch(p: dict, states0: np.ndarray, dynamics=None, out_step: float | None = None):
+    """
+    Propaga a la vez N estados iniciales states0 (N, 6) con la misión de p
+    (mismas maniobras e integrador), p.ej. para dispersiones Monte Carlo.
+    Todas salen en la misma malla: cada out_step [s] (por defecto, el paso
+    de salida del report si lo hay) o, si no, solo en los burns y al final.
+    Devuelve (t [días] (M,), estados (M, N, 6), failed (N,)). Con solo masa
+    puntual los arcos se evalúan con Kepler (todo el lote en una llamada).
+    """
+    kepler = dynamics is None and is_two_body(p)
+    mu = MU.get(p["fm_central_en"], MU["Earth"])
+    f = dynamics or make_dynamics(p)
+    tableau = get_tableau(p["integ_type"])
+
+    events = [(m["t"], k) for k, m in enumerate(p["maneuvers"])]
+    plan = compile_mission_sequence(events, p["dur_days"])
+    if out_step is None:
+        step_days = report_step_days(p, plan)
+        out_step = None if step_days is None else step_days * 86400.0
+
+    Y = np.array(states0, dtype=float)
+    failed = np.zeros(len(Y), dtype=bool)
+    t = 0.0
+    h = p["init_step"]
+    ts, ys = [0.0], [Y]
+
+    steps = [(kind, arg) for kind, arg in plan if kind != "report"]
+    for i, (kind, arg) in enumerate(steps):
+        if kind == "propagate":
+            t1 = arg * 86400.0
+            grid = np.array([t1]) if out_step is None else _output_grid(t, t1, out_step)
+            if kepler:
+                seg = kepler_universal(Y[None, :, :3], Y[None, :, 3:], (grid - t)[:, None], mu)
+                failed |= ~np.isfinite(seg).all(axis=(0, 2))
+            else:
+                seg, h, seg_failed = integrate_batch(
+                    f, Y, t, grid, h, p["accuracy"], p["min_step"], p["max_step"],
+                    p["max_step_attempts"], tableau,
+                )
+                failed |= seg_failed
+            ts += list(grid)
+            ys += list(seg)
+            t, Y = t1, seg[-1]
+        else:
+            Y = apply_burn(Y, p["maneuvers"][arg], p["axes_type"])
+            if i + 1 == len(steps) or steps[i + 1][0] != "maneuver":
+                ts.append(t)
+                ys.append(Y)
+
+    return np.array(ts) / 86400.0, np.stack(ys), failed
+
+
+def report_format(sat_name: str, precision: int = 16, col_precision: dict | None = None):
+    """Cabecera y formato np.savetxt del report de 7 columnas (el mismo que GMAT)."""
+    col_precision = col_precision or {}
+    names = [f"{sat_name}.{col}" for col in REPORT_COLUMNS]
+    digits = [col_precision.get(col, precision) for col in REPORT_COLUMNS]
+    widths = [max(len(name), d + 8) + 2 for name, d in zip(names, digits)]
+
+    header = "".join(name.ljust(w) for name, w in zip(names, widths))
+    fmt = "".join(f"%-{w}.{d}g" for w, d in zip(widths, digits))
+    return header, fmt
+
+
+def write_report(path: Path, sat_name: str, t_days: np.ndarray, states: np.ndarray,
+                 precision: int = 16, col_precision: dict | None = None):
+    """Escribe el report en el mismo formato de 7 columnas que GMAT (ver load_report)."""
+    header, fmt = report_format(sat_name, precision, col_precision)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savetxt(path, np.column_stack([t_days, states]), fmt=fmt, header=header, comments="")
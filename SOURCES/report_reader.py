@@ -0,0 +1,386 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.Transpiler import REPORT_COLUMNS
+
+# Primer carácter de una línea de datos (todo lo demás es cabecera)
+_NUMERIC_START = frozenset(b"0123456789+-.")
+
+# Sidecar binario por columnas junto a cada report (<report>.cols):
+#   SIDECAR_MAGIC, longitud de la cabecera (uint64), cabecera JSON (columnas,
+#   filas y size/mtime/hash del report) y cada columna en float64 seguida,
+#   empezando en un múltiplo de SIDECAR_ALIGN
+SIDECAR_SUFFIX = ".cols"
+SIDECAR_MAGIC = b"RPTCOLS1"
+SIDECAR_ALIGN = 64
+
+# Tamaño de bloque de iter_report_chunks: filas del sidecar / bytes del texto
+CHUNK_ROWS = 200_000
+CHUNK_BYTES = 8 * 2**20     # ~50k filas; más grande no es más rápido y gasta más memoria
+
+
+def _column_indices(header: list[str], columns) -> list[int]:
+    """
+    Posición de cada columna pedida: por nombre completo ('Sat.X') o por el
+    nombre tras el punto ('X'), que vale para cualquier nave.
+    """
+    short = [name.rsplit(".", 1)[-1] for name in header]
+    indices = []
+    for col in columns:
+        if col in header:
+            indices.append(header.index(col))
+        elif col in short:
+            indices.append(short.index(col))
+        else:
+            raise KeyError(f"El report no tiene la columna {col} (tiene: {', '.join(header)})")
+    return indices
+
+
+def _filter_lines(body: bytes) -> bytes:
+    """Solo las líneas que empiezan (tras los espacios) por un número."""
+    lines = (line.lstrip() for line in body.split(b"\n"))
+    return b"\n".join(line for line in lines if line and line[0] in _NUMERIC_START)
+
+
+def _parse(body: bytes, ncols: int, indices: list[int]) -> pd.DataFrame:
+    df = pd.read_csv(
+        io.BytesIO(body), sep=r"\s+", header=None, names=range(ncols), usecols=indices,
+        dtype=np.float64, engine="c", on_bad_lines="skip",
+    )
+    # Una fila cortada a la mitad queda con NaN en las últimas columnas
+    return df[indices].dropna().reset_index(drop=True)
+
+
+def read_report(path: Path, columns=None, use_sidecar: bool = True) -> pd.DataFrame:
+    """
+    Lee un report de GMAT (o del backend numpy). Si tiene sidecar válido
+    (write_sidecar) las columnas se mapean en memoria sin copiar ni parsear;
+    si no, se parsea el texto con el parser C de pandas.
+    columns: nombres ('Sat.X' o 'X') de las columnas a cargar, en ese orden;
+    por defecto todas. Devuelve float64 con los nombres de la cabecera. Las
+    cabeceras repetidas se saltan y las líneas incompletas (report a medio
+    escribir) se descartan.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No se encuentra el report: {path}")
+
+    if use_sidecar:
+        df = open_sidecar(path, columns)
+        if df is not None:
+            return df
+
+    buf = path.read_bytes()
+    first = buf.lstrip()
+    header_line = first[:first.find(b"\n") + 1] if b"\n" in first else first
+    header = header_line.decode("utf-8").split()
+    if not header:
+        return pd.DataFrame()
+
+    indices = list(range(len(header))) if columns is None else _column_indices(header, columns)
+    names = [header[i] for i in indices]
+
+    # Las cabeceras que GMAT repite tras cada Report son iguales a la primera:
+    # se quitan todas con un replace, sin mirar línea a línea
+    body = buf.replace(header_line, b"")
+    try:
+        df = _parse(body, len(header), indices)
+    except ValueError:
+        # Queda otro texto (avisos, otra cabecera): filtrado línea a línea
+        df = _parse(_filter_lines(body), len(header), indices)
+    df.columns = names
+    return df
+
+
+# ========== SIDECAR ==========
+
+def sidecar_path(path: Path) -> Path:
+    return Path(str(path) + SIDECAR_SUFFIX)
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as fh:
+        while chunk := fh.read(1 << 22):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_sidecar(path: Path, df=None, out: Path | None = None,
+                  extra: dict | None = None) -> Path | None:
+    """
+    Escribe <report>.cols con las columnas del report en binario. df son
+    los datos ya leídos (read_report) o un iterable de trozos con las mismas
+    columnas (iter_report_chunks); si no se dan, se parsea el report por
+    trozos. Solo hay en memoria un trozo a la vez: cada columna se va
+    escribiendo a un temporal y al final se juntan.
+    Si el report cambia mientras tanto no se escribe nada (devuelve None).
+    Con out y extra sirve para otras columnas derivadas del report (p. ej.
+    SOURCES.elements): extra (JSON) tiene que coincidir al abrirlo.
+    """
+    path = Path(path)
+    st = path.stat()
+    if df is None:
+        chunks = _iter_text_chunks(path)
+    elif isinstance(df, pd.DataFrame):
+        chunks = [df]
+    else:
+        chunks = df
+
+    out = Path(out) if out is not None else sidecar_path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=out.parent, prefix=out.name + ".") as tmpdir:
+        columns, files, rows = None, [], 0
+        try:
+            for chunk in chunks:
+                if columns is None:
+                    columns = [str(c) for c in chunk.columns]
+                    files = [open(Path(tmpdir) / f"{i}.f8", "wb") for i in range(len(columns))]
+                for fh, col in zip(files, chunk.columns):
+                    fh.write(np.ascontiguousarray(chunk[col].to_numpy(), dtype="<f8").tobytes())
+                rows += len(chunk)
+        finally:
+            for fh in files:
+                fh.close()
+        if columns is None:
+            # Sin filas: las columnas salen de la cabecera (si la hay)
+            columns = _header_names(path) if df is None else []
+
+        source_hash = _file_hash(path)
+        if path.stat().st_mtime_ns != st.st_mtime_ns or path.stat().st_size != st.st_size:
+            return None
+
+        meta = {
+            "columns": columns,
+            "rows": rows,
+            "source": {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "blake2b": source_hash},
+            "extra": extra,
+        }
+        header = json.dumps(meta).encode("utf-8")
+        start = len(SIDECAR_MAGIC) + 8 + len(header)
+        header += b" " * (-start % SIDECAR_ALIGN)
+
+        tmp = out.with_name(out.name + ".part")
+        with tmp.open("wb") as fh:
+            fh.write(SIDECAR_MAGIC + struct.pack("<Q", len(header)) + header)
+            for i in range(len(files)):
+                with open(Path(tmpdir) / f"{i}.f8", "rb") as col:
+                    shutil.copyfileobj(col, fh, 1 << 22)
+    os.replace(tmp, out)
+    return out
+
+
+def _read_sidecar_meta(out: Path) -> tuple[dict, int] | None:
+    with out.open("rb") as fh:
+        if fh.read(len(SIDECAR_MAGIC)) != SIDECAR_MAGIC:
+            return None
+        (size,) = struct.unpack("<Q", fh.read(8))
+        meta = json.loads(fh.read(size))
+    return meta, len(SIDECAR_MAGIC) + 8 + size
+
+
+def open_sidecar(path: Path, columns=None, out: Path | None = None,
+                 extra: dict | None = None) -> pd.DataFrame | None:
+    """
+    Columnas del sidecar de path mapeadas en memoria (solo lectura, sin
+    copias: solo se lee del disco lo que se toque). None si no hay sidecar o
+    ya no corresponde al report: mismo tamaño y mtime, o si el mtime ha
+    cambiado, mismo hash del contenido (y el mismo extra de write_sidecar).
+    """
+    path = Path(path)
+    out = Path(out) if out is not None else sidecar_path(path)
+    if not out.exists():
+        return None
+    try:
+        read = _read_sidecar_meta(out)
+    except (OSError, ValueError, struct.error):
+        return None
+    if read is None:
+        return None
+    meta, offset = read
+    if meta.get("extra") != extra:
+        return None
+
+    src = meta["source"]
+    st = path.stat()
+    if st.st_size != src["size"]:
+        return None
+    if st.st_mtime_ns != src["mtime_ns"] and _file_hash(path) != src["blake2b"]:
+        return None
+
+    header = meta["columns"]
+    rows = meta["rows"]
+    if out.stat().st_size < offset + 8 * rows * len(header):
+        return None
+    indices = range(len(header)) if columns is None else _column_indices(header, columns)
+    if rows == 0:
+        return pd.DataFrame({header[i]: np.empty(0) for i in indices})
+    data = {
+        header[i]: np.memmap(out, dtype="<f8", mode="r", offset=offset + 8 * rows * i, shape=(rows,))
+        for i in indices
+    }
+    return pd.DataFrame(data, copy=False)
+
+
+# ========== POR TROZOS ==========
+
+def iter_report_chunks(path: Path, columns=None, chunk_rows: int = CHUNK_ROWS,
+                       chunk_bytes: int = CHUNK_BYTES):
+    """
+    Recorre el report en DataFrames (como read_report) de un trozo cada
+    uno, con memoria acotada por el tamaño del trozo sea cual sea la
+    longitud del report. Con sidecar válido se leen chunk_rows filas de cada
+    columna con np.fromfile (sin mapear el fichero entero); si no, se
+    parsea el texto por bloques de chunk_bytes cortados en fin de línea.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No se encuentra el report: {path}")
+
+    mapped = open_sidecar(path, columns)
+    if mapped is not None:
+        yield from _iter_sidecar_chunks(path, list(mapped.columns), chunk_rows)
+        return
+
+    yield from _iter_text_chunks(path, columns, chunk_bytes)
+
+
+def _header_names(path: Path) -> list[str]:
+    """Columnas de la cabecera del report (primera línea no vacía)."""
+    with Path(path).open("rb") as fh:
+        for line in fh:
+            if line.strip():
+                return line.decode("utf-8").split()
+    return []
+
+
+def _iter_text_chunks(path: Path, columns=None, chunk_bytes: int = CHUNK_BYTES):
+    """iter_report_chunks parseando siempre el texto (sin mirar el sidecar)."""
+    with path.open("rb") as fh:
+        header_line = b""
+        while not header_line.strip():
+            header_line = fh.readline()
+            if not header_line:
+                return
+        header = header_line.decode("utf-8").split()
+        indices = list(range(len(header))) if columns is None else _column_indices(header, columns)
+        names = [header[i] for i in indices]
+
+        pending = b""
+        while True:
+            block = fh.read(chunk_bytes)
+            if not block:
+                break
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            block, pending = block[:cut], block[cut:]
+            df = _parse_block(block, header_line, len(header), indices)
+            if df is not None:
+                df.columns = names
+                yield df
+        df = _parse_block(pending, header_line, len(header), indices)
+        if df is not None:
+            df.columns = names
+            yield df
+
+
+def _parse_block(block: bytes, header_line: bytes, ncols: int, indices: list[int]) -> pd.DataFrame | None:
+    body = block.replace(header_line, b"")
+    if not body.strip():
+        return None
+    try:
+        df = _parse(body, ncols, indices)
+    except ValueError:
+        df = _parse(_filter_lines(body), ncols, indices)
+    return df if len(df) else None
+
+
+def _iter_sidecar_chunks(path: Path, names: list[str], chunk_rows: int):
+    meta, offset = _read_sidecar_meta(sidecar_path(path))
+    rows = meta["rows"]
+    indices = [meta["columns"].index(name) for name in names]
+    with sidecar_path(path).open("rb") as fh:
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            chunk = {}
+            for name, i in zip(names, indices):
+                fh.seek(offset + 8 * (rows * i + start))
+                chunk[name] = np.fromfile(fh, dtype="<f8", count=n)
+            yield pd.DataFrame(chunk, copy=False)
+
+
+# ========== BENCHMARK ==========
+
+def _legacy_read(path: Path) -> pd.DataFrame:
+    """El load_report de antes (parser python + to_numeric), solo para comparar."""
+    df = pd.read_csv(path, sep=r"\s+", engine="python")
+    return df.apply(pd.to_numeric, errors="coerce").dropna()
+
+
+def write_synthetic_report(path: Path, rows: int, header_every: int = 1000, sat_name: str = "Sat"):
+    """Report de prueba de rows filas con la cabecera repetida cada header_every (como los Report de GMAT)."""
+    names = [f"{sat_name}.{col}" for col in REPORT_COLUMNS]
+    header = "".join(name.ljust(26) for name in names)
+    t = np.linspace(0.0, 10.0, rows)
+    w = 2 * np.pi / 0.07
+    data = np.column_stack([
+        t, 7000 * np.cos(w * t), 7000 * np.sin(w * t), 3000 * np.sin(w * t),
+        -7.5 * np.sin(w * t), 7.5 * np.cos(w * t), 3.2 * np.cos(w * t),
+    ])
+    with Path(path).open("w", encoding="utf-8") as fh:
+        for i in range(0, rows, header_every):
+            fh.write(header + "\n")
+            np.savetxt(fh, data[i:i + header_every], fmt="%-25.16g")
+
+
+def benchmark(rows: int = 1_000_000, legacy: bool = True):
+    """
+    Tiempos de read_report frente al load_report antiguo en un report
+    sintético de rows filas (python -m SOURCES.report_reader).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "DefaultReportFile.txt"
+        write_synthetic_report(path, rows)
+        size = path.stat().st_size / 2**20
+        print(f"▶ Report de {rows} filas ({size:.0f} MB)")
+
+        t0 = time.perf_counter()
+        df = read_report(path)
+        t_all = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        read_report(path, ["ElapsedDays", "X", "Y", "Z"])
+        t_some = time.perf_counter() - t0
+        print(f"read_report, 7 columnas: {t_all:.2f} s   4 columnas: {t_some:.2f} s")
+
+        t0 = time.perf_counter()
+        write_sidecar(path, df)
+        t_write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        mapped = read_report(path)
+        t_map = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        r = np.sqrt(mapped["Sat.X"] ** 2 + mapped["Sat.Y"] ** 2 + mapped["Sat.Z"] ** 2)
+        t_use = time.perf_counter() - t0
+        print(f"sidecar: escribir {t_write:.2f} s   abrir {1e3 * t_map:.1f} ms   "
+              f"r(t) desde él {1e3 * t_use:.0f} ms   (igual: {np.array_equal(mapped.to_numpy(), df.to_numpy())})")
+
+        if legacy:
+            t0 = time.perf_counter()
+            old = _legacy_read(path)
+            t_old = time.perf_counter() - t0
+            same = np.array_equal(old.to_numpy(dtype=float), df.to_numpy())
+            print(f"load_report antiguo:     {t_old:.2f} s   (x{t_old / t_all:.1f}, mismo resultado: {same})")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,280 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.decimate import LOD_BUCKETS, m4_select
+from SOURCES.events import APSIS_TOL, flight_path_sine
+from SOURCES.report_reader import CHUNK_BYTES, CHUNK_ROWS, iter_report_chunks
+from SOURCES.streaming import rows_to_frame
+from SOURCES.Transpiler import REPORT_COLUMNS
+from SOURCES.utils import OUTPUT_DIR
+
+STATS_PATH = OUTPUT_DIR / "report_stats.txt"
+
+# Buckets como mucho de la serie M4 para los plots; al duplicar el ancho
+# quedan entre la mitad y todos, así que nunca menos que columnas de píxeles
+PLOT_BUCKETS = 2 * LOD_BUCKETS
+
+# Ejemplo (un report de cualquier tamaño, en una pasada y memoria acotada):
+#     stats = stream_stats(REPORT_PATH, body_radius=6378.1363)
+#     print(stats.summary())
+#     make_plots(stats.frame("Sat"), burn_times=stats.burn_times)
+
+
+class _Extremes:
+    """min / max / media de una magnitud, con el instante del min y del max."""
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.t_min = self.t_max = np.nan
+
+    def update(self, t: np.ndarray, values: np.ndarray):
+        if not len(values):
+            return
+        self.n += len(values)
+        self.total += float(values.sum())
+        i, j = int(values.argmin()), int(values.argmax())
+        if values[i] < self.min:
+            self.min, self.t_min = float(values[i]), float(t[i])
+        if values[j] > self.max:
+            self.max, self.t_max = float(values[j]), float(t[j])
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else np.nan
+
+
+class ReportStats:
+    """
+    Reducciones de una sola pasada sobre las filas del report (t, X, Y, Z,
+    VX, VY, VZ), que llegan por trozos con update(): extremos y media de r y
+    |v|, ápsides (cambios de signo de r·v, como en events.py, con r del
+    polinomio de Hermite entre las dos filas), maniobras (dos filas con el mismo t),
+    estadísticas de cada arco entre maniobras y una serie diezmada para los
+    plots. La memoria no depende del nº de filas: solo crecen los ápsides
+    (dos por vuelta) y los arcos (uno por maniobra).
+
+    La serie diezmada es un M4 (decimate.m4_select) en el tiempo: de cada
+    bucket de bucket_days días quedan la primera y la última fila y las del
+    mínimo y el máximo de X, Y, Z, VX, VY, VZ, r y |v|, así que los picos
+    salen en los plots aunque caigan entre dos filas de una muestra regular.
+    Solo el último bucket sigue abierto; cuando hay más de `buckets`, el
+    ancho se duplica y se rehace el M4 de lo guardado (el M4 de dos buckets
+    juntos sale del M4 de cada uno). Las filas de cada maniobra (antes y
+    después) y la última se conservan siempre.
+    """
+
+    def __init__(self, buckets: int = PLOT_BUCKETS, body_radius: float | None = None):
+        self.buckets = buckets
+        self.body_radius = body_radius
+        self.rows = 0
+        self.t_first = self.t_last = np.nan
+        self.r = _Extremes()
+        self.speed = _Extremes()
+        self.periapsides: list[tuple[float, float]] = []
+        self.apoapsides: list[tuple[float, float]] = []
+        self.burns: list[tuple[float, float]] = []   # (t, |delta-V|)
+        self.arcs: list[dict] = []
+
+        self._tail = np.empty((0, 4))          # (t, r, dr/dt, r·v/(|r||v|)) de la última fila
+        self._last = None                      # última fila (para maniobras entre trozos)
+        self._arc = self._new_arc(np.nan)
+
+        self.bucket_days = None                # ancho de los buckets del M4 (sin fijar hasta que t avanza)
+        # M4 de los buckets cerrados (trozos (rows, keep)) y filas del abierto;
+        # keep marca las filas de maniobras, que no se descartan nunca
+        self._closed: list[tuple[np.ndarray, np.ndarray]] = []
+        self._open = np.empty((0, 7))
+        self._open_keep = np.empty(0, dtype=bool)
+
+    # ---------- acumulación ----------
+    @staticmethod
+    def _new_arc(t0: float) -> dict:
+        return {"t0": t0, "t1": t0, "rows": 0, "r": _Extremes(), "speed": _Extremes()}
+
+    def update(self, rows: np.ndarray):
+        """Añade un trozo de filas (n, 7) (en orden, a continuación del anterior)."""
+        rows = np.asarray(rows, dtype=float)
+        if not len(rows):
+            return
+        t = rows[:, 0]
+        r = np.sqrt(np.einsum("ij,ij->i", rows[:, 1:4], rows[:, 1:4]))
+        speed = np.sqrt(np.einsum("ij,ij->i", rows[:, 4:7], rows[:, 4:7]))
+
+        if not self.rows:
+            self.t_first = float(t[0])
+            self._arc["t0"] = self.t_first
+        self.r.update(t, r)
+        self.speed.update(t, speed)
+
+        # Maniobras: filas con el mismo t, también entre el trozo anterior y este
+        prev = rows if self._last is None else np.vstack([self._last, rows])
+        offset = 0 if self._last is None else 1
+        burn = np.flatnonzero(np.diff(prev[:, 0]) == 0)   # la fila burn+1 es la de después
+        for k in burn:
+            self.burns.append((float(prev[k, 0]), float(np.linalg.norm(prev[k + 1, 4:] - prev[k, 4:]))))
+
+        self._update_arcs(t, r, speed, burn + 1 - offset)
+        self._update_apsides(rows, r)
+        self._update_series(rows, burn + 1 - offset)
+
+        self.rows += len(rows)
+        self.t_last = float(t[-1])
+        self._last = rows[-1:].copy()
+
+    def _update_arcs(self, t, r, speed, starts):
+        # starts: filas de este trozo que abren un arco nuevo (las de después de un burn)
+        bounds = [0, *[int(s) for s in starts if s > 0], len(t)]
+        if len(starts) and starts[0] == 0:
+            self._close_arc(t[0])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if a > 0:
+                self._close_arc(t[a])
+            if b > a:
+                arc = self._arc
+                arc["rows"] += b - a
+                arc["t1"] = float(t[b - 1])
+                arc["r"].update(t[a:b], r[a:b])
+                arc["speed"].update(t[a:b], speed[a:b])
+
+    def _close_arc(self, t_burn: float):
+        self.arcs.append(self._arc)
+        self._arc = self._new_arc(float(t_burn))
+
+    def _update_apsides(self, rows, r):
+        # Cambio de signo de r·v entre dos filas, con el mismo APSIS_TOL que
+        # events.py: en una órbita circular el ruido de r no cuenta como ápside
+        rdot = np.einsum("ij,ij->i", rows[:, 1:4], rows[:, 4:7]) / r   # [km/s]
+        cur = np.column_stack([rows[:, 0], r, rdot, flight_path_sine(rows[:, 1:7])])
+        tr = np.vstack([self._tail, cur])
+        a, b = tr[:-1], tr[1:]
+        # Las dos filas de un burn (mismo t) no son un tramo
+        cross = ((b[:, 0] != a[:, 0]) & (np.signbit(a[:, 3]) != np.signbit(b[:, 3]))
+                 & (np.maximum(np.abs(a[:, 3]), np.abs(b[:, 3])) >= APSIS_TOL))
+        for lst, mask in ((self.periapsides, cross & np.signbit(a[:, 3])),
+                          (self.apoapsides, cross & ~np.signbit(a[:, 3]))):
+            k = np.flatnonzero(mask)
+            if k.size:
+                lst.extend(zip(*_apsis(a[k], b[k])))
+        self._tail = tr[-1:]
+
+    def _update_series(self, rows, starts):
+        # Burn partido entre dos trozos: la fila de antes es la última del
+        # bucket abierto (el M4 guarda siempre la última fila de cada bucket)
+        if len(starts) and starts[0] == 0:
+            self._open_keep[-1] = True
+
+        keep = np.zeros(len(rows), dtype=bool)
+        keep[[s for s in starts if s >= 0]] = True
+        keep[[s - 1 for s in starts if s >= 1]] = True
+
+        if self.bucket_days is None and rows[-1, 0] > self.t_first:
+            self.bucket_days = (rows[-1, 0] - self.t_first) / self.buckets
+
+        # Los buckets cerrados no cambian: solo se reduce el abierto con el trozo nuevo
+        self._reduce(np.vstack([self._open, rows]), np.concatenate([self._open_keep, keep]))
+
+        while self._bucket_ids(self._open[:1, 0])[0] >= self.buckets:
+            self.bucket_days *= 2
+            series, series_keep = self._series_parts()
+            self._closed = []
+            self._reduce(series, series_keep)
+
+    def _reduce(self, rows: np.ndarray, keep: np.ndarray):
+        """M4 de rows (desde el primer bucket no cerrado); el último bucket queda abierto."""
+        r = np.sqrt(np.einsum("ij,ij->i", rows[:, 1:4], rows[:, 1:4]))
+        speed = np.sqrt(np.einsum("ij,ij->i", rows[:, 4:7], rows[:, 4:7]))
+        ids = self._bucket_ids(rows[:, 0])
+        k = m4_select(ids, np.column_stack([rows[:, 1:7], r, speed]), np.flatnonzero(keep))
+        rows, keep, ids = rows[k], keep[k], ids[k]
+
+        split = int(np.searchsorted(ids, ids[-1]))
+        if split:
+            self._closed.append((rows[:split], keep[:split]))
+        self._open, self._open_keep = rows[split:], keep[split:]
+
+    def _series_parts(self) -> tuple[np.ndarray, np.ndarray]:
+        parts = [*self._closed, (self._open, self._open_keep)]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def _bucket_ids(self, t: np.ndarray) -> np.ndarray:
+        if self.bucket_days is None:
+            return np.zeros(len(t), dtype=np.int64)
+        return np.floor((t - self.t_first) / self.bucket_days).astype(np.int64)
+
+    # ---------- resultados ----------
+    def series(self) -> np.ndarray:
+        """Serie diezmada (n, 7) con la última fila del report al final."""
+        return self._series_parts()[0]
+
+    def frame(self, sat_name: str = "Sat") -> pd.DataFrame:
+        """series() con las columnas de load_report, para make_plots."""
+        return rows_to_frame(self.series(), sat_name)
+
+    @property
+    def burn_times(self) -> list[float]:
+        return [t for t, _ in self.burns]
+
+    def arc_table(self) -> pd.DataFrame:
+        """Un arco por fila: entre el inicio, cada maniobra y el final."""
+        arcs = [*self.arcs, self._arc] if self._arc["rows"] else self.arcs
+        return pd.DataFrame([{
+            "t0 [dias]": a["t0"], "t1 [dias]": a["t1"], "filas": a["rows"],
+            "r min [km]": a["r"].min, "r max [km]": a["r"].max,
+            "|v| media [km/s]": a["speed"].mean,
+        } for a in arcs])
+
+    def summary(self) -> str:
+        lines = [f"Report: {self.rows} filas, t = {self.t_first:g} .. {self.t_last:g} días", ""]
+        for name, ext, unit in (("r", self.r, "km"), ("|v|", self.speed, "km/s")):
+            lines.append(f"{name:>4} min {ext.min:.6f} {unit} (t = {ext.t_min:.6f})   "
+                         f"max {ext.max:.6f} {unit} (t = {ext.t_max:.6f})   media {ext.mean:.6f} {unit}")
+
+        if self.periapsides:
+            t_p, r_p = min(self.periapsides, key=lambda x: x[1])
+            lines.append(f"Periapsis más bajo: r = {r_p:.3f} km (t = {t_p:.6f}), {len(self.periapsides)} periapsis")
+        if self.apoapsides:
+            t_a, r_a = max(self.apoapsides, key=lambda x: x[1])
+            lines.append(f"Apoapsis más alto:  r = {r_a:.3f} km (t = {t_a:.6f}), {len(self.apoapsides)} apoapsis")
+        if self.body_radius is not None:
+            lines.append(f"Altitud mínima: {self.r.min - self.body_radius:.3f} km")
+
+        if self.burns:
+            lines.append("")
+            lines.append(f"Maniobras: {len(self.burns)}, delta-V total {sum(dv for _, dv in self.burns):.6f} km/s")
+            lines.append(self.arc_table().to_string(index=False, float_format=lambda v: f"{v:.6g}"))
+        n_buckets = int(self._bucket_ids(self._open[-1:, 0])[0]) + 1 if len(self._open) else 0
+        width = f"{self.bucket_days:.6g} días" if self.bucket_days else "todo el report"
+        lines.append(f"\nSerie de plots: {len(self.series())} puntos (M4 en {n_buckets} buckets de {width})")
+        return "\n".join(lines)
+
+    def write(self, path: Path = STATS_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.summary(), encoding="utf-8")
+        print("✅ Resumen del report escrito en:", path)
+
+
+def _apsis(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (t, r) del ápside entre las filas a y b (t, r, dr/dt, ...): dr/dt = 0 por
+    interpolación lineal y r del polinomio de Hermite cúbico de r(t).
+    """
+    h = (b[:, 0] - a[:, 0]) * 86400.0
+    d0, d1 = a[:, 2] * h, b[:, 2] * h
+    den = a[:, 2] - b[:, 2]
+    s = np.clip(a[:, 2] / np.where(den != 0, den, 1.0), 0.0, 1.0)
+    r = ((2 * s**3 - 3 * s**2 + 1) * a[:, 1] + (s**3 - 2 * s**2 + s) * d0
+         + (-2 * s**3 + 3 * s**2) * b[:, 1] + (s**3 - s**2) * d1)
+    return a[:, 0] + s * (b[:, 0] - a[:, 0]), r
+
+
+def stream_stats(path: Path, buckets: int = PLOT_BUCKETS, body_radius: float | None = None,
+                 chunk_rows: int = CHUNK_ROWS, chunk_bytes: int = CHUNK_BYTES) -> ReportStats:
+    """ReportStats de un report recorrido por trozos (report_reader.iter_report_chunks)."""
+    stats = ReportStats(buckets, body_radius)
+    for chunk in iter_report_chunks(path, REPORT_COLUMNS, chunk_rows, chunk_bytes):
+        stats.update(chunk.to_numpy())
+    return stats
@@ -0,0 +1,200 @@
+import multiprocessing as mp
+import os
+import queue
+from collections.abc import Callable
+from pathlib import Path
+import numpy as np
+
+from SOURCES.astro import RADIUS
+from SOURCES.ephemeris import Ephemeris
+from SOURCES.propagator import is_two_body, iter_propagation, make_dynamics
+from SOURCES.streaming import PropagationAborted, iter_states, watch
+from SOURCES.telemetry import RunControl
+from SOURCES.Transpiler import apply_overrides, resolve_config
+from SOURCES.utils import OUTPUT_DIR
+
+SHARDS_DIR = OUTPUT_DIR / "shards"
+
+# Instantes de la malla común de salida (de 0 a la mayor duración)
+SAMPLES = 1000
+
+# Estado de cada escenario en ShardedResult.status
+PENDING, OK, ABORTED, ERROR, CANCELLED = range(5)
+STATUS_NAMES = {PENDING: "pending", OK: "ok", ABORTED: "aborted", ERROR: "error", CANCELLED: "cancelled"}
+
+
+class ShardedResult:
+    """
+    Resultado de run_sharded: states[i] son los estados (M, 6) del escenario
+    i en la malla times [días], NaN donde ya no hay trayectoria (duración más
+    corta, impacto, error). states es un .npy mapeado en memoria: se puede
+    volver a abrir con np.load(path, mmap_mode="r") sin cargarlo entero.
+    """
+
+    def __init__(self, path: Path, times: np.ndarray, status: np.ndarray, errors: dict):
+        self.path = Path(path)
+        self.times = times
+        self.status = status
+        self.errors = errors
+        self.states = np.load(self.path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.status)
+
+    def summary(self) -> dict:
+        names, counts = np.unique(self.status, return_counts=True)
+        return {STATUS_NAMES[n]: int(c) for n, c in zip(names, counts)}
+
+
+def _cost_order(ps: list[dict]) -> np.ndarray:
+    """
+    Orden de reparto: primero los más caros (con perturbaciones y más
+    largos), para que los cortos rellenen huecos al final.
+    """
+    cost = np.array([p["dur_days"] * (1.0 if is_two_body(p) else 50.0) for p in ps])
+    return np.argsort(-cost, kind="stable")
+
+
+def _run_one(p: dict, times: np.ndarray, slot: np.ndarray, cancel) -> tuple[int, str]:
+    """Propaga un escenario y escribe su muestreo en slot (una fila de la salida)."""
+    rows = []
+    status, message = OK, ""
+    try:
+        batches = watch(iter_states(iter_propagation(p)), p["dur_days"],
+                        RADIUS.get(p["central_en"], RADIUS["Earth"]))
+        for batch in batches:
+            if cancel.is_set():
+                batches.close()
+                return CANCELLED, ""
+            rows.append(batch)
+    except PropagationAborted as e:
+        # Lo propagado hasta el impacto/divergencia sí se guarda
+        status, message = ABORTED, str(e)
+
+    rows = np.concatenate(rows) if rows else np.empty((0, 7))
+    if len(rows) >= 2:
+        eph = Ephemeris.from_rows(rows, make_dynamics(p))
+        t0, t1 = eph.span
+        inside = (times >= t0) & (times <= t1)
+        slot[inside] = eph(times[inside])
+    return status, message
+
+
+def _shard_worker(ps: list[dict], order: np.ndarray, times: np.ndarray, path: str,
+                  counter, cancel, results):
+    """
+    Proceso del pool: coge el siguiente escenario libre del contador
+    compartido hasta que no quede ninguno (o se cancele). Así un escenario
+    largo no bloquea a los demás: los otros procesos siguen cogiendo.
+    """
+    try:
+        out = np.load(path, mmap_mode="r+")
+        while not cancel.is_set():
+            with counter.get_lock():
+                k = counter.value
+                counter.value += 1
+            if k >= len(order):
+                break
+            i = int(order[k])
+            try:
+                status, message = _run_one(ps[i], times, out[i], cancel)
+            except Exception as e:
+                status, message = ERROR, f"{type(e).__name__}: {e}"
+            out.flush()
+            results.put((i, status, message))
+        del out
+    except BaseException:
+        # Este proceso se cae: que los demás paren ya en vez de terminar su parte
+        cancel.set()
+        raise
+
+
+def run_sharded(ps: list[dict], workers: int | None = None, samples: int = SAMPLES,
+                out_path: Path | None = None, ctl: RunControl | None = None,
+                on_progress: Callable[[float], None] | None = None) -> ShardedResult:
+    """
+    Propaga muchas configs resueltas (resolve_config) con el propagador
+    propio, repartidas entre procesos. Cada proceso escribe directamente en
+    un .npy mapeado en memoria (out_path); al padre solo vuelve el estado de
+    cada escenario, no las trayectorias. on_progress recibe la fracción de
+    escenarios terminados (0..1). Con ctl se respetan su timeout y su
+    cancelación. Ante esas o cualquier otra excepción (en el padre o la que
+    tumba a un proceso) se para a todos los procesos; las del padre se
+    relanzan.
+    """
+    ctl = ctl or RunControl()
+    n = len(ps)
+    workers = max(1, min(workers or os.cpu_count() or 1, n))
+    dur_max = max((p["dur_days"] for p in ps), default=0.0)
+    times = np.linspace(0.0, dur_max, samples)
+
+    if out_path is None:
+        out_path = SHARDS_DIR / f"states_{os.getpid()}.npy"
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float64, shape=(n, samples, 6))
+    out[:] = np.nan
+    out.flush()
+    del out
+
+    status = np.full(n, PENDING, dtype=np.int8)
+    errors = {}
+
+    # spawn: el padre puede tener hilos (Qt), y fork con hilos no es seguro
+    ctx = mp.get_context("spawn")
+    counter = ctx.Value("l", 0)
+    cancel = ctx.Event()
+    results = ctx.Queue()
+    order = _cost_order(ps)
+    procs = [
+        ctx.Process(target=_shard_worker, args=(ps, order, times, str(out_path), counter, cancel, results),
+                    daemon=True)
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    print(f"▶ {n} escenarios en {workers} procesos...")
+    done = 0
+    try:
+        while done < n:
+            try:
+                i, st, message = results.get(timeout=0.2)
+            except queue.Empty:
+                ctl.check()
+                if not any(proc.is_alive() for proc in procs):
+                    break   # algún proceso murió sin avisar: lo que falte queda como error
+                continue
+            status[i] = st
+            if message:
+                errors[i] = message
+            done += 1
+            if on_progress is not None:
+                on_progress(done / n)
+            ctl.check()
+    except BaseException:
+        # Cancelación, timeout o cualquier error (también de on_progress):
+        # se para a todos los procesos antes de relanzarlo
+        cancel.set()
+        raise
+    finally:
+        for proc in procs:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.kill()
+        results.close()
+
+    lost = np.flatnonzero(status == PENDING)
+    for i in lost:
+        status[i] = ERROR
+        errors[int(i)] = "El proceso que lo propagaba terminó sin avisar"
+
+    result = ShardedResult(out_path, times, status, errors)
+    print(f"✅ Escenarios terminados: {result.summary()} -> {out_path}")
+    return result
+
+
+def run_scenarios(cfg: dict, variants: list[dict], **kwargs) -> ShardedResult:
+    """run_sharded sobre una config base de parse_gui_txt más overrides (bulk_input, sweeps)."""
+    ps = [resolve_config(apply_overrides(cfg, v)) for v in variants]
+    return run_sharded(ps, **kwargs)
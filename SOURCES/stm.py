@@ -0,0 +1,185 @@
+from pathlib import Path
+import numpy as np
+
+from SOURCES.astro import MU
+from SOURCES.propagator import (
+    BATCH_ROWS, burn_delta_v, initial_state, is_two_body, iter_mission, make_dynamics,
+)
+from SOURCES.utils import OUTPUT_DIR
+
+# La del último pipeline con STM (backend numpy), junto al report
+STM_PATH = OUTPUT_DIR / "stm.npz"
+
+# Pasos de las diferencias centradas para las parciales de las perturbaciones
+POS_STEP = 1e-3   # km
+VEL_STEP = 1e-6   # km/s
+
+# Ejemplo (covarianza lineal en vez de Monte Carlo):
+#     hist = propagate_stm(p)
+#     P0 = np.diag([0.1**2] * 3 + [1e-4**2] * 3)   # km, km/s
+#     P = hist.covariance(P0)                       # (M, 6, 6), una por instante del report
+#     sigma_r = np.sqrt(np.trace(P[:, :3, :3], axis1=1, axis2=2))
+
+
+# ========== PARCIALES ==========
+
+def stm_config(p: dict) -> dict:
+    """
+    Config con la que se calculan las parciales: el campo gravitatorio se
+    trunca a grado y orden stm_limit (como StmLimit en GMAT); por debajo
+    de grado 2 queda solo la masa puntual.
+    """
+    limit = p.get("stm_limit", 0)
+    if not limit or p.get("gravity_degree", 0) <= limit:
+        return p
+    degree = limit if limit >= 2 else 0
+    return dict(p, gravity_degree=degree, gravity_order=min(p["gravity_order"], degree))
+
+
+def make_partials(p: dict):
+    """
+    (G, D) = (da/dr, da/dv), cada una (..., 3, 3), para estados (..., 6).
+    La masa puntual es analítica; lo que añadan las perturbaciones (campo
+    truncado a stm_limit, arrastre) sale de diferencias centradas, las 12
+    evaluaciones de todos los estados en una sola llamada a la dinámica.
+    """
+    mu = MU.get(p["fm_central_en"], MU["Earth"])
+    q = stm_config(p)
+    if is_two_body(q):
+        perturbation = None
+    else:
+        full = make_dynamics(q)
+        point = make_dynamics({"fm_central_en": p["fm_central_en"]})
+
+        def perturbation(t, y):
+            return full(t, y)[..., 3:] - point(t, y)[..., 3:]
+
+    steps = np.r_[np.full(3, POS_STEP), np.full(3, VEL_STEP)]
+    # Filas: +paso en cada componente y luego -paso en cada una
+    delta = np.concatenate([np.diag(steps), -np.diag(steps)])   # (12, 6)
+
+    def partials(t, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        r = y[..., :3]
+        r2 = np.einsum("...i,...i->...", r, r)[..., None, None]
+        rr = r[..., :, None] * r[..., None, :]
+        G = mu / (r2 ** 2.5) * (3.0 * rr - r2 * np.eye(3))
+        D = np.zeros_like(G)
+
+        if perturbation is not None:
+            batch = y.shape[:-1]
+            yp = (y[..., None, :] + delta).reshape(-1, 6)
+            tp = np.broadcast_to(np.asarray(t, dtype=float)[..., None], batch + (12,)).reshape(-1)
+            a = perturbation(tp, yp).reshape(batch + (2, 6, 3))
+            # J[..., i, j] = d a_i / d y_j
+            J = np.swapaxes(a[..., 0, :, :] - a[..., 1, :, :], -1, -2) / (2.0 * steps)
+            G = G + J[..., :3]
+            D = D + J[..., 3:]
+        return G, D
+
+    return partials
+
+
+def make_variational_dynamics(p: dict, dynamics=None):
+    """
+    f(t, Y) del estado aumentado Y = [y (6), STM (36, por filas)]:
+    y' = f(t, y) y Phi' = A Phi con A = [[0, I], [G, D]]. Vale para (42,) o (N, 42).
+    """
+    f = dynamics or make_dynamics(p)
+    partials = make_partials(p)
+
+    def F(t, Y: np.ndarray) -> np.ndarray:
+        y = Y[..., :6]
+        phi = Y[..., 6:].reshape(Y.shape[:-1] + (6, 6))
+        G, D = partials(t, y)
+        dphi = np.concatenate([phi[..., 3:, :], G @ phi[..., :3, :] + D @ phi[..., 3:, :]], axis=-2)
+        return np.concatenate([f(t, y), dphi.reshape(Y.shape[:-1] + (36,))], axis=-1)
+
+    return F
+
+
+def burn_jacobian(y: np.ndarray, m: dict, axes_type: str) -> np.ndarray:
+    """
+    d(y tras el burn)/d(y antes) (6, 6). Con ejes inerciales el delta-V no
+    depende del estado y es la identidad; con VNB/LVLH se deriva numéricamente.
+    """
+    J = np.eye(6)
+    if m["axes"] not in ("VNB", "LVLH"):
+        return J
+    steps = np.r_[np.full(3, POS_STEP), np.full(3, VEL_STEP)]
+    dv_plus = burn_delta_v(y + np.diag(steps), m, axes_type)    # (6, 3)
+    dv_minus = burn_delta_v(y - np.diag(steps), m, axes_type)
+    J[3:, :] += ((dv_plus - dv_minus) / (2.0 * steps[:, None])).T
+    return J
+
+
+# ========== PROPAGACIÓN ==========
+
+def iter_stm(p: dict, dynamics=None, batch: int = BATCH_ROWS):
+    """
+    Como iter_propagation pero integrando también las ecuaciones
+    variacionales: lotes (t [días], estados (n, 6), STM (n, 6, 6)), con
+    Phi(t, 0) en cada fila del report. Siempre se integra numéricamente
+    (también con masa puntual); el control de paso solo mira el estado,
+    así que los pasos son los mismos que sin STM.
+    """
+    axes_type = p["axes_type"]
+
+    def burn(Y, m):
+        y, phi = Y[:6], Y[6:].reshape(6, 6)
+        J = burn_jacobian(y, m, axes_type)
+        y = y.copy()
+        y[3:] += burn_delta_v(y, m, axes_type)
+        return np.concatenate([y, (J @ phi).ravel()])
+
+    Y0 = np.concatenate([initial_state(p), np.eye(6).ravel()])
+    F = make_variational_dynamics(p, dynamics)
+    for t_days, Y in iter_mission(p, F, Y0, burn, batch):
+        yield t_days, Y[:, :6], Y[:, 6:].reshape(-1, 6, 6)
+
+
+class StmHistory:
+    """
+    STM de la propagación en cada instante de salida: stm[k] = Phi(t_k, 0),
+    d(estado en t_k)/d(estado inicial). Los burns dan dos filas con el mismo
+    t, como en el report; los índices k son los de sus filas.
+    """
+
+    def __init__(self, t_days: np.ndarray, states: np.ndarray, stm: np.ndarray):
+        self.t = np.asarray(t_days, dtype=float)
+        self.states = np.asarray(states, dtype=float).reshape(-1, 6)
+        self.stm = np.asarray(stm, dtype=float).reshape(-1, 6, 6)
+
+    def __len__(self):
+        return len(self.t)
+
+    def covariance(self, P0: np.ndarray) -> np.ndarray:
+        """Covarianza P0 (6, 6) del estado inicial llevada a cada instante: Phi P0 Phi^T, (M, 6, 6)."""
+        return np.einsum("kij,jl,kml->kim", self.stm, np.asarray(P0, dtype=float), self.stm)
+
+    def sigmas(self, P0: np.ndarray) -> np.ndarray:
+        """Desviaciones típicas (M, 6) de cada componente del estado."""
+        return np.sqrt(np.einsum("kii->ki", self.covariance(P0)))
+
+    def between(self, i: int, j: int) -> np.ndarray:
+        """
+        Phi(t_j, t_i) = Phi(t_j, 0) Phi(t_i, 0)^-1: sensibilidad del estado en
+        la fila j al de la fila i. Su bloque [:3, 3:] (dr_j/dv_i) es el que
+        usa un targeting de maniobras (corrección de Newton del delta-V en i).
+        """
+        return np.linalg.solve(self.stm[i].T, self.stm[j].T).T
+
+    def save(self, path: Path = STM_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, t=self.t, states=self.states, stm=self.stm)
+
+    @classmethod
+    def load(cls, path: Path = STM_PATH) -> "StmHistory":
+        with np.load(Path(path)) as data:
+            return cls(data["t"], data["states"], data["stm"])
+
+
+def propagate_stm(p: dict, dynamics=None) -> StmHistory:
+    """Propaga estado y STM de una vez (ver iter_stm)."""
+    ts, ys, phis = zip(*iter_stm(p, dynamics))
+    return StmHistory(np.concatenate(ts), np.concatenate(ys), np.concatenate(phis))
@@ -0,0 +1,132 @@
+import time
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from SOURCES.Transpiler import REPORT_COLUMNS
+
+# Lotes de filas (n, 7) con las columnas del report: ElapsedDays, X, Y, Z, VX, VY, VZ
+
+# Radio a partir del cual se da la órbita por divergida, en radios del cuerpo central
+R_MAX_FACTOR = 1e4
+
+
+class PropagationAborted(RuntimeError):
+    """La propagación se ha cortado antes de terminar (divergencia, impacto...)."""
+
+
+def parse_rows(lines: Iterable[str], ncols: int = len(REPORT_COLUMNS)) -> np.ndarray:
+    """Líneas de un report -> array (n, ncols). Cabeceras y líneas incompletas se saltan."""
+    rows = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) != ncols:
+            continue
+        try:
+            rows.append([float(v) for v in fields])
+        except ValueError:
+            continue   # cabecera
+    return np.array(rows, dtype=float).reshape(-1, ncols)
+
+
+def tail_report(path: Path, running: Callable[[], bool], poll: float = 0.2,
+                ncols: int = len(REPORT_COLUMNS)) -> Iterator[np.ndarray]:
+    """
+    Lee un report mientras otro proceso lo escribe y devuelve las filas nuevas
+    en lotes. running() dice si el proceso sigue vivo: cuando ya no lo está y
+    no queda nada por leer, se termina. Si el fichero no llega a crearse, no
+    devuelve nada (el que llama decide si eso es un error).
+    """
+    path = Path(path)
+    while not path.exists():
+        if not running():
+            return
+        time.sleep(poll)
+
+    pending = ""
+    with path.open("r", encoding="utf-8") as fh:
+        while True:
+            # Antes de leer: si ya había terminado, lo que se lea ahora es lo último
+            alive = running()
+            chunk = fh.read()
+            if chunk:
+                lines = (pending + chunk).split("\n")
+                pending = lines.pop()   # la última puede estar a medio escribir
+                rows = parse_rows(lines, ncols)
+                if len(rows):
+                    yield rows
+            elif not alive:
+                break
+            else:
+                time.sleep(poll)
+
+    rows = parse_rows([pending], ncols)
+    if len(rows):
+        yield rows
+
+
+def iter_states(batches: Iterable[tuple[np.ndarray, np.ndarray]]) -> Iterator[np.ndarray]:
+    """Lotes (t [días], estados (n, 6)) del propagador propio -> filas del report."""
+    for t_days, states in batches:
+        yield np.column_stack([t_days, states])
+
+
+def watch(batches: Iterable[np.ndarray], dur_days: float, body_radius: float,
+          r_max: float | None = None,
+          on_progress: Callable[[float], None] | None = None) -> Iterator[np.ndarray]:
+    """
+    Deja pasar los lotes tal cual, comprobando cada uno antes:
+      - NaN/inf en el estado           -> PropagationAborted (divergencia)
+      - r < body_radius                -> PropagationAborted (impacto)
+      - r > r_max (R_MAX_FACTOR radios) -> PropagationAborted (divergencia)
+    on_progress recibe la fracción de la duración ya propagada (0..1).
+    """
+    r_max = r_max or R_MAX_FACTOR * body_radius
+    t_last = 0.0
+
+    try:
+        for rows in batches:
+            finite = np.isfinite(rows).all(axis=1)
+            if not finite.all():
+                raise PropagationAborted(
+                    f"Estado no finito (NaN/inf) tras t = {t_last:.6f} días: la propagación diverge"
+                )
+
+            r = np.linalg.norm(rows[:, 1:4], axis=1)
+            low = np.flatnonzero(r < body_radius)
+            if low.size:
+                i = low[0]
+                raise PropagationAborted(
+                    f"Impacto en t = {rows[i, 0]:.6f} días: r = {r[i]:.3f} km < radio del cuerpo ({body_radius:.3f} km)"
+                )
+            high = np.flatnonzero(r > r_max)
+            if high.size:
+                i = high[0]
+                raise PropagationAborted(
+                    f"Divergencia en t = {rows[i, 0]:.6f} días: r = {r[i]:.6g} km > {r_max:.6g} km"
+                )
+
+            t_last = rows[-1, 0]
+            if on_progress is not None:
+                on_progress(min(1.0, t_last / dur_days) if dur_days > 0 else 1.0)
+            yield rows
+    finally:
+        # Cerrar la fuente ya (y no cuando la recoja el GC): así se mata GMAT
+        # o se borra el report a medias en cuanto se corta
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+
+
+def collect(batches: Iterable[np.ndarray], ncols: int = len(REPORT_COLUMNS)) -> np.ndarray:
+    """Junta todos los lotes en un solo array (n, ncols)."""
+    batches = list(batches)
+    if not batches:
+        return np.empty((0, ncols))
+    return np.concatenate(batches)
+
+
+def rows_to_frame(rows: np.ndarray, sat_name: str) -> pd.DataFrame:
+    """Filas del report -> DataFrame con las mismas columnas que load_report."""
+    return pd.DataFrame(rows, columns=[f"{sat_name}.{col}" for col in REPORT_COLUMNS])
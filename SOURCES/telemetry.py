@@ -0,0 +1,346 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from SOURCES.streaming import PropagationAborted
+from SOURCES.utils import OUTPUT_DIR
+
+# psutil es opcional: con él se mide el proceso GMAT mientras corre
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# resource solo existe en Unix (Linux/macOS)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Una línea JSON por ejecución
+RUNS_LOG = OUTPUT_DIR / "runs.jsonl"
+
+_LOG_LOCK = threading.Lock()
+
+
+class RunCancelled(RuntimeError):
+    """La ejecución se ha cancelado desde fuera (botón Cancelar, pool.cancel())."""
+
+
+class RunTimeout(RuntimeError):
+    """La ejecución ha superado su tiempo máximo."""
+
+
+class RunControl:
+    """
+    Límites de una ejecución: timeout [s] (None = sin límite) y un Event
+    para cancelarla desde otro hilo. En usage se acumula lo que consumen los
+    procesos que lance (CPU, pico de memoria), para RunRecord.
+    """
+
+    def __init__(self, timeout: float | None = None, cancel: threading.Event | None = None):
+        self.timeout = timeout
+        self.cancel = cancel or threading.Event()
+        self.usage = {}
+        self._t0 = time.monotonic()
+
+    @classmethod
+    def from_env(cls, cancel: threading.Event | None = None) -> "RunControl":
+        """Timeout de la variable SIM_TIMEOUT [s]; vacía o 0 = sin límite."""
+        try:
+            timeout = float(os.environ.get("SIM_TIMEOUT", "0"))
+        except ValueError:
+            timeout = 0.0
+        return cls(timeout if timeout > 0 else None, cancel)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._t0
+
+    def check(self):
+        """Lanza RunCancelled/RunTimeout si hay que parar."""
+        if self.cancel.is_set():
+            raise RunCancelled("Ejecución cancelada")
+        if self.timeout is not None and self.elapsed() > self.timeout:
+            raise RunTimeout(f"Tiempo máximo superado ({self.timeout:g} s)")
+
+    def add_usage(self, cpu_s: float, peak_rss_mb: float):
+        self.usage["child_cpu_s"] = self.usage.get("child_cpu_s", 0.0) + cpu_s
+        self.usage["child_peak_rss_mb"] = max(self.usage.get("child_peak_rss_mb", 0.0), peak_rss_mb)
+
+
+# ========== MEDIDA DE PROCESOS ==========
+
+def _maxrss_mb(ru_maxrss: int) -> float:
+    # Linux da KiB; macOS, bytes
+    return ru_maxrss / (1024.0 ** 2 if sys.platform == "darwin" else 1024.0)
+
+
+def _children_rusage():
+    return resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+
+
+def _peak_mb(mem) -> float | None:
+    # peak_wset solo existe en Windows; en el resto psutil no da el pico (rss es el actual)
+    peak = getattr(mem, "peak_wset", None)
+    return peak / 1024.0 ** 2 if peak is not None else None
+
+
+def _proc_hwm_mb(pid: int) -> float | None:
+    """Pico de memoria de un proceso vivo en Linux (VmHWM de /proc/<pid>/status)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0   # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def self_peak_rss_mb() -> float:
+    """Pico de memoria de este proceso (desde que arrancó), 0 si no se puede medir."""
+    if resource is not None:
+        return _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    if psutil is not None:
+        return _peak_mb(psutil.Process().memory_info()) or 0.0
+    return 0.0
+
+
+class ProcessWatcher:
+    """
+    Vigila un proceso lanzado con Popen: alive() comprueba el RunControl
+    (y si toca, mata el proceso y relanza RunCancelled/RunTimeout) y va
+    tomando muestras de CPU y memoria con psutil. Al terminar, el uso se
+    suma a ctl.usage. Sin psutil, en Unix se usa getrusage de los hijos:
+    la CPU incluye la de otros hijos que terminen a la vez (GmatPool) y el
+    pico de memoria es el de cualquier hijo terminado hasta ahora.
+    """
+
+    def __init__(self, proc: subprocess.Popen, ctl: RunControl | None = None):
+        self.proc = proc
+        self.ctl = ctl or RunControl()
+        self.cpu_s = 0.0
+        self.peak_rss_mb = 0.0
+        self._done = False
+        self._rusage0 = _children_rusage()
+        self._ps = None
+        if psutil is not None:
+            try:
+                self._ps = psutil.Process(proc.pid)
+            except psutil.Error:
+                pass
+
+    def _sample(self):
+        if self._ps is None:
+            return
+        try:
+            cpu = self._ps.cpu_times()
+            mem = self._ps.memory_info()
+        except psutil.Error:
+            return   # ya ha terminado
+        self.cpu_s = cpu.user + cpu.system
+        # Sin peak_wset: VmHWM en Linux y, si tampoco, el mayor rss muestreado
+        peak = _peak_mb(mem)
+        if peak is None:
+            peak = _proc_hwm_mb(self.proc.pid)
+        self.peak_rss_mb = max(self.peak_rss_mb, peak if peak is not None else mem.rss / 1024.0 ** 2)
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        self.proc.wait()
+
+        rusage1 = _children_rusage()
+        if self._ps is None and rusage1 is not None:
+            self.cpu_s = (rusage1.ru_utime - self._rusage0.ru_utime) + (rusage1.ru_stime - self._rusage0.ru_stime)
+            self.peak_rss_mb = _maxrss_mb(rusage1.ru_maxrss)
+        self.ctl.add_usage(self.cpu_s, self.peak_rss_mb)
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self._finish()
+
+    def alive(self) -> bool:
+        self._sample()
+        if self.proc.poll() is not None:
+            self._finish()
+            return False
+        try:
+            self.ctl.check()
+        except (RunCancelled, RunTimeout):
+            self.kill()
+            raise
+        return True
+
+
+def wait_process(proc: subprocess.Popen, ctl: RunControl | None = None, poll: float = 0.2) -> int:
+    """Como proc.wait(), pero respetando el timeout/cancelación de ctl. Devuelve el returncode."""
+    watcher = ProcessWatcher(proc, ctl)
+    while watcher.alive():
+        watcher.ctl.cancel.wait(poll)
+    return proc.returncode
+
+
+# ========== REGISTRO POR EJECUCIÓN ==========
+
+# Ajustes del propagador en un script GMAT: "Prop.MinStep = 0.001;"
+_PROP_SETTING_RE = re.compile(
+    r"^\s*\w+\.(InitialStepSize|Accuracy|MinStep|MaxStep|MaxStepAttempts)\s*=\s*([^;]+);",
+    re.MULTILINE,
+)
+_INTEG_TYPE_RE = re.compile(r"^\s*\w+\.Type\s*=\s*(\w+)\s*;", re.MULTILINE)
+
+_SCRIPT_KEYS = {
+    "InitialStepSize": "init_step",
+    "Accuracy": "accuracy",
+    "MinStep": "min_step",
+    "MaxStep": "max_step",
+    "MaxStepAttempts": "max_step_attempts",
+}
+
+
+def script_params(script_path: Path) -> dict:
+    """Ajustes del propagador leídos de un script GMAT (el primero de cada uno)."""
+    text = Path(script_path).read_text(encoding="utf-8")
+    params = {"script": Path(script_path).name}
+
+    m = _INTEG_TYPE_RE.search(text)
+    if m:
+        params["integ_type"] = m.group(1)
+    for name, value in _PROP_SETTING_RE.findall(text):
+        key = _SCRIPT_KEYS[name]
+        if key not in params:
+            value = value.strip()
+            try:
+                params[key] = int(value) if value.isdigit() else float(value)
+            except ValueError:
+                params[key] = value
+    return params
+
+
+def run_params(p: dict) -> dict:
+    """Lo que interesa guardar de una config resuelta (Transpiler.resolve_config)."""
+    keys = ["sat_name", "integ_type", "init_step", "accuracy", "min_step", "max_step",
+            "max_step_attempts", "dur_days", "report_step"]
+    params = {k: p[k] for k in keys}
+    params["n_maneuvers"] = len(p["maneuvers"])
+    return params
+
+
+# Líneas del report que empiezan por un número (las filas de datos)
+_DATA_LINE_RE = re.compile(rb"^[ \t]*[-+.\d]", re.MULTILINE)
+
+# Bloque con el que se cuentan las filas (la memoria no depende del report)
+_COUNT_BLOCK = 8 * 2**20
+
+
+def _count_data_lines(path: Path) -> int:
+    rows = 0
+    pending = b""
+    with path.open("rb") as fh:
+        while block := fh.read(_COUNT_BLOCK):
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            rows += len(_DATA_LINE_RE.findall(block[:cut]))
+            pending = block[cut:]
+    return rows + len(_DATA_LINE_RE.findall(pending))
+
+
+def report_stats(paths: list[Path], count_rows: bool = True) -> tuple[int, int]:
+    """
+    (bytes, filas de datos) de uno o varios reports. Las filas se cuentan
+    leyendo por bloques; con count_rows=False (ya se saben) solo se mira el
+    tamaño y filas = 0.
+    """
+    size = rows = 0
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            size += path.stat().st_size
+            if count_rows:
+                rows += _count_data_lines(path)
+    return size, rows
+
+
+def _status(exc: BaseException | None) -> str:
+    if exc is None:
+        return "ok"
+    if isinstance(exc, RunCancelled):
+        return "cancelled"
+    if isinstance(exc, RunTimeout):
+        return "timeout"
+    if isinstance(exc, PropagationAborted):
+        return "aborted"
+    return "error"
+
+
+def append_run(entry: dict, log: Path = RUNS_LOG):
+    log.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(entry, ensure_ascii=False)
+    with _LOG_LOCK, log.open("a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+
+
+class RunRecord:
+    """
+    Mide una ejecución y la apunta en RUNS_LOG al salir del with (haya ido
+    bien o no; la excepción sigue su camino):
+        with RunRecord("pipeline", run_params(p), ctl) as rec:
+            ...
+            rec.reports = [REPORT_PATH]
+    Se guarda: estado (ok/cancelled/timeout/aborted/error), tiempo real,
+    CPU (la de este hilo más la de los procesos de ctl), pico de memoria,
+    tamaño y filas del report, y filas por segundo.
+    """
+
+    def __init__(self, kind: str, params: dict, ctl: RunControl | None = None,
+                 log: Path = RUNS_LOG):
+        self.kind = kind
+        self.params = params
+        self.ctl = ctl or RunControl()
+        self.log = log
+        self.reports = []
+        self.rows = None   # si no se da, se cuentan en los reports
+        self.entry = None
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        usage = self.ctl.usage
+        size, rows = report_stats(self.reports, count_rows=self.rows is None)
+        if self.rows is not None:
+            rows = self.rows
+
+        self.entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "kind": self.kind,
+            "status": _status(exc),
+            "error": "" if exc is None else str(exc),
+            **self.params,
+            "timeout_s": self.ctl.timeout,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.thread_time() - self._cpu0 + usage.get("child_cpu_s", 0.0), 4),
+            "child_cpu_s": round(usage.get("child_cpu_s", 0.0), 4),
+            "child_peak_rss_mb": round(usage.get("child_peak_rss_mb", 0.0), 1),
+            "self_peak_rss_mb": round(self_peak_rss_mb(), 1),
+            "report_bytes": size,
+            "rows": rows,
+            "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+        }
+        append_run(self.entry, self.log)
+
+        icon = "✅" if exc is None else "⚠"
+        print(f"{icon} {self.kind}: {self.entry['status']}, {wall:.2f} s, {rows} filas")
+        return False
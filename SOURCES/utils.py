@@ -10,8 +10,9 @@ INPUT_DIR  = DATA_DIR / "input"
 GMAT_DIR   = DATA_DIR / "gmat"
 OUTPUT_DIR = DATA_DIR / "output"
 PLOTS_DIR  = DATA_DIR / "plots"
+CACHE_DIR  = DATA_DIR / "cache"
 
 
 def ensure_dirs():
-    for d in [INPUT_DIR, GMAT_DIR, OUTPUT_DIR, PLOTS_DIR]:
+    for d in [INPUT_DIR, GMAT_DIR, OUTPUT_DIR, PLOTS_DIR, CACHE_DIR]:
         d.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,68 @@
+"""
+GmatConsole de pruebas: hace lo mismo que GMAT con los ficheros (lee los
+scripts, escribe cada ReportFile.Filename) sin propagar nada.
+
+    python stub_gmat_console.py <script>
+    python stub_gmat_console.py --batch <lista>    (un script por línea)
+
+Por cada script escribe "Running script: <ruta>", los reports (cabecera +
+una fila con Sat.X del script) y "Mission run completed.". Variables:
+    STUB_GMAT_FAIL   si la ruta del script la contiene, no escribe sus reports
+    STUB_GMAT_SLEEP  segundos de espera antes de cada script
+    STUB_GMAT_NAMED  "1": el aviso de final lleva la ruta del script
+    STUB_GMAT_NOISE  "1": escribe avisos de final que no son de ningún script
+Deja su pid en ./stub.pid (carpeta de trabajo).
+"""
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+_FILENAME_RE = re.compile(r"^\s*\w+\.Filename\s*=\s*'([^']*)'\s*;", re.MULTILINE)
+_X_RE = re.compile(r"^\s*\w+\.X\s*=\s*([^;]+);", re.MULTILINE)
+
+
+def run_script(script: Path):
+    print(f"Running script: {script}", flush=True)
+    time.sleep(float(os.environ.get("STUB_GMAT_SLEEP", "0")))
+
+    text = script.read_text(encoding="utf-8")
+    fail = os.environ.get("STUB_GMAT_FAIL")
+    if not (fail and fail in str(script)):
+        m = _X_RE.search(text)
+        x = float(m.group(1)) if m else 0.0
+        for name in _FILENAME_RE.findall(text):
+            report = Path(name)
+            if not report.is_absolute():
+                report = Path("output") / report
+            report.parent.mkdir(parents=True, exist_ok=True)
+            report.write_text(f"Sat.ElapsedDays   Sat.X\n0.0   {x}\n", encoding="utf-8")
+
+    if os.environ.get("STUB_GMAT_NAMED") == "1":
+        print(f"Mission run completed: {script}", flush=True)
+    else:
+        print("Mission run completed.", flush=True)
+
+
+def main(argv: list[str]) -> int:
+    Path("stub.pid").write_text(str(os.getpid()), encoding="utf-8")
+    noise = os.environ.get("STUB_GMAT_NOISE") == "1"
+    if noise:
+        print("Startup: previous mission run completed without errors", flush=True)
+
+    if argv[:1] == ["--batch"]:
+        scripts = [Path(line.strip()) for line in Path(argv[1]).read_text(encoding="utf-8").splitlines()
+                   if line.strip()]
+    else:
+        scripts = [Path(argv[0])]
+
+    for script in scripts:
+        run_script(script)
+        if noise:
+            print("Mission run completed (summary)", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,27 @@
+from SOURCES.cache import REPORT_NAME, ResultCache
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_second_store_replaces_the_entry(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    run = tmp_path / "run"
+    report = write(run / REPORT_NAME, "viejo")
+    cache.store("k", report, [write(run / "a.png", "a")],
+                [write(run / "stm.npz", "stm"), write(run / "events.csv", "ev")])
+
+    write(report, "nuevo")
+    cache.store("k", report, [write(run / "b.png", "b")], [write(run / "events.csv", "ev2")])
+
+    out, plots = tmp_path / "out", tmp_path / "plots"
+    assert cache.restore("k", out, plots)
+    assert sorted(p.name for p in out.iterdir()) == [REPORT_NAME, "events.csv"]
+    assert (out / REPORT_NAME).read_text(encoding="utf-8") == "nuevo"
+    assert (out / "events.csv").read_text(encoding="utf-8") == "ev2"
+    assert [p.name for p in plots.iterdir()] == ["b.png"]
+    # Sin directorios temporales sueltos
+    assert sorted(p.name for p in cache.root.iterdir()) == ["index.json", "k"]
@@ -0,0 +1,27 @@
+import numpy as np
+
+from SOURCES.decimate import m4_blocks, m4_indices
+
+
+def test_m4_blocks_keeps_extremes_and_burns():
+    rng = np.random.default_rng(0)
+    t = np.sort(rng.uniform(0.0, 5.0, 100_000))
+    t[40_000] = t[39_999]          # maniobra justo en el corte entre bloques
+    values = np.cumsum(rng.normal(size=(len(t), 2)), axis=0)
+    cols = [values[:, 0], values[:, 1]]
+
+    k = m4_blocks(t, cols, buckets=600, block=10_000)
+    assert k[0] == 0 and k[-1] == len(t) - 1
+    assert {39_999, 40_000} <= set(k.tolist())
+
+    # En buckets de una figura alineados con los de m4_blocks (600 = 3 * 200),
+    # mismos extremos que con todas las filas
+    full = m4_indices(t, values, 200)
+    part = k[m4_indices(t[k], values[k], 200)]
+    edges = np.linspace(t[0], t[-1], 201)
+    for j in range(2):
+        for a, b in zip(edges[:-1], edges[1:]):
+            f = full[(t[full] >= a) & (t[full] < b)]
+            p = part[(t[part] >= a) & (t[part] < b)]
+            assert values[f, j].min() == values[p, j].min()
+            assert values[f, j].max() == values[p, j].max()
@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from SOURCES import GMAT_exec
+from SOURCES.GMAT_exec import iter_gmat_batch, run_gmat_batch
+from SOURCES.telemetry import RunControl, RunTimeout
+
+STUB = Path(__file__).resolve().parent / "stub_gmat_console.py"
+
+
+@pytest.fixture
+def console(tmp_path, monkeypatch):
+    """GMAT_CONSOLE -> lanzador del stub; los trabajos, dentro de tmp_path."""
+    launcher = tmp_path / "GmatConsole"
+    launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{STUB}" "$@"\n', encoding="utf-8")
+    launcher.chmod(0o755)
+    monkeypatch.setenv("GMAT_CONSOLE", str(launcher))
+    monkeypatch.setattr(GMAT_exec, "JOBS_DIR", tmp_path / "jobs")
+    for var in ("STUB_GMAT_FAIL", "STUB_GMAT_SLEEP", "STUB_GMAT_NAMED", "STUB_GMAT_NOISE"):
+        monkeypatch.delenv(var, raising=False)
+    return launcher
+
+
+def make_scripts(tmp_path, xs):
+    scripts = []
+    for i, x in enumerate(xs):
+        script = tmp_path / "scripts" / f"esc{i}.script"
+        script.parent.mkdir(parents=True, exist_ok=True)
+        script.write_text(
+            "Create Spacecraft Sat;\n"
+            f"Sat.X = {x};\n"
+            "Create ReportFile RF;\n"
+            "RF.Filename = 'DefaultReportFile.txt';\n",
+            encoding="utf-8",
+        )
+        scripts.append(script)
+    return scripts
+
+
+def report_x(report: Path) -> float:
+    return float(report.read_text(encoding="utf-8").splitlines()[1].split()[1])
+
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="el lanzador del stub es un script sh")
+
+
+@pytest.mark.parametrize("named", ["0", "1"])
+def test_batch_file_contract(tmp_path, console, monkeypatch, named):
+    monkeypatch.setenv("STUB_GMAT_NAMED", named)
+    monkeypatch.setenv("STUB_GMAT_NOISE", "1")
+    scripts = make_scripts(tmp_path, [7000.0, 7100.0, 7200.0])
+
+    results = list(iter_gmat_batch(scripts, tmp_path / "batch"))
+
+    assert [i for i, _ in results] == [0, 1, 2]
+    for i, reports in results:
+        assert len(reports) == 1
+        assert reports[0].parent == (tmp_path / "batch" / f"{i:05d}_esc{i}").resolve()
+        assert report_x(reports[0]) == 7000.0 + 100.0 * i
+
+    run_list = (tmp_path / "batch" / "batch.txt").read_text(encoding="utf-8").split()
+    assert [Path(p).parent.name for p in run_list] == ["00000_esc0", "00001_esc1", "00002_esc2"]
+
+
+def test_batch_dirs_are_unique(tmp_path, console):
+    scripts = make_scripts(tmp_path, [7000.0])
+    first = run_gmat_batch(scripts)[0][0]
+    second = run_gmat_batch(scripts)[0][0]
+    assert first.parent.parent != second.parent.parent
+    assert first.parent.parent.parent == (tmp_path / "jobs").resolve()
+
+
+def test_batch_stale_report_is_not_reused(tmp_path, console, monkeypatch):
+    scripts = make_scripts(tmp_path, [7000.0, 7100.0])
+    run_gmat_batch(scripts, tmp_path / "batch")
+
+    # Mismo batch_dir, y ahora el segundo script no escribe su report
+    monkeypatch.setenv("STUB_GMAT_FAIL", "esc1")
+    gen = iter_gmat_batch(scripts, tmp_path / "batch")
+    i, reports = next(gen)
+    assert i == 0 and report_x(reports[0]) == 7000.0
+    with pytest.raises(FileNotFoundError):
+        next(gen)
+
+
+def test_batch_close_kills_console(tmp_path, console, monkeypatch):
+    monkeypatch.setenv("STUB_GMAT_SLEEP", "0.5")
+    scripts = make_scripts(tmp_path, [7000.0 + i for i in range(20)])
+
+    gen = iter_gmat_batch(scripts, tmp_path / "batch")
+    next(gen)
+    gen.close()
+
+    pid = int((tmp_path / "batch" / "stub.pid").read_text())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+    assert not (tmp_path / "batch" / "00019_esc19" / "DefaultReportFile.txt").exists()
+
+
+def test_batch_honours_run_control(tmp_path, console, monkeypatch):
+    monkeypatch.setenv("STUB_GMAT_SLEEP", "5")
+    scripts = make_scripts(tmp_path, [7000.0, 7100.0])
+
+    t0 = time.monotonic()
+    with pytest.raises(RunTimeout):
+        run_gmat_batch(scripts, tmp_path / "batch", ctl=RunControl(timeout=0.5))
+    assert time.monotonic() - t0 < 4
+
+
+def test_batch_console_failure(tmp_path, console):
+    console.write_text("#!/bin/sh\nexit 3\n", encoding="utf-8")
+    scripts = make_scripts(tmp_path, [7000.0])
+    with pytest.raises(subprocess.CalledProcessError):
+        run_gmat_batch(scripts, tmp_path / "batch")
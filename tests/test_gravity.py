@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from SOURCES.astro import MU, RADIUS
+from SOURCES.gravity import BUILTIN_COEFFICIENTS, GravityField, _coefficient_arrays
+
+
+def random_field(degree: int) -> GravityField:
+    rng = np.random.default_rng(degree)
+    C = np.tril(rng.normal(size=(degree + 1, degree + 1))) * 1e-6
+    S = np.tril(rng.normal(size=(degree + 1, degree + 1))) * 1e-6
+    S[:, 0] = 0.0
+    C[0, 0], C[1], S[1] = 1.0, 0.0, 0.0
+    return GravityField(MU["Earth"], RADIUS["Earth"], C, S, degree, degree)
+
+
+@pytest.fixture(params=["builtin", "20x20"])
+def field(request):
+    if request.param == "builtin":
+        return GravityField(MU["Earth"], RADIUS["Earth"], *_coefficient_arrays(BUILTIN_COEFFICIENTS), 4, 4)
+    return random_field(20)
+
+
+def test_single_state_matches_batch(field):
+    rng = np.random.default_rng(0)
+    R = rng.normal(size=(50, 3))
+    R *= (7000.0 + rng.uniform(0.0, 30000.0, 50))[:, None] / np.linalg.norm(R, axis=1)[:, None]
+    batch = field.acceleration(np.repeat(R, 10, axis=0))[::10]   # recursión por grados
+    one = np.array([field.acceleration(r) for r in R])
+    np.testing.assert_allclose(one, batch, rtol=0, atol=1e-14 * np.abs(batch).max())
+
+
+@pytest.mark.parametrize("z", [7000.0, -8000.0])
+def test_polar_axis_is_finite_limit(field, z):
+    a = field.acceleration(np.array([0.0, 0.0, z]))
+    assert np.all(np.isfinite(a))
+    # Mismo valor en lote y, a 1 mm del eje, en cualquier dirección
+    batch = field.acceleration(np.array([[0.0, 0.0, z], [7000.0, 0.0, 0.0]]))[0]
+    np.testing.assert_allclose(batch, a, rtol=0, atol=1e-14 * np.abs(a).max())
+    for lam in np.linspace(0.0, 2 * np.pi, 8, endpoint=False):
+        near = field.acceleration(np.array([1e-6 * np.cos(lam), 1e-6 * np.sin(lam), z]))
+        np.testing.assert_allclose(near, a, rtol=0, atol=1e-9 * np.abs(a).max())
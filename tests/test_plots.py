@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from SOURCES import plot_results
+from SOURCES.astro import MU, kep2cart, kepler_universal
+from SOURCES.elements import states_to_elements
+from SOURCES.streaming import rows_to_frame
+
+
+@pytest.fixture
+def plots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(plot_results, "PLOTS_DIR", tmp_path / "plots")
+    monkeypatch.delenv("PLOT_FIGURES", raising=False)
+    return tmp_path / "plots"
+
+
+def orbit_frame(n: int = 2000):
+    y0 = kep2cart(7000.0, 0.01, 51.6, 0.0, 0.0, 0.0, MU["Earth"])
+    t = np.linspace(0.0, 1.0, n)
+    rows = np.column_stack([t, kepler_universal(y0[:3], y0[3:], t * 86400.0, MU["Earth"])])
+    return rows_to_frame(rows, "Sat"), states_to_elements(t, rows[:, 1:], MU["Earth"])
+
+
+def test_plot_workers_by_figure_cost(monkeypatch):
+    monkeypatch.setattr(plot_results.os, "cpu_count", lambda: 4)
+    assert plot_results.plot_workers(list(plot_results.FIGURES)) == 4
+    assert plot_results.plot_workers(["elementos_vs_tiempo", "radio_vs_tiempo"]) == 2
+    assert plot_results.plot_workers(["orbita_XY"]) == 1
+    assert plot_results.plot_workers(["orbita_XY", "radio_vs_tiempo"]) == 1
+    monkeypatch.setattr(plot_results.os, "cpu_count", lambda: 1)
+    assert plot_results.plot_workers(list(plot_results.FIGURES)) == 1
+
+
+def test_pool_writes_figures_to_plots_dir(plots_dir):
+    df, el = orbit_frame()
+    figures = ["radio_vs_tiempo", "elementos_vs_tiempo"]
+    pngs = plot_results.make_plots(df, burn_times=[0.5], elements=el, figures=figures, workers=2)
+
+    assert pngs == [plots_dir / f"{name}.png" for name in figures]
+    assert sorted(p.name for p in plots_dir.iterdir()) == sorted(p.name for p in pngs)
+    assert all(p.stat().st_size > 0 for p in pngs)
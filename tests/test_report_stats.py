@@ -0,0 +1,42 @@
+import numpy as np
+
+from SOURCES.astro import MU, kep2cart, kepler_universal
+from SOURCES.report_stats import ReportStats
+
+MU_E = MU["Earth"]
+
+
+def kepler_rows(ecc: float, n: int, days: float = 10.0) -> np.ndarray:
+    """Filas (t [días], X..VZ) de una órbita kepleriana de a = 7000 km."""
+    y0 = kep2cart(7000.0, ecc, 51.6, 0.0, 0.0, 0.0, MU_E)
+    t = np.linspace(0.0, days, n)
+    states = kepler_universal(y0[:3], y0[3:], t * 86400.0, MU_E)
+    return np.column_stack([t, states])
+
+
+def feed(rows: np.ndarray, chunk: int) -> ReportStats:
+    stats = ReportStats()
+    for i in range(0, len(rows), chunk):
+        stats.update(rows[i:i + chunk])
+    return stats
+
+
+def test_circular_orbit_has_no_apsides():
+    stats = feed(kepler_rows(0.0, 200_000), 5000)
+    assert stats.periapsides == []
+    assert stats.apoapsides == []
+
+
+def test_elliptic_apsides_one_per_orbit():
+    rows = kepler_rows(0.01, 20_000)
+    period_days = 2 * np.pi * np.sqrt(7000.0**3 / MU_E) / 86400.0
+    stats = feed(rows, 777)
+
+    # Arranca en el periapsis (ta = 0): ese no es un cruce
+    assert len(stats.periapsides) == int(rows[-1, 0] / period_days)
+    assert len(stats.apoapsides) == int(rows[-1, 0] / period_days + 0.5)
+    t_p, r_p = np.array(stats.periapsides).T
+    _, r_a = np.array(stats.apoapsides).T
+    np.testing.assert_allclose(r_p, 7000.0 * 0.99, atol=1e-3)
+    np.testing.assert_allclose(r_a, 7000.0 * 1.01, atol=1e-3)
+    np.testing.assert_allclose(t_p, period_days * np.arange(1, len(t_p) + 1), atol=1e-7)
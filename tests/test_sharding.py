@@ -0,0 +1,28 @@
+import copy
+import time
+
+import pytest
+
+from SOURCES.sharding import run_sharded
+from SOURCES.Transpiler import DATA_FILE, parse_gui_txt, resolve_config
+
+
+def test_error_in_parent_stops_sibling_shards(tmp_path):
+    p = resolve_config(parse_gui_txt(DATA_FILE))
+    # Uno largo (30 días con campo 4x4) y dos cortos: el largo va primero
+    slow = copy.deepcopy(p)
+    slow.update(dur_days=30.0, gravity_file="EGM96.cof", gravity_degree=4, gravity_order=4)
+    fast = copy.deepcopy(p)
+    fast.update(dur_days=0.01)
+
+    raised = []
+
+    def on_progress(frac):
+        raised.append(time.monotonic())
+        raise ValueError("fallo en on_progress")
+
+    with pytest.raises(ValueError, match="on_progress"):
+        run_sharded([fast, slow, fast], workers=2, out_path=tmp_path / "states.npy",
+                    on_progress=on_progress)
+    # El largo se cancela: sin esperar al join (5 s) ni a que termine
+    assert time.monotonic() - raised[0] < 3.0